@@ -1,3 +1,8 @@
 from django.contrib import admin
+from .models import PlatAchete
 
-# Register your models here.
+
+@admin.register(PlatAchete)
+class PlatAcheteAdmin(admin.ModelAdmin):
+    list_display = ('client', 'plat', 'achete_le')
+    raw_id_fields = ('client', 'plat')
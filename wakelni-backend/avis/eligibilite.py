@@ -0,0 +1,48 @@
+# avis/eligibilite.py
+"""
+Qui peut noter quoi : table PlatAchete (client, plat), alimentée à chaque
+passage d'une commande à REMIS ou COMPLETEE (signal statut_commande_change).
+"""
+from commandes.models import Commande, LigneCommande
+
+from .models import PlatAchete
+
+STATUTS_ELIGIBLES = (Commande.STATUT_REMIS, Commande.STATUT_COMPLETEE)
+
+
+def enregistrer_achats(commande):
+    """Rend les plats de `commande` notables par son client (idempotent)."""
+    plat_ids = set(
+        LigneCommande.objects.filter(commande=commande).values_list("plat_id", flat=True)
+    )
+    PlatAchete.objects.bulk_create(
+        [PlatAchete(client_id=commande.client_id, plat_id=plat_id) for plat_id in plat_ids],
+        ignore_conflicts=True,
+    )
+
+
+def plats_notables(client, plat_ids):
+    """Sous-ensemble de `plat_ids` que `client` peut noter (une requête)."""
+    return set(
+        PlatAchete.objects
+        .filter(client=client, plat_id__in=plat_ids)
+        .values_list("plat_id", flat=True)
+    )
+
+
+def remplir(lot=1000):
+    """Reconstruit la table depuis l'historique des commandes (réparation)."""
+    couples = (
+        LigneCommande.objects
+        .filter(commande__statut__in=STATUTS_ELIGIBLES)
+        .values_list("commande__client_id", "plat_id")
+        .distinct()
+        .order_by()
+    )
+    paquet = []
+    for client_id, plat_id in couples.iterator(chunk_size=lot):
+        paquet.append(PlatAchete(client_id=client_id, plat_id=plat_id))
+        if len(paquet) >= lot:
+            PlatAchete.objects.bulk_create(paquet, ignore_conflicts=True)
+            paquet = []
+    PlatAchete.objects.bulk_create(paquet, ignore_conflicts=True)
@@ -0,0 +1,18 @@
+# avis/management/commands/recalculer_notes.py
+from django.core.management.base import BaseCommand
+
+from avis.notes import recalculer_notes
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule depuis la table Avis les agrégats de notes des plats "
+        "(nombre, somme, répartition, moyenne) et des cuisiniers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lot", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = recalculer_notes(lot=options["lot"])
+        self.stdout.write(self.style.SUCCESS(f"{total} plat(s) recalculé(s)."))
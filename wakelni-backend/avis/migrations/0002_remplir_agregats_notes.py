@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count, FloatField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+
+# copie figée de avis/notes.py (recalculer_notes) au moment de cette migration
+def _moyenne(somme, nb):
+    return Cast(somme, FloatField()) / NullIf(nb, Value(0))
+
+
+def remplir_agregats(apps, schema_editor):
+    Plat = apps.get_model("plats", "Plat")
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    Avis = apps.get_model("avis", "Avis")
+
+    def sous_requete(cle, agregat):
+        avis = (
+            Avis.objects
+            .filter(**{cle: OuterRef("pk")})
+            .order_by()
+            .values(cle)
+            .annotate(v=agregat)
+            .values("v")
+        )
+        return Coalesce(Subquery(avis), Value(0))
+
+    nb = sous_requete("plat", Count("pk"))
+    somme = sous_requete("plat", Sum("note"))
+    champs = {
+        "nb_avis": nb,
+        "somme_notes": somme,
+        "note_moyenne": Coalesce(_moyenne(somme, nb), Value(0.0)),
+    }
+    for note in range(1, 6):
+        champs[f"nb_notes_{note}"] = sous_requete("plat", Count("pk", filter=Q(note=note)))
+    Plat.objects.update(**champs)
+
+    nb = sous_requete("plat__cuisinier", Count("pk"))
+    somme = sous_requete("plat__cuisinier", Sum("note"))
+    User.objects.filter(role="CUISINIER").update(
+        nb_avis=nb, somme_notes=somme, note_moyenne=_moyenne(somme, nb)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('avis', '0001_initial'),
+        ('plats', '0012_agregats_notes'),
+        ('users', '0002_agregats_notes'),
+    ]
+
+    operations = [
+        migrations.RunPython(remplir_agregats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('avis', '0002_remplir_agregats_notes'),
+        ('plats', '0012_agregats_notes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatAchete',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('achete_le', models.DateTimeField(auto_now_add=True)),
+                ('client', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='plats_achetes', to=settings.AUTH_USER_MODEL)),
+                ('plat', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='plats.plat')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('client', 'plat'), name='plat_achete_unique')],
+            },
+        ),
+    ]
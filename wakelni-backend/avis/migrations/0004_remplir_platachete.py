@@ -0,0 +1,38 @@
+from django.db import migrations
+
+
+# copie figée de avis/eligibilite.py (remplir) au moment de cette migration
+STATUTS_ELIGIBLES = ("REMIS", "COMPLETEE")
+LOT = 1000
+
+
+def remplir_achats(apps, schema_editor):
+    LigneCommande = apps.get_model("commandes", "LigneCommande")
+    PlatAchete = apps.get_model("avis", "PlatAchete")
+
+    couples = (
+        LigneCommande.objects
+        .filter(commande__statut__in=STATUTS_ELIGIBLES)
+        .values_list("commande__client_id", "plat_id")
+        .distinct()
+        .order_by()
+    )
+    paquet = []
+    for client_id, plat_id in couples.iterator(chunk_size=LOT):
+        paquet.append(PlatAchete(client_id=client_id, plat_id=plat_id))
+        if len(paquet) >= LOT:
+            PlatAchete.objects.bulk_create(paquet, ignore_conflicts=True)
+            paquet = []
+    PlatAchete.objects.bulk_create(paquet, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('avis', '0003_platachete'),
+        ('commandes', '0007_backfill_commande_cuisinier'),
+    ]
+
+    operations = [
+        migrations.RunPython(remplir_achats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('avis', '0004_remplir_platachete'),
+        ('plats', '0012_agregats_notes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='avis',
+            name='cuisinier',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='avis_recus', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='avis',
+            name='plat',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='avis_clients', to='plats.plat'),
+        ),
+        migrations.AddIndex(
+            model_name='avis',
+            index=models.Index(fields=['plat', '-date', '-id'], name='avis_plat_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='avis',
+            index=models.Index(fields=['cuisinier', '-date', '-id'], name='avis_cuisinier_date_idx'),
+        ),
+    ]
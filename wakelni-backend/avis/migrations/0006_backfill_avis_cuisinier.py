@@ -0,0 +1,22 @@
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def remplir_cuisinier(apps, schema_editor):
+    Avis = apps.get_model("avis", "Avis")
+    Plat = apps.get_model("plats", "Plat")
+
+    Avis.objects.filter(cuisinier__isnull=True).update(
+        cuisinier=Subquery(Plat.objects.filter(pk=OuterRef("plat")).values("cuisinier")[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('avis', '0005_avis_cuisinier_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(remplir_cuisinier, migrations.RunPython.noop),
+    ]
@@ -18,6 +18,18 @@ class Avis(models.Model):
         Plat,
         on_delete=models.CASCADE,
         related_name="avis_clients",   #  ICI on change le nom
+        db_index=False,  # préfixe de avis_plat_date_idx
+    )
+
+    # copie de plat.cuisinier (posée par avis/notes.enregistrer_avis) : la
+    # liste des avis reçus d'un cuisinier se lit sur avis_cuisinier_date_idx,
+    # sans jointure sur ses plats
+    cuisinier = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="avis_recus",
+        null=True,
+        db_index=False,  # préfixe de avis_cuisinier_date_idx
     )
 
     note = models.PositiveSmallIntegerField()
@@ -27,6 +39,40 @@ class Avis(models.Model):
     class Meta:
         unique_together = ("client", "plat")
         ordering = ["-date"]
+        indexes = [
+            # listes paginées par curseur (date, id), filtrables par période
+            models.Index(fields=["plat", "-date", "-id"], name="avis_plat_date_idx"),
+            models.Index(fields=["cuisinier", "-date", "-id"], name="avis_cuisinier_date_idx"),
+        ]
 
     def __str__(self):
         return f"Avis {self.note}/5 par {self.client} pour {self.plat}"
+
+
+class PlatAchete(models.Model):
+    """
+    (client, plat) : le client a reçu ce plat au moins une fois, il peut
+    donc le noter. Rempli quand une commande passe à REMIS / COMPLETEE
+    (avis/eligibilite.py) ; remplace la jointure sur tout l'historique de
+    commandes à chaque avis.
+    """
+    client = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="plats_achetes",
+        db_index=False,  # préfixe de la contrainte unique
+    )
+    plat = models.ForeignKey(
+        Plat,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    achete_le = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["client", "plat"], name="plat_achete_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.client_id} a acheté {self.plat_id}"
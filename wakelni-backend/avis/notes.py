@@ -0,0 +1,187 @@
+# avis/notes.py
+"""
+Agrégats des notes, maintenus de façon incrémentale à chaque avis créé,
+modifié ou supprimé (avis/signals.py, y compris en cascade) :
+
+- Plat : nb_avis, somme_notes, nb_notes_1..5 (répartition), note_moyenne
+- User (cuisinier) : nb_avis, somme_notes, note_moyenne, sur tous ses plats
+
+Le catalogue et les profils lisent ces colonnes directement (aucun
+agrégat sur avis_clients par ligne affichée) ; le catalogue peut donc être
+trié par note. recalculer_notes() reconstruit tout depuis la table Avis.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, FloatField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.utils import timezone
+
+from plats import cache
+from plats.models import Plat
+
+from .models import Avis
+
+NOTES = range(1, 6)
+
+
+def champ_note(note):
+    return f"nb_notes_{note}"
+
+
+def _moyenne(somme, nb):
+    # NULL sans avis (pas de division par zéro)
+    return Cast(somme, FloatField()) / NullIf(nb, Value(0))
+
+
+def _maj_agregats(plat_id, cuisinier_id, delta_nb, delta_somme, repartition):
+    nb = F("nb_avis") + delta_nb
+    somme = F("somme_notes") + delta_somme
+    Plat.objects.filter(pk=plat_id).update(
+        nb_avis=nb,
+        somme_notes=somme,
+        note_moyenne=Coalesce(_moyenne(somme, nb), Value(0.0)),
+        modifie_le=timezone.now(),  # validateur ETag du catalogue
+        **{champ: F(champ) + delta for champ, delta in repartition.items()},
+    )
+    get_user_model().objects.filter(pk=cuisinier_id).update(
+        nb_avis=nb,
+        somme_notes=somme,
+        note_moyenne=_moyenne(somme, nb),
+    )
+    transaction.on_commit(cache.invalider)
+
+
+def appliquer_note(plat, ancienne, nouvelle):
+    """
+    Répercute un avis sur les agrégats du plat et de son cuisinier, par des
+    UPDATE relatifs (F()) : deux avis simultanés ne s'écrasent pas.
+    ancienne : note précédente du même client (None pour un nouvel avis).
+    À appeler dans la transaction qui enregistre l'avis.
+    """
+    delta_nb = 0 if ancienne else 1
+    delta_somme = nouvelle - (ancienne or 0)
+    if not delta_nb and not delta_somme:
+        return
+
+    repartition = {champ_note(nouvelle): 1}
+    if ancienne:
+        repartition[champ_note(ancienne)] = -1
+    _maj_agregats(plat.pk, plat.cuisinier_id, delta_nb, delta_somme, repartition)
+
+
+def retirer_avis(avis):
+    """
+    Inverse d'appliquer_note pour un avis supprimé (directement ou en
+    cascade avec son client ou son plat) : appelé sur post_delete.
+    """
+    _maj_agregats(avis.plat_id, avis.cuisinier_id, -1, -avis.note, {champ_note(avis.note): -1})
+
+
+def enregistrer_avis(client, plat, note, commentaire=""):
+    """Crée ou met à jour l'avis de `client` sur `plat`. Retourne (avis, cree)."""
+    with transaction.atomic():
+        avis, cree = Avis.objects.get_or_create(
+            client=client,
+            plat=plat,
+            defaults={
+                "note": note,
+                "commentaire": commentaire,
+                "cuisinier_id": plat.cuisinier_id,
+            },
+        )
+        ancienne = None
+        if not cree:
+            # verrou : deux modifications du même avis se suivent
+            avis = Avis.objects.select_for_update().get(pk=avis.pk)
+            ancienne = avis.note
+            avis.note = note
+            avis.commentaire = commentaire
+            avis.save(update_fields=["note", "commentaire"])
+        appliquer_note(plat, ancienne, note)
+    return avis, cree
+
+
+def _resume(nb_avis, note_moyenne, repartition):
+    return {
+        "nb_avis": nb_avis,
+        "note_moyenne": round(note_moyenne, 2) if nb_avis else None,
+        "repartition_notes": repartition,
+    }
+
+
+def resume_plat(plat):
+    """En-tête des avis d'un plat, lu dans ses colonnes d'agrégats."""
+    return _resume(
+        plat.nb_avis,
+        plat.note_moyenne,
+        {note: getattr(plat, champ_note(note)) for note in NOTES},
+    )
+
+
+def resume_cuisinier(cuisinier):
+    """
+    En-tête des avis reçus par un cuisinier : moyenne sur l'utilisateur,
+    répartition sommée sur les agrégats de ses plats (une requête).
+    """
+    repartition = Plat.objects.filter(cuisinier=cuisinier).aggregate(
+        **{champ_note(note): Coalesce(Sum(champ_note(note)), 0) for note in NOTES}
+    )
+    return _resume(
+        cuisinier.nb_avis,
+        cuisinier.note_moyenne,
+        {note: repartition[champ_note(note)] for note in NOTES},
+    )
+
+
+def recalculer_notes(lot=1000):
+    """
+    Recalcule tous les agrégats depuis zéro (réparation), par lots de `lot`
+    lignes : un UPDATE à sous-requêtes par lot. Retourne le nombre de plats
+    recalculés.
+    """
+    def sous_requete(cle, agregat):
+        avis = (
+            Avis.objects
+            .filter(**{cle: OuterRef("pk")})
+            .order_by()
+            .values(cle)
+            .annotate(v=agregat)
+            .values("v")
+        )
+        return Coalesce(Subquery(avis), Value(0))
+
+    nb = sous_requete("plat", Count("pk"))
+    somme = sous_requete("plat", Sum("note"))
+    champs = {
+        "nb_avis": nb,
+        "somme_notes": somme,
+        "note_moyenne": Coalesce(_moyenne(somme, nb), Value(0.0)),
+    }
+    for note in NOTES:
+        champs[champ_note(note)] = sous_requete("plat", Count("pk", filter=Q(note=note)))
+    total = _par_lots(Plat.objects.all(), champs, lot)
+
+    nb = sous_requete("plat__cuisinier", Count("pk"))
+    somme = sous_requete("plat__cuisinier", Sum("note"))
+    _par_lots(
+        get_user_model().objects.filter(role="CUISINIER"),
+        {"nb_avis": nb, "somme_notes": somme, "note_moyenne": _moyenne(somme, nb)},
+        lot,
+    )
+
+    transaction.on_commit(cache.invalider)
+    return total
+
+
+def _par_lots(qs, champs, lot):
+    total, dernier = 0, None
+    while True:
+        page = qs.order_by("pk")
+        if dernier is not None:
+            page = page.filter(pk__gt=dernier)
+        ids = list(page.values_list("pk", flat=True)[:lot])
+        if not ids:
+            return total
+        qs.model.objects.filter(pk__in=ids).update(**champs)
+        total += len(ids)
+        dernier = ids[-1]
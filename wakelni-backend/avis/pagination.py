@@ -0,0 +1,25 @@
+# avis/pagination.py
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+class AvisCursorPagination(CursorPagination):
+    """
+    Avis par curseur (date, id), servis par avis_plat_date_idx /
+    avis_cuisinier_date_idx : coût constant par page, quel que soit le
+    nombre d'avis. La réponse commence par un bloc « resume » (moyenne,
+    répartition des notes) lu dans les agrégats, présent en première page
+    seulement.
+    """
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-date", "-id")
+
+    def get_paginated_response(self, data, resume=None):
+        return Response({
+            "resume": resume,
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
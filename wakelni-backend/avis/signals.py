@@ -0,0 +1,22 @@
+# avis/signals.py
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from commandes.signals import statut_commande_change
+
+from .eligibilite import STATUTS_ELIGIBLES, enregistrer_achats
+from .models import Avis
+from .notes import retirer_avis
+
+
+@receiver(statut_commande_change)
+def rendre_plats_notables(sender, commande, nouveau_statut, **kwargs):
+    if nouveau_statut in STATUTS_ELIGIBLES:
+        enregistrer_achats(commande)
+
+
+@receiver(post_delete, sender=Avis)
+def retirer_des_agregats(sender, instance, **kwargs):
+    # aussi pour la suppression en cascade d'un client ou d'un plat : le
+    # plat est supprimé après ses avis, le cuisinier garde des totaux justes
+    retirer_avis(instance)
@@ -1,3 +1,274 @@
-from django.test import TestCase
+import io
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from commandes.models import Commande, LigneCommande
+from commandes.transitions import transitionner
+from plats.models import Plat
+
+from .eligibilite import enregistrer_achats, remplir
+from .models import PlatAchete
+
+User = get_user_model()
+
+
+class AvisTestCase(APITestCase):
+    def setUp(self):
+        caches["catalogue"].clear()
+        self.cuisinier = User.objects.create_user(
+            username="chef", password="x", role=User.Role.CUISINIER
+        )
+        self.couscous = self.creer_plat("Couscous")
+        self.brik = self.creer_plat("Brik")
+        self.clients = [
+            User.objects.create_user(username=f"client{i}", password="x") for i in range(3)
+        ]
+        for client in self.clients:
+            commande = Commande.objects.create(
+                client=client, cuisinier=self.cuisinier,
+                statut=Commande.STATUT_COMPLETEE, total=Decimal("20"),
+            )
+            for plat in (self.couscous, self.brik):
+                LigneCommande.objects.create(commande=commande, plat=plat, sous_total=Decimal("10"))
+            enregistrer_achats(commande)
+
+    def creer_plat(self, nom):
+        return Plat.objects.create(cuisinier=self.cuisinier, nom=nom, prix=Decimal("10"), stock=5)
+
+    def noter(self, client, plat, note):
+        self.client.force_authenticate(client)
+        return self.client.post(
+            "/api/avis/laisser-avis/", {"plat": str(plat.pk), "note": note}, format="json"
+        )
+
+
+class AgregatsNotesTests(AvisTestCase):
+    def test_creation_et_modification(self):
+        self.assertEqual(self.noter(self.clients[0], self.couscous, 5).status_code, 201)
+        self.noter(self.clients[1], self.couscous, 3)
+        self.noter(self.clients[2], self.brik, 4)
+
+        self.couscous.refresh_from_db()
+        self.assertEqual((self.couscous.nb_avis, self.couscous.somme_notes), (2, 8))
+        self.assertEqual(self.couscous.note_moyenne, 4.0)
+        self.assertEqual((self.couscous.nb_notes_3, self.couscous.nb_notes_5), (1, 1))
+
+        # le client change d'avis : pas de second avis, la répartition suit
+        self.noter(self.clients[0], self.couscous, 1)
+        self.couscous.refresh_from_db()
+        self.assertEqual((self.couscous.nb_avis, self.couscous.somme_notes), (2, 4))
+        self.assertEqual((self.couscous.nb_notes_1, self.couscous.nb_notes_5), (1, 0))
+
+        self.cuisinier.refresh_from_db()
+        self.assertEqual((self.cuisinier.nb_avis, self.cuisinier.somme_notes), (3, 8))
+        self.assertAlmostEqual(self.cuisinier.note_moyenne, 8 / 3)
+
+    def test_note_invalide(self):
+        for note in (0, 6, "cinq"):
+            self.assertEqual(self.noter(self.clients[0], self.couscous, note).status_code, 400)
+        self.couscous.refresh_from_db()
+        self.assertEqual(self.couscous.nb_avis, 0)
+
+    def test_recalculer_notes(self):
+        self.noter(self.clients[0], self.couscous, 5)
+        self.noter(self.clients[1], self.brik, 2)
+        Plat.objects.update(nb_avis=99, somme_notes=0, nb_notes_5=0, note_moyenne=0)
+        User.objects.filter(pk=self.cuisinier.pk).update(nb_avis=0, note_moyenne=None)
+        vide = self.creer_plat("Sans avis")
+        Plat.objects.filter(pk=vide.pk).update(nb_avis=3)
+
+        call_command("recalculer_notes", "--lot", "2", stdout=io.StringIO())
+
+        self.couscous.refresh_from_db()
+        self.assertEqual(
+            (self.couscous.nb_avis, self.couscous.somme_notes, self.couscous.nb_notes_5), (1, 5, 1)
+        )
+        self.assertEqual(self.couscous.note_moyenne, 5.0)
+        vide.refresh_from_db()
+        self.assertEqual((vide.nb_avis, vide.note_moyenne), (0, 0))
+        self.cuisinier.refresh_from_db()
+        self.assertEqual((self.cuisinier.nb_avis, self.cuisinier.note_moyenne), (2, 3.5))
+
+
+    def test_suppressions_retirees_des_agregats(self):
+        self.noter(self.clients[0], self.couscous, 5)
+        self.noter(self.clients[1], self.couscous, 3)
+        self.noter(self.clients[0], self.brik, 4)
+
+        # client supprimé : ses avis partent en cascade
+        self.clients[0].delete()
+        self.couscous.refresh_from_db()
+        self.assertEqual(
+            (self.couscous.nb_avis, self.couscous.somme_notes, self.couscous.nb_notes_5), (1, 3, 0)
+        )
+        self.assertEqual(self.couscous.note_moyenne, 3.0)
+
+        self.brik.refresh_from_db()
+        self.assertEqual((self.brik.nb_avis, self.brik.note_moyenne), (0, 0))
+
+        # plat supprimé : le cuisinier perd ses avis
+        self.couscous.delete()
+        self.cuisinier.refresh_from_db()
+        self.assertEqual((self.cuisinier.nb_avis, self.cuisinier.somme_notes), (0, 0))
+        self.assertIsNone(self.cuisinier.note_moyenne)
+
+
+class CatalogueParNoteTests(AvisTestCase):
+    def test_tri_par_note_sans_requete_supplementaire(self):
+        self.client.force_authenticate(None)
+        with CaptureQueriesContext(connection) as sans_avis:
+            self.client.get("/api/plats/")
+
+        self.noter(self.clients[0], self.brik, 5)
+        self.noter(self.clients[1], self.couscous, 2)
+        self.client.force_authenticate(None)
+        caches["catalogue"].clear()
+
+        with CaptureQueriesContext(connection) as avec_avis:
+            res = self.client.get("/api/plats/", {"tri": "note"})
+        self.assertEqual(len(avec_avis), len(sans_avis))
+
+        plats = res.data["results"]
+        self.assertEqual([p["nom"] for p in plats], ["Brik", "Couscous"])
+        self.assertEqual((plats[0]["note_moyenne"], plats[0]["nb_avis"]), (5.0, 1))
+        self.assertEqual(plats[0]["repartition_notes"][5], 1)
+
+        self.assertEqual(self.client.get("/api/plats/", {"tri": "prix"}).status_code, 400)
+
+    def test_sans_avis_la_moyenne_est_nulle(self):
+        res = self.client.get("/api/plats/")
+        self.assertIsNone(res.data["results"][0]["note_moyenne"])
+
+
+class EligibiliteTests(AvisTestCase):
+    def setUp(self):
+        super().setUp()
+        self.nouveau = User.objects.create_user(username="nouveau", password="x")
+        self.commande = Commande.objects.create(
+            client=self.nouveau, cuisinier=self.cuisinier,
+            statut=Commande.STATUT_EN_ATTENTE, total=Decimal("10"),
+        )
+        LigneCommande.objects.create(commande=self.commande, plat=self.brik, sous_total=Decimal("10"))
+
+    def test_remise_rend_le_plat_notable(self):
+        self.assertEqual(self.noter(self.nouveau, self.brik, 4).status_code, 400)
+
+        for statut in (Commande.STATUT_EN_PREPARATION, Commande.STATUT_PRET):
+            transitionner(self.commande, statut, par=self.cuisinier)
+            self.assertFalse(PlatAchete.objects.filter(client=self.nouveau).exists())
+        transitionner(self.commande, Commande.STATUT_REMIS, par=self.cuisinier)
+
+        self.assertEqual(self.noter(self.nouveau, self.brik, 4).status_code, 201)
+        self.assertEqual(self.noter(self.nouveau, self.couscous, 4).status_code, 400)
+
+    def test_endpoint_groupe(self):
+        self.noter(self.clients[0], self.couscous, 5)
+        inconnu = "00000000-0000-0000-0000-000000000000"
+        with CaptureQueriesContext(connection) as requetes:
+            res = self.client.get(
+                "/api/avis/eligibilite/",
+                {"plats": f"{self.couscous.pk},{self.brik.pk},{inconnu}"},
+            )
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(requetes), 2)
+        par_plat = {e["plat"]: e for e in res.data}
+        self.assertTrue(par_plat[str(self.couscous.pk)]["peut_noter"])
+        self.assertEqual(par_plat[str(self.couscous.pk)]["avis"]["note"], 5)
+        self.assertTrue(par_plat[str(self.brik.pk)]["peut_noter"])
+        self.assertIsNone(par_plat[str(self.brik.pk)]["avis"])
+        self.assertFalse(par_plat[inconnu]["peut_noter"])
+
+        self.client.force_authenticate(self.nouveau)
+        res = self.client.get("/api/avis/eligibilite/", {"plats": str(self.brik.pk)})
+        self.assertFalse(res.data[0]["peut_noter"])
+
+    def test_endpoint_groupe_parametres_invalides(self):
+        self.client.force_authenticate(self.nouveau)
+        for plats in ("", "pas-un-uuid", ",".join(str(self.brik.pk)[:-3] + f"{i:03x}" for i in range(101))):
+            res = self.client.get("/api/avis/eligibilite/", {"plats": plats})
+            self.assertEqual(res.status_code, 400, plats)
+
+    def test_remplir_depuis_l_historique(self):
+        PlatAchete.objects.all().delete()
+        Commande.objects.filter(pk=self.commande.pk).update(statut=Commande.STATUT_REMIS)
+
+        remplir(lot=2)
+        remplir()  # idempotent
+
+        self.assertEqual(PlatAchete.objects.count(), 3 * 2 + 1)
+        self.assertTrue(PlatAchete.objects.filter(client=self.nouveau, plat=self.brik).exists())
+
+
+class ListesAvisTests(AvisTestCase):
+    def setUp(self):
+        super().setUp()
+        for client, note in zip(self.clients, (5, 3, 5)):
+            self.noter(client, self.couscous, note)
+        self.noter(self.clients[0], self.brik, 1)
+        self.client.force_authenticate(None)
+
+    def test_avis_par_plat_pagine_avec_resume(self):
+        res = self.client.get(
+            "/api/avis/avis-par-plat/", {"plat_id": str(self.couscous.pk), "page_size": 2}
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["resume"]["nb_avis"], 3)
+        self.assertAlmostEqual(res.data["resume"]["note_moyenne"], 4.33)
+        self.assertEqual(res.data["resume"]["repartition_notes"][5], 2)
+        self.assertEqual(len(res.data["results"]), 2)
+        self.assertIn("client_nom", res.data["results"][0])
+
+        suite = self.client.get(res.data["next"])
+        self.assertIsNone(suite.data["resume"])
+        self.assertEqual(len(suite.data["results"]), 1)
+        self.assertIsNone(suite.data["next"])
+
+    def test_filtres(self):
+        url = "/api/avis/avis-par-plat/"
+        plat_id = str(self.couscous.pk)
+        res = self.client.get(url, {"plat_id": plat_id, "note": 5})
+        self.assertEqual([a["note"] for a in res.data["results"]], [5, 5])
+        # le résumé reste global
+        self.assertEqual(res.data["resume"]["nb_avis"], 3)
+
+        aujourd_hui = timezone.localdate()
+        res = self.client.get(url, {"plat_id": plat_id, "du": aujourd_hui, "au": aujourd_hui})
+        self.assertEqual(len(res.data["results"]), 3)
+        hier = aujourd_hui - timedelta(days=1)
+        res = self.client.get(url, {"plat_id": plat_id, "au": hier})
+        self.assertEqual(res.data["results"], [])
+
+        for params in ({"note": 6}, {"du": "hier"}, {"au": "2026-13-01"}):
+            res = self.client.get(url, {"plat_id": plat_id, **params})
+            self.assertEqual(res.status_code, 400, params)
+        self.assertEqual(self.client.get(url, {"plat_id": "x"}).status_code, 400)
+
+    def test_avis_cuisinier(self):
+        autre = User.objects.create_user(username="autre", password="x", role=User.Role.CUISINIER)
+        self.client.force_authenticate(autre)
+        res = self.client.get("/api/avis/avis-cuisinier/")
+        self.assertEqual(res.data["results"], [])
+        self.assertIsNone(res.data["resume"]["note_moyenne"])
+
+        self.cuisinier.refresh_from_db()
+        self.client.force_authenticate(self.cuisinier)
+        with CaptureQueriesContext(connection) as requetes:
+            res = self.client.get("/api/avis/avis-cuisinier/")
+        self.assertEqual(len(requetes), 2)  # page + répartition
+        self.assertEqual(len(res.data["results"]), 4)
+        self.assertEqual(res.data["resume"]["nb_avis"], 4)
+        self.assertEqual(res.data["resume"]["repartition_notes"], {1: 1, 2: 0, 3: 1, 4: 0, 5: 2})
+        self.assertEqual(
+            {a["plat_nom"] for a in res.data["results"]}, {"Couscous", "Brik"}
+        )
+
+        res = self.client.get("/api/avis/avis-cuisinier/", {"note": 1})
+        self.assertEqual([a["plat_nom"] for a in res.data["results"]], ["Brik"])
@@ -5,6 +5,7 @@ from . import views
 urlpatterns = [
     path("laisser-avis/", views.LaisserAvisView.as_view(), name="laisser-avis"),
     path("mon-avis/", views.MonAvisView.as_view(), name="mon-avis"),
+    path("eligibilite/", views.EligibiliteAvisView.as_view(), name="avis-eligibilite"),
     path("avis-par-plat/", views.AvisParPlatView.as_view(), name="avis-par-plat"),
     path(
         "avis-cuisinier/",
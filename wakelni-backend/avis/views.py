@@ -1,15 +1,23 @@
 # avis/views.py
+import uuid
+from datetime import datetime, time, timedelta
+
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 
+from .eligibilite import plats_notables
 from .models import Avis
+from .notes import enregistrer_avis, resume_cuisinier, resume_plat
+from .pagination import AvisCursorPagination
 from .serializers import AvisSerializer, AvisCuisinierSerializer
 from plats.models import Plat
-from commandes.models import Commande
 
 User = get_user_model()
 
@@ -29,6 +37,16 @@ class LaisserAvisView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        try:
+            note = int(note)
+        except (TypeError, ValueError):
+            note = None
+        if note not in range(1, 6):
+            return Response(
+                {"detail": "La note doit être un entier de 1 à 5."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
         try:
             plat = Plat.objects.get(pk=plat_id, est_actif=True)
         except Plat.DoesNotExist:
@@ -37,14 +55,8 @@ class LaisserAvisView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        # ✅ Vérifier que l'utilisateur a bien commandé ce plat
-        a_commande_ce_plat = Commande.objects.filter(
-            client=user,
-            statut__in=["REMIS", "COMPLETEE"],
-            lignes__plat=plat,
-        ).exists()
-
-        if not a_commande_ce_plat:
+        # ✅ Vérifier que l'utilisateur a bien reçu ce plat (table PlatAchete)
+        if not plats_notables(user, [plat.pk]):
             return Response(
                 {
                     "detail": (
@@ -54,15 +66,8 @@ class LaisserAvisView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        avis, created = Avis.objects.get_or_create(
-            client=user,
-            plat=plat,
-            defaults={"note": note, "commentaire": commentaire},
-        )
-        if not created:
-            avis.note = note
-            avis.commentaire = commentaire
-            avis.save()
+        # avis + agrégats du plat et du cuisinier, dans la même transaction
+        avis, _cree = enregistrer_avis(user, plat, note, commentaire)
 
         serializer = AvisSerializer(avis)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -99,11 +104,120 @@ class MonAvisView(APIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+class EligibiliteAvisView(APIView):
+    """
+    GET /api/avis/eligibilite/?plats=<uuid>,<uuid>,...
+    Pour chaque plat demandé : le user connecté peut-il le noter, et son avis
+    s'il en a déjà laissé un. Deux requêtes quel que soit le nombre de plats
+    (remplace un appel mon-avis par carte).
+    """
+    permission_classes = [IsAuthenticated]
+    MAX_PLATS = 100
+
+    def get(self, request):
+        brut = request.query_params.get("plats", "")
+        try:
+            plat_ids = list(dict.fromkeys(
+                uuid.UUID(morceau.strip()) for morceau in brut.split(",") if morceau.strip()
+            ))
+        except ValueError:
+            return Response(
+                {"detail": "Paramètre 'plats' invalide (identifiants séparés par des virgules)."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not plat_ids:
+            return Response(
+                {"detail": "Paramètre 'plats' manquant."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(plat_ids) > self.MAX_PLATS:
+            return Response(
+                {"detail": f"Au plus {self.MAX_PLATS} plats par requête."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        notables = plats_notables(request.user, plat_ids)
+        avis = {
+            a.plat_id: a
+            for a in Avis.objects.filter(client=request.user, plat_id__in=plat_ids)
+        }
+        return Response(
+            [
+                {
+                    "plat": str(plat_id),
+                    "peut_noter": plat_id in notables,
+                    "avis": AvisSerializer(avis[plat_id]).data if plat_id in avis else None,
+                }
+                for plat_id in plat_ids
+            ],
+            status=status.HTTP_200_OK,
+        )
+
+
+def _debut_du_jour(jour):
+    return timezone.make_aware(datetime.combine(jour, time.min))
+
+
+def filtrer_avis(qs, params):
+    """
+    Filtres communs des listes d'avis :
+    ?note=1..5, ?du=AAAA-MM-JJ, ?au=AAAA-MM-JJ (bornes incluses).
+    Les bornes deviennent des datetimes : la colonne date reste comparée
+    telle quelle et l'index (…, date, id) sert aussi le filtre.
+    """
+    note = params.get("note")
+    if note:
+        if note not in {"1", "2", "3", "4", "5"}:
+            raise ValidationError({"note": "Entier de 1 à 5 attendu."})
+        qs = qs.filter(note=int(note))
+
+    for nom in ("du", "au"):
+        brut = params.get(nom)
+        if not brut:
+            continue
+        try:
+            jour = parse_date(brut)
+        except ValueError:
+            jour = None
+        if jour is None:
+            raise ValidationError({nom: "Date AAAA-MM-JJ attendue."})
+        if nom == "du":
+            qs = qs.filter(date__gte=_debut_du_jour(jour))
+        else:
+            qs = qs.filter(date__lt=_debut_du_jour(jour + timedelta(days=1)))
+    return qs
+
+
+def _liste_avis(request, view, qs, resume):
+    """
+    Page d'avis + en-tête. L'en-tête (agrégats globaux, sans les filtres)
+    n'est calculé qu'en première page.
+    """
+    qs = (
+        filtrer_avis(qs, request.query_params)
+        .select_related("client", "plat")
+        .only(
+            "id", "note", "commentaire", "date",
+            "client__email", "client__first_name", "client__last_name",
+            "plat__nom",
+        )
+    )
+    paginator = AvisCursorPagination()
+    page = paginator.paginate_queryset(qs, request, view=view)
+    premiere_page = not request.query_params.get(paginator.cursor_query_param)
+    return paginator.get_paginated_response(
+        AvisCuisinierSerializer(page, many=True).data,
+        resume=resume() if premiere_page else None,
+    )
+
+
 class AvisParPlatView(APIView):
     """
     GET /api/avis/avis-par-plat/?plat_id=...
-    Liste tous les avis d'un plat (pour la colonne "avis des autres clients"
-    dans ta modale côté client).
+    Avis d'un plat (pour la colonne "avis des autres clients" dans ta
+    modale côté client), paginés par curseur, plus récents d'abord.
+    Filtres : ?note=, ?du=, ?au=. En première page, "resume" donne la
+    moyenne et la répartition des notes du plat.
     """
     permission_classes = [AllowAny]
 
@@ -114,22 +228,29 @@ class AvisParPlatView(APIView):
                 {"detail": "Paramètre 'plat_id' manquant."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        try:
+            plat = Plat.objects.get(pk=uuid.UUID(plat_id))
+        except ValueError:
+            return Response(
+                {"detail": "Paramètre 'plat_id' invalide."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Plat.DoesNotExist:
+            return Response(
+                {"detail": "Plat introuvable."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
 
-        avis_qs = (
-            Avis.objects
-            .filter(plat_id=plat_id)
-            .select_related("client")
-            .order_by("-date")
+        return _liste_avis(
+            request, self, Avis.objects.filter(plat=plat), lambda: resume_plat(plat)
         )
 
-        serializer = AvisCuisinierSerializer(avis_qs, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
-
 
 class AvisRecusCuisinierView(APIView):
     """
     GET /api/avis/avis-cuisinier/
-    Liste tous les avis sur les plats du cuisinier connecté.
+    Avis sur les plats du cuisinier connecté, paginés par curseur
+    (mêmes filtres et même en-tête que avis-par-plat).
     Utilisé par la page /cuisinier/avis.
     """
     permission_classes = [IsAuthenticated]
@@ -141,12 +262,9 @@ class AvisRecusCuisinierView(APIView):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        avis_qs = (
-            Avis.objects
-            .filter(plat__cuisinier=request.user)
-            .select_related("client", "plat")
-            .order_by("-date")
+        return _liste_avis(
+            request,
+            self,
+            Avis.objects.filter(cuisinier=request.user),
+            lambda: resume_cuisinier(request.user),
         )
-
-        serializer = AvisCuisinierSerializer(avis_qs, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
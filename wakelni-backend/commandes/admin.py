@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Commande, LigneCommande
+from .models import Commande, HistoriqueStatutCommande, LigneCommande
 
 
 @admin.register(Commande)
@@ -12,3 +12,9 @@ class CommandeAdmin(admin.ModelAdmin):
 @admin.register(LigneCommande)
 class LigneCommandeAdmin(admin.ModelAdmin):
     pass
+
+
+@admin.register(HistoriqueStatutCommande)
+class HistoriqueStatutCommandeAdmin(admin.ModelAdmin):
+    list_display = ("commande", "ancien_statut", "nouveau_statut", "modifie_par", "role", "cree_le")
+    list_filter = ("nouveau_statut", "role")
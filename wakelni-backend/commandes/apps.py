@@ -1,6 +1,8 @@
-
 from django.apps import AppConfig
 
 class CommandesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'commandes'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,233 @@
+# commandes/flux.py
+"""
+File de commandes en temps réel pour les cuisiniers (Server-Sent Events).
+
+Chaque cuisinier a un canal « cuisinier:<id> ». Les changements de statut
+(commandes/transitions.py) et les commandes payées (paiements/services.py)
+y sont publiés après le commit, via le signal commandes.signals.commande_modifiee.
+
+Broker choisi par COMMANDES_FLUX_BROKER :
+- "memoire" (défaut) : dans le processus, suffisant en dev ou avec un seul worker
+- "redis://..."       : pub/sub Redis (ou compatible), nécessaire dès que
+  plusieurs processus servent l'API
+"""
+import json
+import logging
+import queue
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .models import Commande, LigneCommande
+
+logger = logging.getLogger(__name__)
+
+# file d'un abonné : au-delà, il est trop lent, on coupe (il se reconnecte
+# et repart d'un snapshot frais)
+TAILLE_FILE = 100
+
+STATUTS_ACTIFS = (
+    Commande.STATUT_EN_ATTENTE,
+    Commande.STATUT_EN_PREPARATION,
+    Commande.STATUT_PRET,
+)
+
+
+def canal(cuisinier_id):
+    return f"cuisinier:{cuisinier_id}"
+
+
+# ---------- brokers ----------
+
+class AbonnementMemoire:
+    def __init__(self, broker, canal):
+        self.broker = broker
+        self.canal = canal
+        self.file = queue.Queue(maxsize=TAILLE_FILE)
+        self.deborde = False
+
+    def lire(self, timeout):
+        """Message suivant, ou None au bout de `timeout` secondes."""
+        try:
+            return self.file.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def fermer(self):
+        self.broker._desabonner(self)
+
+
+class BrokerMemoire:
+    def __init__(self):
+        self._abonnes = {}
+        self._verrou = threading.Lock()
+
+    def publier(self, canal, message):
+        with self._verrou:
+            abonnes = list(self._abonnes.get(canal, ()))
+        for abonnement in abonnes:
+            try:
+                abonnement.file.put_nowait(message)
+            except queue.Full:
+                abonnement.deborde = True
+
+    def abonner(self, canal):
+        abonnement = AbonnementMemoire(self, canal)
+        with self._verrou:
+            self._abonnes.setdefault(canal, set()).add(abonnement)
+        return abonnement
+
+    def _desabonner(self, abonnement):
+        with self._verrou:
+            abonnes = self._abonnes.get(abonnement.canal)
+            if abonnes is not None:
+                abonnes.discard(abonnement)
+                if not abonnes:
+                    del self._abonnes[abonnement.canal]
+
+
+class AbonnementRedis:
+    deborde = False  # Redis coupe lui-même les abonnés trop lents
+
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    def lire(self, timeout):
+        message = self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if message is None:
+            return None
+        data = message["data"]
+        return data.decode() if isinstance(data, bytes) else data
+
+    def fermer(self):
+        self.pubsub.close()
+
+
+class BrokerRedis:
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImproperlyConfigured(
+                "COMMANDES_FLUX_BROKER pointe vers Redis : installer le paquet `redis`."
+            ) from e
+        self.client = redis.Redis.from_url(url)
+
+    def publier(self, canal, message):
+        self.client.publish(canal, message)
+
+    def abonner(self, canal):
+        pubsub = self.client.pubsub()
+        pubsub.subscribe(canal)
+        return AbonnementRedis(pubsub)
+
+
+@lru_cache(maxsize=None)
+def _broker(reglage):
+    if reglage == "memoire":
+        return BrokerMemoire()
+    if reglage.startswith(("redis://", "rediss://", "unix://")):
+        return BrokerRedis(reglage)
+    raise ImproperlyConfigured(f"COMMANDES_FLUX_BROKER inconnu : {reglage!r}.")
+
+
+def get_broker():
+    return _broker(settings.COMMANDES_FLUX_BROKER)
+
+
+@receiver(setting_changed)
+def _reinitialiser_broker(setting, **kwargs):
+    if setting == "COMMANDES_FLUX_BROKER":
+        _broker.cache_clear()
+
+
+# ---------- messages ----------
+
+def resumes(commandes):
+    """
+    Forme compacte d'une commande pour la file du cuisinier (mêmes noms de
+    champs que CommandeClientSerializer). Une seule requête pour les lignes.
+    """
+    commandes = list(commandes)
+    lignes = {}
+    for ligne in (
+        LigneCommande.objects
+        .filter(commande__in=commandes)
+        .values("id", "commande_id", "plat__nom", "quantite", "sous_total")
+        .order_by("id")
+    ):
+        lignes.setdefault(ligne["commande_id"], []).append({
+            "id": ligne["id"],
+            "plat_nom": ligne["plat__nom"],
+            "quantite": ligne["quantite"],
+            "sous_total": str(ligne["sous_total"]),
+        })
+    return [
+        {
+            "id": c.id,
+            "statut": c.statut,
+            "total": str(c.total),
+            "created_at": c.created_at.isoformat(),
+            "updated_at": c.updated_at.isoformat(),
+            "lignes": lignes.get(c.id, []),
+            "transitions_possibles": c.transitions_possibles(Commande.ROLE_CUISINIER),
+        }
+        for c in commandes
+    ]
+
+
+def snapshot(cuisinier_id):
+    """Commandes actives (EN_ATTENTE -> PRET) du cuisinier, plus anciennes d'abord."""
+    commandes = Commande.objects.filter(
+        cuisinier_id=cuisinier_id, statut__in=STATUTS_ACTIFS
+    ).order_by("created_at")
+    return {"type": "snapshot", "commandes": resumes(commandes)}
+
+
+def publier(commande, type_evenement):
+    """
+    type_evenement : "nouvelle" (commande payée), "modifiee" ou "annulee".
+    Une erreur du broker est journalisée sans remonter : la transition est
+    déjà commitée, le cuisinier la verra au prochain snapshot.
+    """
+    if not commande.cuisinier_id:
+        return  # pas encore payée : invisible pour le cuisinier
+    try:
+        (resume,) = resumes([commande])
+        message = json.dumps({"type": type_evenement, "commande": resume})
+        get_broker().publier(canal(commande.cuisinier_id), message)
+    except Exception:
+        logger.exception("Publication de la commande %s impossible", commande.pk)
+
+
+def evenements(abonnement, depart, ping, duree_max, horloge=time.monotonic):
+    """
+    Corps de la réponse text/event-stream : `depart` (le snapshot) puis les
+    messages du canal, avec un commentaire « ping » toutes les `ping` secondes
+    pour garder la connexion ouverte derrière les proxys. Le flux se termine
+    après `duree_max` secondes (ou si l'abonné déborde) ; EventSource se
+    reconnecte tout seul et reçoit un nouveau snapshot.
+    """
+    try:
+        yield "retry: 3000\n\n"
+        yield f"data: {json.dumps(depart)}\n\n"
+        fin = horloge() + duree_max
+        dernier_envoi = horloge()
+        while not abonnement.deborde:
+            restant = fin - horloge()
+            if restant <= 0:
+                break
+            message = abonnement.lire(timeout=min(ping, restant))
+            if message is not None:
+                yield f"data: {message}\n\n"
+                dernier_envoi = horloge()
+            elif horloge() - dernier_envoi >= ping:
+                yield ": ping\n\n"
+                dernier_envoi = horloge()
+    finally:
+        abonnement.fermer()
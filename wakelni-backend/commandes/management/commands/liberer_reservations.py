@@ -0,0 +1,20 @@
+# commandes/management/commands/liberer_reservations.py
+from django.core.management.base import BaseCommand
+
+from commandes.reservations import liberer_expirees
+
+
+class Command(BaseCommand):
+    help = "Libère le stock des réservations expirées (à lancer toutes les minutes)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lot", type=int, default=500)
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            liberees = liberer_expirees(limite=options["lot"])
+            total += liberees
+            if liberees < options["lot"]:
+                break
+        self.stdout.write(self.style.SUCCESS(f"{total} réservation(s) libérée(s)."))
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commandes', '0003_commande_updated_at'),
+        ('plats', '0011_plat_stock_reserve'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReservationStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantite', models.PositiveIntegerField()),
+                ('prix_unitaire', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('statut', models.CharField(choices=[('ACTIVE', 'Active'), ('CONSOMMEE', 'Consommée'), ('LIBEREE', 'Libérée')], default='ACTIVE', max_length=10)),
+                ('expire_le', models.DateTimeField()),
+                ('cree_le', models.DateTimeField(auto_now_add=True)),
+                ('commande', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='commandes.commande')),
+                ('plat', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='plats.plat')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['statut', 'expire_le'], name='reservation_expiration_idx')],
+            },
+        ),
+    ]
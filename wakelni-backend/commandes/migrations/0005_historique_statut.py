@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commandes', '0004_reservation_stock'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HistoriqueStatutCommande',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ancien_statut', models.CharField(choices=[('EN_ATTENTE', 'En attente'), ('EN_PREPARATION', 'En préparation'), ('PRET', 'Prêt'), ('REMIS', 'Remis'), ('COMPLETEE', 'Complétée'), ('ANNULEE', 'Annulée')], max_length=20)),
+                ('nouveau_statut', models.CharField(choices=[('EN_ATTENTE', 'En attente'), ('EN_PREPARATION', 'En préparation'), ('PRET', 'Prêt'), ('REMIS', 'Remis'), ('COMPLETEE', 'Complétée'), ('ANNULEE', 'Annulée')], max_length=20)),
+                ('role', models.CharField(max_length=20)),
+                ('cree_le', models.DateTimeField(auto_now_add=True)),
+                ('commande', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='historique', to='commandes.commande')),
+                ('modifie_par', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['cree_le', 'id'],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commandes', '0005_historique_statut'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='commande',
+            name='cuisinier',
+            field=models.ForeignKey(blank=True, db_index=False, limit_choices_to={'role': 'CUISINIER'}, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='commandes_recues', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='commande',
+            index=models.Index(fields=['cuisinier', '-created_at'], name='commande_cuisinier_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def remplir_cuisinier(apps, schema_editor):
+    Commande = apps.get_model("commandes", "Commande")
+    LigneCommande = apps.get_model("commandes", "LigneCommande")
+
+    # un seul UPDATE ; sans lignes (pas encore payée) la commande reste sans cuisinier
+    Commande.objects.filter(cuisinier__isnull=True).update(
+        cuisinier=Subquery(
+            LigneCommande.objects.filter(commande=OuterRef("pk"))
+            .values("plat__cuisinier")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commandes', '0006_commande_cuisinier'),
+    ]
+
+    operations = [
+        migrations.RunPython(remplir_cuisinier, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commandes', '0007_backfill_commande_cuisinier'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='commande',
+            index=models.Index(condition=models.Q(('statut', 'EN_ATTENTE'), ('stripe_session_id__gt', '')), fields=['id'], name='commande_session_attente_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='commande',
+            index=models.Index(fields=['updated_at', 'id'], name='commande_maj_idx'),
+        ),
+    ]
@@ -3,6 +3,7 @@ from decimal import Decimal
 
 from django.conf import settings
 from django.db import models
+from django.db.models import Q
 
 from plats.models import Plat
 
@@ -25,13 +26,42 @@ class Commande(models.Model):
         (STATUT_ANNULEE, "Annulée"),
     ]
 
+    # Qui agit : rôle de l'utilisateur, ou SYSTEME (webhook, réconciliation)
+    ROLE_CLIENT = "CLIENT"
+    ROLE_CUISINIER = "CUISINIER"
+    ROLE_SYSTEME = "SYSTEME"
+
+    # (statut actuel, nouveau statut) -> rôles autorisés.
+    # Tout ce qui n'est pas listé est refusé (commandes/transitions.py).
+    TRANSITIONS = {
+        (STATUT_EN_ATTENTE, STATUT_EN_PREPARATION): {ROLE_CUISINIER},
+        (STATUT_EN_ATTENTE, STATUT_ANNULEE): {ROLE_CLIENT, ROLE_CUISINIER, ROLE_SYSTEME},
+        (STATUT_EN_PREPARATION, STATUT_PRET): {ROLE_CUISINIER},
+        (STATUT_EN_PREPARATION, STATUT_ANNULEE): {ROLE_CUISINIER},
+        (STATUT_PRET, STATUT_REMIS): {ROLE_CUISINIER},
+        (STATUT_REMIS, STATUT_COMPLETEE): {ROLE_CLIENT, ROLE_CUISINIER},
+    }
+
     client = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name="commandes",
     )
+    # le panier n'accepte qu'un cuisinier : renseigné au paiement
+    # (paiements/services.py), le tableau de bord cuisinier filtre dessus
+    # au lieu de passer par lignes -> plat
+    cuisinier = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="commandes_recues",
+        limit_choices_to={"role": "CUISINIER"},
+        db_index=False,  # couvert par commande_cuisinier_idx
+    )
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     statut = models.CharField(
         max_length=20,
@@ -53,6 +83,52 @@ class Commande(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["cuisinier", "-created_at"], name="commande_cuisinier_idx"),
+            # réconciliation Stripe (paiements/reconciliation.py) : lots par
+            # pk parmi les commandes en attente liées à une session...
+            models.Index(
+                fields=["id"],
+                name="commande_session_attente_idx",
+                condition=Q(statut="EN_ATTENTE", stripe_session_id__gt=""),
+            ),
+            # ... ou modifiées depuis la dernière exécution
+            models.Index(fields=["updated_at", "id"], name="commande_maj_idx"),
+        ]
+
+    def transitions_possibles(self, role):
+        return [
+            nouveau
+            for (actuel, nouveau), roles in self.TRANSITIONS.items()
+            if actuel == self.statut and role in roles
+        ]
+
+
+class HistoriqueStatutCommande(models.Model):
+    """Un changement de statut : qui, quoi, quand (écrit par commandes/transitions.py)."""
+
+    commande = models.ForeignKey(
+        Commande,
+        on_delete=models.CASCADE,
+        related_name="historique",
+    )
+    ancien_statut = models.CharField(max_length=20, choices=Commande.STATUT_CHOICES)
+    nouveau_statut = models.CharField(max_length=20, choices=Commande.STATUT_CHOICES)
+    modifie_par = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    role = models.CharField(max_length=20)
+    cree_le = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["cree_le", "id"]
+
+    def __str__(self):
+        return f"#{self.commande_id} {self.ancien_statut} -> {self.nouveau_statut}"
 
 
 class LigneCommande(models.Model):
@@ -75,3 +151,50 @@ class LigneCommande(models.Model):
 
     def __str__(self):
         return f"{self.quantite} x {self.plat.nom} (commande #{self.commande_id})"
+
+
+class ReservationStock(models.Model):
+    """
+    Portions d'un plat bloquées pour une commande pendant le paiement.
+
+    ACTIVE    -> Plat.stock_reserve inclut la quantité
+    CONSOMMEE -> paiement confirmé, Plat.stock a été décrémenté
+    LIBEREE   -> expirée ou annulée, la quantité est rendue
+    """
+    STATUT_ACTIVE = "ACTIVE"
+    STATUT_CONSOMMEE = "CONSOMMEE"
+    STATUT_LIBEREE = "LIBEREE"
+
+    STATUT_CHOICES = [
+        (STATUT_ACTIVE, "Active"),
+        (STATUT_CONSOMMEE, "Consommée"),
+        (STATUT_LIBEREE, "Libérée"),
+    ]
+
+    commande = models.ForeignKey(
+        Commande,
+        on_delete=models.CASCADE,
+        related_name="reservations",
+    )
+    plat = models.ForeignKey(
+        Plat,
+        on_delete=models.CASCADE,
+        related_name="reservations",
+    )
+    quantite = models.PositiveIntegerField()
+    prix_unitaire = models.DecimalField(max_digits=8, decimal_places=2)
+    statut = models.CharField(
+        max_length=10,
+        choices=STATUT_CHOICES,
+        default=STATUT_ACTIVE,
+    )
+    expire_le = models.DateTimeField()
+    cree_le = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["statut", "expire_le"], name="reservation_expiration_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.quantite} x {self.plat_id} pour commande #{self.commande_id} ({self.statut})"
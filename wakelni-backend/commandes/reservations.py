@@ -0,0 +1,199 @@
+# commandes/reservations.py
+"""
+Réservation atomique du stock entre le panier, le checkout et le paiement.
+
+- reserver()  : au checkout, bloque les portions avec un UPDATE conditionnel
+                (stock - stock_reserve >= quantité) -> pas de survente.
+- consommer() : au paiement, décrémente stock ET stock_reserve
+                (un seul UPDATE ... WHERE stock >= quantité pour tous les plats).
+- liberer()   : annulation ou expiration (TTL), rend les portions réservées.
+
+Une réservation n'est consommée ou libérée qu'une seule fois : la
+libération est un UPDATE conditionnel sur le statut, et la consommation
+verrouille les réservations de la commande.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+from plats import cache
+from plats.models import Plat
+
+from .models import ReservationStock
+
+
+class StockInsuffisant(Exception):
+    def __init__(self, plat_id, message="Stock insuffisant."):
+        super().__init__(message)
+        self.plat_id = plat_id
+
+
+def _stock_modifie():
+    # update() ne passe pas par les signaux de Plat : version du catalogue
+    # (cache + ETag) à faire avancer nous-mêmes, après le commit
+    transaction.on_commit(cache.invalider)
+
+
+def duree_reservation():
+    return timedelta(minutes=getattr(settings, "RESERVATION_STOCK_TTL_MINUTES", 35))
+
+
+def reserver(commande, lignes, expire_le=None):
+    """
+    Bloque le stock pour les lignes [(plat, quantite), ...] d'une commande.
+    Tout ou rien : lève StockInsuffisant et n'applique aucune réservation
+    si un des plats n'a plus assez de portions disponibles.
+    """
+    expire_le = expire_le or timezone.now() + duree_reservation()
+    # ordre stable des UPDATE -> pas d'interblocage entre deux checkouts
+    lignes = sorted(lignes, key=lambda ligne: str(ligne[0].pk))
+
+    with transaction.atomic():
+        liberer_expirees(plat_ids=[plat.pk for plat, _q in lignes])
+
+        for plat, quantite in lignes:
+            ok = Plat.objects.filter(
+                pk=plat.pk,
+                est_actif=True,
+                stock__gte=F("stock_reserve") + quantite,
+            ).update(
+                stock_reserve=F("stock_reserve") + quantite,
+                modifie_le=timezone.now(),
+            )
+            if not ok:
+                raise StockInsuffisant(
+                    plat.pk, f"Stock insuffisant pour le plat {plat.nom}."
+                )
+        _stock_modifie()
+
+        return ReservationStock.objects.bulk_create([
+            ReservationStock(
+                commande=commande,
+                plat=plat,
+                quantite=quantite,
+                prix_unitaire=plat.prix,
+                expire_le=expire_le,
+            )
+            for plat, quantite in lignes
+        ])
+
+
+def _changer_statut(reservation, ancien, nouveau):
+    return ReservationStock.objects.filter(
+        pk=reservation.pk, statut=ancien
+    ).update(statut=nouveau)
+
+
+def _decrementer_en_lot(reservations, champs, condition):
+    """
+    Un seul UPDATE pour tous les plats :
+    champ = champ - CASE plat WHEN ... THEN quantité END, pour chaque champ,
+    WHERE (plat = a AND condition(a)) OR (plat = b AND condition(b)) ...
+    Lève StockInsuffisant si une des conditions n'est pas remplie.
+    """
+    if not reservations:
+        return
+    filtre = Q()
+    for r in reservations:
+        filtre |= Q(pk=r.plat_id) & condition(r.quantite)
+    quantite = Case(
+        *[When(pk=r.plat_id, then=Value(r.quantite)) for r in reservations],
+        default=Value(0),
+    )
+    modifies = Plat.objects.filter(filtre).update(
+        modifie_le=timezone.now(),
+        **{champ: F(champ) - quantite for champ in champs},
+    )
+    if modifies != len(reservations):
+        raise StockInsuffisant(None)
+    _stock_modifie()
+
+
+def consommer(commande):
+    """
+    Paiement confirmé : transforme les réservations de la commande en
+    sortie de stock, en un nombre constant de requêtes.
+    Une réservation déjà libérée (paiement arrivé après l'expiration)
+    est reprise sur le stock disponible si possible ; sinon StockInsuffisant
+    et rien n'est modifié. Retourne les réservations de la commande.
+    """
+    with transaction.atomic():
+        # verrou : une libération concurrente attend la fin de la transaction
+        reservations = list(
+            ReservationStock.objects
+            .select_for_update()
+            .select_related("plat")
+            .filter(commande=commande)
+            .order_by("plat_id")
+        )
+        actives = [r for r in reservations if r.statut == ReservationStock.STATUT_ACTIVE]
+        liberees = [r for r in reservations if r.statut == ReservationStock.STATUT_LIBEREE]
+
+        _decrementer_en_lot(
+            actives,
+            ("stock", "stock_reserve"),
+            lambda q: Q(stock__gte=q, stock_reserve__gte=q),
+        )
+        _decrementer_en_lot(
+            liberees,
+            ("stock",),
+            lambda q: Q(stock__gte=F("stock_reserve") + q),
+        )
+
+        a_consommer = [r.pk for r in actives + liberees]
+        if a_consommer:
+            ReservationStock.objects.filter(pk__in=a_consommer).update(
+                statut=ReservationStock.STATUT_CONSOMMEE
+            )
+            for r in actives + liberees:
+                r.statut = ReservationStock.STATUT_CONSOMMEE
+        return reservations
+
+
+def liberer(reservations):
+    """Rend les portions des réservations encore actives ; retourne le nombre libéré."""
+    liberees = 0
+    for reservation in reservations:
+        with transaction.atomic():
+            if _changer_statut(
+                reservation, ReservationStock.STATUT_ACTIVE, ReservationStock.STATUT_LIBEREE
+            ):
+                Plat.objects.filter(
+                    pk=reservation.plat_id, stock_reserve__gte=reservation.quantite
+                ).update(
+                    stock_reserve=F("stock_reserve") - reservation.quantite,
+                    modifie_le=timezone.now(),
+                )
+                _stock_modifie()
+                liberees += 1
+    return liberees
+
+
+def liberer_commande(commande):
+    return liberer(
+        ReservationStock.objects.filter(
+            commande=commande, statut=ReservationStock.STATUT_ACTIVE
+        )
+    )
+
+
+def prolonger_commande(commande, expire_le):
+    """Repousse à `expire_le` les réservations actives de la commande qui expirent avant."""
+    return ReservationStock.objects.filter(
+        commande=commande,
+        statut=ReservationStock.STATUT_ACTIVE,
+        expire_le__lt=expire_le,
+    ).update(expire_le=expire_le)
+
+
+def liberer_expirees(plat_ids=None, limite=500):
+    qs = ReservationStock.objects.filter(
+        statut=ReservationStock.STATUT_ACTIVE,
+        expire_le__lte=timezone.now(),
+    )
+    if plat_ids is not None:
+        qs = qs.filter(plat_id__in=plat_ids)
+    return liberer(qs.order_by("expire_le")[:limite])
@@ -2,7 +2,7 @@
 from rest_framework import serializers
 from .models import Commande, LigneCommande
 from plats.models import Plat
-from notifications_app.models import Notification
+from notifications_app.services import notifier
 
 class LigneCommandeSerializer(serializers.ModelSerializer):
     class Meta:
@@ -17,8 +17,8 @@ class CommandeSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Commande
-        fields = ('id', 'client', 'cuisinier', 'statut', 'total', 'lignes', 'cree_le')
-        read_only_fields = ('total', 'cree_le', 'statut')
+        fields = ('id', 'client', 'cuisinier', 'statut', 'total', 'lignes', 'created_at')
+        read_only_fields = ('total', 'created_at', 'statut')
 
     def create(self, validated_data):
         lignes_data = validated_data.pop('lignes')
@@ -56,10 +56,7 @@ class CommandeSerializer(serializers.ModelSerializer):
         commande.total = total
         commande.save()
 
-        Notification.objects.create(
-            destinataire=cuisinier,
-            message=f"Nouvelle commande #{commande.id} de {client.username}",
-        )
+        notifier(cuisinier.id, f"Nouvelle commande #{commande.id} de {client.username}")
 
         return commande
     
@@ -78,7 +75,14 @@ class CommandeClientSerializer(serializers.ModelSerializer):
     """Commande complète pour l'historique du client."""
 
     lignes = LigneCommandeClientSerializer(many=True, read_only=True)
+    transitions_possibles = serializers.SerializerMethodField()
 
     class Meta:
         model = Commande
-        fields = ("id", "created_at", "statut", "total", "lignes")
+        fields = ("id", "created_at", "statut", "total", "lignes", "transitions_possibles")
+
+    def get_transitions_possibles(self, obj):
+        # statuts que l'utilisateur courant peut choisir (Commande.TRANSITIONS)
+        request = self.context.get("request")
+        role = getattr(getattr(request, "user", None), "role", None)
+        return obj.transitions_possibles(role)
@@ -0,0 +1,28 @@
+# commandes/signals.py
+from django.db import transaction
+from django.dispatch import Signal, receiver
+
+from . import flux
+from .models import Commande
+
+# Envoyé après le commit : commande payée (type_evenement="nouvelle") ou
+# changement de statut ("modifiee" / "annulee"). Argument : commande.
+commande_modifiee = Signal()
+
+# Envoyé par transitionner() DANS la transaction du changement de statut :
+# les receivers écrivent leurs données dérivées de façon atomique avec lui.
+# Arguments : commande, ancien_statut, nouveau_statut.
+statut_commande_change = Signal()
+
+
+def signaler_apres_commit(commande, type_evenement):
+    transaction.on_commit(
+        lambda: commande_modifiee.send(
+            sender=Commande, commande=commande, type_evenement=type_evenement
+        )
+    )
+
+
+@receiver(commande_modifiee)
+def publier_au_cuisinier(sender, commande, type_evenement, **kwargs):
+    flux.publier(commande, type_evenement)
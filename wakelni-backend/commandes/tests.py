@@ -0,0 +1,319 @@
+import json
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from plats import cache
+from plats.models import Plat
+
+from . import flux
+from .models import Commande, HistoriqueStatutCommande, LigneCommande, ReservationStock
+from .reservations import (
+    StockInsuffisant,
+    consommer,
+    liberer_commande,
+    liberer_expirees,
+    reserver,
+)
+from .transitions import TransitionConcurrente, TransitionInvalide, transitionner
+from .views import JetonFlux
+
+User = get_user_model()
+
+
+def creer_utilisateurs():
+    client = User.objects.create_user(username="client", password="x", role=User.Role.CLIENT)
+    cuisinier = User.objects.create_user(
+        username="chef", password="x", role=User.Role.CUISINIER
+    )
+    return client, cuisinier
+
+
+class ReservationTests(TestCase):
+    def setUp(self):
+        self.client_user, cuisinier = creer_utilisateurs()
+        self.plat = Plat.objects.create(
+            cuisinier=cuisinier, nom="Couscous", prix=Decimal("12"), stock=3
+        )
+
+    def commande(self):
+        return Commande.objects.create(client=self.client_user, total=Decimal("0"))
+
+    def test_cycle_reserver_consommer(self):
+        commande = self.commande()
+        reserver(commande, [(self.plat, 2)])
+        self.plat.refresh_from_db()
+        self.assertEqual((self.plat.stock, self.plat.stock_reserve), (3, 2))
+
+        with self.assertRaises(StockInsuffisant):
+            reserver(self.commande(), [(self.plat, 2)])
+
+        consommer(commande)
+        consommer(commande)  # rejouer ne décrémente pas deux fois
+        self.plat.refresh_from_db()
+        self.assertEqual((self.plat.stock, self.plat.stock_reserve), (1, 0))
+
+    def test_annulation_et_expiration_liberent(self):
+        commande = self.commande()
+        reserver(commande, [(self.plat, 2)])
+        liberer_commande(commande)
+        self.plat.refresh_from_db()
+        self.assertEqual(self.plat.stock_reserve, 0)
+
+        expiree = self.commande()
+        reserver(expiree, [(self.plat, 3)], expire_le=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(liberer_expirees(), 1)
+        self.plat.refresh_from_db()
+        self.assertEqual(self.plat.stock_reserve, 0)
+
+        # paiement arrivé après l'expiration : repris sur le stock disponible
+        consommer(expiree)
+        self.plat.refresh_from_db()
+        self.assertEqual(self.plat.stock, 0)
+        self.assertEqual(
+            ReservationStock.objects.get(commande=expiree).statut,
+            ReservationStock.STATUT_CONSOMMEE,
+        )
+
+    def test_catalogue_invalide_a_chaque_mouvement(self):
+        modifie_le = self.plat.modifie_le
+        payee, annulee = self.commande(), self.commande()
+        for operation in (
+            lambda: reserver(payee, [(self.plat, 1)]),
+            lambda: consommer(payee),
+            lambda: reserver(annulee, [(self.plat, 1)]),
+            lambda: liberer_commande(annulee),
+        ):
+            version = cache.version()
+            with self.captureOnCommitCallbacks(execute=True):
+                operation()
+            self.assertGreater(cache.version(), version)
+            self.plat.refresh_from_db()
+            self.assertGreater(self.plat.modifie_le, modifie_le)
+            modifie_le = self.plat.modifie_le
+
+
+class TransitionTests(TestCase):
+    def setUp(self):
+        self.client_user, self.cuisinier = creer_utilisateurs()
+        plat = Plat.objects.create(cuisinier=self.cuisinier, nom="Mloukhia", prix=Decimal("9"))
+        self.commande = Commande.objects.create(
+            client=self.client_user, cuisinier=self.cuisinier, total=Decimal("9")
+        )
+        LigneCommande.objects.create(commande=self.commande, plat=plat, sous_total=Decimal("9"))
+        self.api = APIClient()
+        self.api.force_authenticate(self.cuisinier)
+
+    def changer(self, statut):
+        return self.api.patch(
+            f"/api/commandes/{self.commande.pk}/changer-statut/", {"statut": statut}, format="json"
+        )
+
+    def test_cycle_et_historique(self):
+        for statut in ("EN_PREPARATION", "PRET", "REMIS"):
+            r = self.changer(statut)
+            self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.data["transitions_possibles"], ["COMPLETEE"])
+
+        historique = list(
+            HistoriqueStatutCommande.objects.values_list(
+                "ancien_statut", "nouveau_statut", "modifie_par", "role"
+            )
+        )
+        self.assertEqual(historique, [
+            ("EN_ATTENTE", "EN_PREPARATION", self.cuisinier.pk, "CUISINIER"),
+            ("EN_PREPARATION", "PRET", self.cuisinier.pk, "CUISINIER"),
+            ("PRET", "REMIS", self.cuisinier.pk, "CUISINIER"),
+        ])
+
+    def test_commandes_du_cuisinier(self):
+        autre = User.objects.create_user(username="chef2", password="x", role=User.Role.CUISINIER)
+        Commande.objects.create(client=self.client_user, cuisinier=autre, total=Decimal("5"))
+
+        r = self.api.get("/api/commandes/mes-commandes/")
+        self.assertEqual([c["id"] for c in r.data], [self.commande.pk])
+
+        self.api.force_authenticate(autre)
+        self.assertEqual(self.changer("EN_PREPARATION").status_code, 404)
+
+    def test_transition_interdite(self):
+        Commande.objects.filter(pk=self.commande.pk).update(statut=Commande.STATUT_COMPLETEE)
+        r = self.changer("EN_ATTENTE")
+        self.assertEqual(r.status_code, 400)
+        self.commande.refresh_from_db()
+        self.assertEqual(self.commande.statut, Commande.STATUT_COMPLETEE)
+
+        # le client ne fait pas avancer la préparation
+        with self.assertRaises(TransitionInvalide):
+            transitionner(self.commande, Commande.STATUT_PRET, par=self.client_user)
+
+    def test_course_perdue(self):
+        perimee = Commande.objects.get(pk=self.commande.pk)
+        transitionner(self.commande, Commande.STATUT_EN_PREPARATION, par=self.cuisinier)
+
+        # lu EN_ATTENTE, mais déjà passé en préparation : rien n'est écrasé
+        with self.assertRaises(TransitionConcurrente) as ctx:
+            transitionner(perimee, Commande.STATUT_ANNULEE, par=self.client_user)
+        self.assertEqual(ctx.exception.statut_actuel, Commande.STATUT_EN_PREPARATION)
+        self.commande.refresh_from_db()
+        self.assertEqual(self.commande.statut, Commande.STATUT_EN_PREPARATION)
+        self.assertEqual(HistoriqueStatutCommande.objects.count(), 1)
+
+
+class FluxCuisinierTests(TestCase):
+    def setUp(self):
+        self.client_user, self.cuisinier = creer_utilisateurs()
+        self.plat = Plat.objects.create(cuisinier=self.cuisinier, nom="Lablabi", prix=Decimal("6"))
+        self.active = self.commande_payee()
+        self.remise = self.commande_payee(statut=Commande.STATUT_REMIS)
+        self.api = APIClient()
+        self.api.force_authenticate(self.cuisinier)
+
+    def commande_payee(self, statut=Commande.STATUT_EN_ATTENTE):
+        commande = Commande.objects.create(
+            client=self.client_user, cuisinier=self.cuisinier, statut=statut, total=Decimal("6")
+        )
+        LigneCommande.objects.create(commande=commande, plat=self.plat, sous_total=Decimal("6"))
+        return commande
+
+    def ouvrir(self, **params):
+        with self.settings(COMMANDES_FLUX_PING_S=0.01, COMMANDES_FLUX_DUREE_MAX_S=1):
+            r = self.api.get("/api/commandes/flux/", params, HTTP_ACCEPT="text/event-stream")
+        self.addCleanup(r.close)
+        return r
+
+    @staticmethod
+    def prochain_message(r):
+        for morceau in r.streaming_content:
+            morceau = morceau.decode()
+            if morceau.startswith("data: "):
+                return json.loads(morceau[len("data: "):])
+        return None
+
+    def test_snapshot_puis_transitions(self):
+        r = self.ouvrir()
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r["Content-Type"], "text/event-stream")
+
+        depart = self.prochain_message(r)
+        self.assertEqual(depart["type"], "snapshot")
+        (commande,) = depart["commandes"]  # REMIS n'est plus dans la file
+        self.assertEqual(commande["id"], self.active.pk)
+        self.assertEqual(commande["lignes"][0]["plat_nom"], "Lablabi")
+        self.assertEqual(commande["transitions_possibles"], ["EN_PREPARATION", "ANNULEE"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            transitionner(self.active, Commande.STATUT_EN_PREPARATION, par=self.cuisinier)
+        message = self.prochain_message(r)
+        self.assertEqual(message["type"], "modifiee")
+        self.assertEqual(message["commande"]["statut"], "EN_PREPARATION")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            transitionner(self.active, Commande.STATUT_ANNULEE, par=self.cuisinier)
+        self.assertEqual(self.prochain_message(r)["type"], "annulee")
+
+        # plus rien : le flux se termine à COMMANDES_FLUX_DUREE_MAX_S
+        self.assertIsNone(self.prochain_message(r))
+
+    def test_rien_avant_le_commit(self):
+        r = self.ouvrir()
+        self.prochain_message(r)
+        with self.captureOnCommitCallbacks(execute=False) as rappels:
+            transitionner(self.active, Commande.STATUT_EN_PREPARATION, par=self.cuisinier)
+        self.assertEqual(len(rappels), 1)
+        self.assertIsNone(self.prochain_message(r))
+
+    def test_jeton_en_parametre_et_roles(self):
+        self.api.force_authenticate(None)
+        self.assertEqual(self.ouvrir().status_code, 401)
+
+        # le jeton d'accès ne passe plus dans l'URL
+        acces = str(AccessToken.for_user(self.cuisinier))
+        self.assertEqual(self.ouvrir(token=acces).status_code, 401)
+
+        api = APIClient()
+        api.force_authenticate(self.cuisinier)
+        jeton = api.post("/api/commandes/flux/jeton/").data["token"]
+        self.assertEqual(self.ouvrir(token=jeton).status_code, 200)
+        # ... et le jeton du flux n'ouvre rien d'autre
+        self.api.credentials(HTTP_AUTHORIZATION=f"Bearer {jeton}")
+        self.assertEqual(self.api.get("/api/commandes/mes-commandes/").status_code, 401)
+        self.api.credentials()
+
+        perime = JetonFlux.for_user(self.cuisinier)
+        perime.set_exp(lifetime=-timedelta(seconds=1))
+        self.assertEqual(self.ouvrir(token=str(perime)).status_code, 401)
+
+        self.api.force_authenticate(self.client_user)
+        self.assertEqual(self.ouvrir().status_code, 403)
+        self.assertEqual(self.api.post("/api/commandes/flux/jeton/").status_code, 403)
+
+    def test_broker_memoire(self):
+        broker = flux.BrokerMemoire()
+        abonnement = broker.abonner("cuisinier:1")
+        broker.publier("cuisinier:2", "ailleurs")
+        broker.publier("cuisinier:1", "ici")
+        self.assertEqual(abonnement.lire(timeout=0), "ici")
+        self.assertIsNone(abonnement.lire(timeout=0))
+
+        for i in range(flux.TAILLE_FILE + 1):
+            broker.publier("cuisinier:1", str(i))
+        self.assertTrue(abonnement.deborde)
+
+        abonnement.fermer()
+        self.assertEqual(broker._abonnes, {})
+
+
+class ReservationConcurrenteTests(TransactionTestCase):
+    NB_THREADS = 12
+    STOCK = 5
+
+    def test_pas_de_survente(self):
+        client_user, cuisinier = creer_utilisateurs()
+        plat = Plat.objects.create(
+            cuisinier=cuisinier, nom="Brik", prix=Decimal("5"), stock=self.STOCK
+        )
+        commandes = [
+            Commande.objects.create(client=client_user, total=Decimal("5"))
+            for _ in range(self.NB_THREADS)
+        ]
+        depart = threading.Barrier(self.NB_THREADS)
+        resultats = []
+
+        def acheter(commande):
+            depart.wait()
+            try:
+                while True:
+                    try:
+                        with transaction.atomic():
+                            reserver(commande, [(plat, 1)])
+                            consommer(commande)
+                        resultats.append(True)
+                        return
+                    except StockInsuffisant:
+                        resultats.append(False)
+                        return
+                    except OperationalError:
+                        # SQLite : base verrouillée par un autre thread, on réessaie
+                        time.sleep(0.005)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=acheter, args=(c,)) for c in commandes]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        plat.refresh_from_db()
+        self.assertEqual(resultats.count(True), self.STOCK)
+        self.assertEqual(len(resultats), self.NB_THREADS)
+        self.assertEqual((plat.stock, plat.stock_reserve), (0, 0))
@@ -0,0 +1,92 @@
+# commandes/transitions.py
+"""
+Changements de statut d'une commande, selon Commande.TRANSITIONS.
+
+Le passage se fait par un UPDATE conditionnel (WHERE statut = <attendu>) :
+si quelqu'un a modifié la commande entre-temps, rien n'est écrit et
+TransitionConcurrente est levée (-> 409), au lieu d'écraser sa mise à jour.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Commande, HistoriqueStatutCommande
+from .signals import signaler_apres_commit, statut_commande_change
+
+
+class TransitionInvalide(Exception):
+    """Transition absente de la table, ou interdite à ce rôle."""
+
+
+class TransitionConcurrente(Exception):
+    """La commande a changé de statut entre la lecture et l'écriture."""
+
+    def __init__(self, statut_actuel):
+        super().__init__(
+            "La commande a été modifiée entre-temps "
+            f"(statut actuel : {dict(Commande.STATUT_CHOICES).get(statut_actuel, statut_actuel)})."
+        )
+        self.statut_actuel = statut_actuel
+
+
+def role_de(utilisateur):
+    if utilisateur is None:
+        return Commande.ROLE_SYSTEME
+    return getattr(utilisateur, "role", None)
+
+
+def verifier(commande, nouveau_statut, role):
+    roles = Commande.TRANSITIONS.get((commande.statut, nouveau_statut))
+    if not roles or role not in roles:
+        libelles = dict(Commande.STATUT_CHOICES)
+        raise TransitionInvalide(
+            f"Transition impossible : {libelles.get(commande.statut, commande.statut)} -> "
+            f"{libelles.get(nouveau_statut, nouveau_statut)}."
+        )
+
+
+def transitionner(commande, nouveau_statut, par=None):
+    """
+    Passe `commande` (statut lu en mémoire = statut attendu) à `nouveau_statut`.
+    `par` : utilisateur à l'origine du changement, None pour le système.
+    Met à jour l'instance et l'historique ; lève TransitionInvalide ou
+    TransitionConcurrente.
+    """
+    role = role_de(par)
+    verifier(commande, nouveau_statut, role)
+    ancien_statut = commande.statut
+    maintenant = timezone.now()
+
+    with transaction.atomic():
+        modifiees = Commande.objects.filter(pk=commande.pk, statut=ancien_statut).update(
+            statut=nouveau_statut, updated_at=maintenant
+        )
+        if not modifiees:
+            statut_actuel = (
+                Commande.objects.filter(pk=commande.pk)
+                .values_list("statut", flat=True)
+                .first()
+            )
+            raise TransitionConcurrente(statut_actuel)
+
+        HistoriqueStatutCommande.objects.create(
+            commande=commande,
+            ancien_statut=ancien_statut,
+            nouveau_statut=nouveau_statut,
+            modifie_par=par,
+            role=role or "",
+        )
+        commande.statut = nouveau_statut
+        commande.updated_at = maintenant
+        statut_commande_change.send(
+            sender=Commande,
+            commande=commande,
+            ancien_statut=ancien_statut,
+            nouveau_statut=nouveau_statut,
+        )
+        # file temps réel du cuisinier (commandes/flux.py)
+        signaler_apres_commit(
+            commande,
+            "annulee" if nouveau_statut == Commande.STATUT_ANNULEE else "modifiee",
+        )
+
+    return commande
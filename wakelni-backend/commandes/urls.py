@@ -1,11 +1,18 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CommandeViewSet, MesCommandesClientView
+from .views import (
+    CommandeViewSet,
+    FluxCommandesCuisinierView,
+    JetonFluxView,
+    MesCommandesClientView,
+)
 
 router = DefaultRouter()
 router.register('', CommandeViewSet, basename='commande')
 
 urlpatterns = [
     path('mes-commandes/', MesCommandesClientView.as_view(), name='mes-commandes'),
+    path('flux/', FluxCommandesCuisinierView.as_view(), name='commandes-flux'),
+    path('flux/jeton/', JetonFluxView.as_view(), name='commandes-flux-jeton'),
     path('', include(router.urls)),
 ]
@@ -1,14 +1,71 @@
 # commandes/views.py
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
 from django.db.models import Q
+from django.http import StreamingHttpResponse
 from rest_framework import viewsets, generics, status
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from wakelni_backend.conditional import requete_conditionnelle, validateur_queryset
 
+from . import flux
 from .models import Commande
-from notifications_app.models import Notification
+from .reservations import liberer_commande as liberer_reservations
+from .transitions import TransitionConcurrente, TransitionInvalide, transitionner
+from notifications_app.services import notifier
+from paiements.gateways import GatewayError, get_gateway
 from .serializers import CommandeSerializer, CommandeClientSerializer
 
+logger = logging.getLogger(__name__)
+
+
+def appliquer_transition(commande, nouveau_statut, user):
+    """transitionner() -> None si OK, sinon la Response d'erreur (400 / 409)."""
+    try:
+        transitionner(commande, nouveau_statut, par=user)
+    except TransitionInvalide as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except TransitionConcurrente as e:
+        return Response(
+            {"detail": str(e), "statut": e.statut_actuel},
+            status=status.HTTP_409_CONFLICT,
+        )
+    return None
+
+
+def session_deja_payee(commande):
+    """
+    Ferme la session de paiement d'une commande qu'on annule : plus personne
+    ne pourra la payer. True si elle l'a été entre-temps (on n'annule pas).
+
+    Si la passerelle ne répond pas, on annule quand même : un paiement tardif
+    sera refusé par materialiser_commande (anomalie PAYE_APRES_ANNULATION).
+    """
+    gateway = get_gateway()
+    try:
+        session = gateway.expirer_session(commande.stripe_session_id)
+    except GatewayError:
+        # une session payée ne s'expire plus : vérifier pourquoi
+        try:
+            session = gateway.recuperer_session(commande.stripe_session_id)
+        except GatewayError:
+            logger.warning(
+                "Session %s non expirée à l'annulation de la commande %s",
+                commande.stripe_session_id, commande.pk,
+            )
+            return False
+    return session.get("payment_status") == "paid"
+
 
 class MesCommandesClientView(generics.ListAPIView):
     """
@@ -30,13 +87,115 @@ class MesCommandesClientView(generics.ListAPIView):
             qs = qs.filter(client=user)
 
         elif role == "CUISINIER":
-            qs = qs.filter(lignes__plat__cuisinier=user).distinct()
+            qs = qs.filter(cuisinier=user)
 
         else:
             qs = Commande.objects.none()
 
         return qs.prefetch_related("lignes__plat").order_by("-created_at")
 
+    @requete_conditionnelle(validateur_queryset("updated_at"))
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+
+class JetonFlux(AccessToken):
+    """
+    Jeton d'ouverture du flux temps réel : durée de vie courte et type
+    "flux", refusé partout ailleurs (seul AccessToken est accepté dans
+    l'en-tête Authorization). C'est lui, et non le jeton d'accès, qui passe
+    dans l'URL (journaux du serveur, du proxy, historique du navigateur).
+    """
+    token_type = "flux"
+    lifetime = timedelta(seconds=getattr(settings, "COMMANDES_FLUX_JETON_S", 60))
+
+
+class JWTParametreAuthentication(JWTAuthentication):
+    """
+    EventSource ne permet pas d'envoyer d'en-tête Authorization : un
+    JetonFlux (POST /api/commandes/flux/jeton/) est accepté en paramètre ?token=.
+    """
+
+    def authenticate(self, request):
+        jeton = request.query_params.get("token")
+        if not jeton:
+            return None
+        try:
+            validated_token = JetonFlux(jeton)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+        return self.get_user(validated_token), validated_token
+
+
+class EvenementsRenderer(JSONRenderer):
+    # négociation pour Accept: text/event-stream (les erreurs restent en JSON)
+    media_type = "text/event-stream"
+    format = "sse"
+
+
+class JetonFluxView(APIView):
+    """
+    POST /api/commandes/flux/jeton/  -> {"token": "..."}
+
+    Jeton propre au flux (?token=), valable COMMANDES_FLUX_JETON_S : il
+    suffit qu'il soit valide à l'ouverture ; le frontend en redemande un à
+    chaque (re)connexion.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if getattr(request.user, "role", None) != "CUISINIER":
+            return Response(
+                {"detail": "Réservé aux cuisiniers."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        return Response({"token": str(JetonFlux.for_user(request.user))})
+
+
+class FluxCommandesCuisinierView(APIView):
+    """
+    GET /api/commandes/flux/?token=<JetonFlux>   (text/event-stream)
+
+    File temps réel du cuisinier : un snapshot des commandes actives
+    (EN_ATTENTE -> PRET) à la connexion, puis chaque commande payée,
+    modifiée ou annulée. Voir commandes/flux.py.
+    """
+    authentication_classes = [JWTAuthentication, JWTParametreAuthentication]
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [JSONRenderer, EvenementsRenderer]
+
+    def get(self, request):
+        user = request.user
+        if getattr(user, "role", None) != "CUISINIER":
+            return Response(
+                {"detail": "Réservé aux cuisiniers."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        # abonné avant le snapshot : rien ne peut passer entre les deux
+        abonnement = flux.get_broker().abonner(flux.canal(user.id))
+        try:
+            depart = flux.snapshot(user.id)
+        except Exception:
+            abonnement.fermer()
+            raise
+        if not connection.in_atomic_block:
+            # le flux dure plusieurs minutes sans toucher à la base
+            connection.close()
+
+        response = StreamingHttpResponse(
+            flux.evenements(
+                abonnement,
+                depart,
+                ping=settings.COMMANDES_FLUX_PING_S,
+                duree_max=settings.COMMANDES_FLUX_DUREE_MAX_S,
+            ),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # nginx : pas de mise en tampon
+        return response
+
 
 class CommandeViewSet(viewsets.ModelViewSet):
     """
@@ -55,11 +214,7 @@ class CommandeViewSet(viewsets.ModelViewSet):
             return Commande.objects.filter(client=user).order_by("-created_at")
 
         if role == "CUISINIER":
-            return (
-                Commande.objects.filter(lignes__plat__cuisinier=user)
-                .distinct()
-                .order_by("-created_at")
-            )
+            return Commande.objects.filter(cuisinier=user).order_by("-created_at")
 
         return Commande.objects.none()
 
@@ -75,7 +230,7 @@ class CommandeViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        if not commande.lignes.filter(plat__cuisinier=user).exists():
+        if commande.cuisinier_id != user.id:
             return Response(
                 {"detail": "Cette commande ne contient pas vos plats."},
                 status=status.HTTP_403_FORBIDDEN,
@@ -89,17 +244,21 @@ class CommandeViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        commande.statut = nouveau_statut
-        commande.save()
+        # statut, stock et notification (boîte d'envoi) : tout ou rien
+        with transaction.atomic():
+            erreur = appliquer_transition(commande, nouveau_statut, user)
+            if erreur:
+                return erreur
+
+            if nouveau_statut == Commande.STATUT_ANNULEE:
+                liberer_reservations(commande)
 
-        # notification envoyée au CLIENT
-        Notification.objects.create(
-            destinataire=commande.client,
-            message=(
+            # notification envoyée au CLIENT
+            notifier(
+                commande.client_id,
                 f"Le statut de votre commande #{commande.id} est maintenant : "
-                f"{commande.get_statut_display()}."
-            ),
-        )
+                f"{commande.get_statut_display()}.",
+            )
 
         data = CommandeClientSerializer(
             commande, context={"request": request}
@@ -124,18 +283,26 @@ class CommandeViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        commande.statut = Commande.STATUT_ANNULEE
-        commande.save()
+        if commande.stripe_session_id and session_deja_payee(commande):
+            return Response(
+                {"detail": "Le paiement de cette commande vient d'être reçu."},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        with transaction.atomic():
+            erreur = appliquer_transition(commande, Commande.STATUT_ANNULEE, user)
+            if erreur:
+                return erreur
 
-        premiere_ligne = commande.lignes.select_related("plat__cuisinier").first()
-        if premiere_ligne and hasattr(premiere_ligne.plat, "cuisinier"):
-            Notification.objects.create(
-                destinataire=premiere_ligne.plat.cuisinier,
-                message=(
+            # le stock réservé pendant le paiement redevient disponible
+            liberer_reservations(commande)
+
+            if commande.cuisinier_id:
+                notifier(
+                    commande.cuisinier_id,
                     f"Le client {user.username} a annulé la commande "
-                    f"#{commande.id}."
-                ),
-            )
+                    f"#{commande.id}.",
+                )
 
         data = CommandeClientSerializer(
             commande, context={"request": request}
@@ -160,18 +327,17 @@ class CommandeViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        commande.statut = Commande.STATUT_COMPLETEE
-        commande.save()
+        with transaction.atomic():
+            erreur = appliquer_transition(commande, Commande.STATUT_COMPLETEE, user)
+            if erreur:
+                return erreur
 
-        premiere_ligne = commande.lignes.select_related("plat__cuisinier").first()
-        if premiere_ligne and hasattr(premiere_ligne.plat, "cuisinier"):
-            Notification.objects.create(
-                destinataire=premiere_ligne.plat.cuisinier,
-                message=(
+            if commande.cuisinier_id:
+                notifier(
+                    commande.cuisinier_id,
                     f"Le client {user.username} a confirmé la réception de "
-                    f"la commande #{commande.id}."
-                ),
-            )
+                    f"la commande #{commande.id}.",
+                )
 
         data = CommandeClientSerializer(
             commande, context={"request": request}
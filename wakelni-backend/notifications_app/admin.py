@@ -1,8 +1,22 @@
-
 from django.contrib import admin
-from .models import Notification
+from .models import CompteurNotifications, MessageSortant, Notification
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
     list_display = ('destinataire', 'message', 'est_lu', 'cree_le')
     list_filter = ('est_lu',)
+    # est_lu passe par notifications_app/services.py (compteur des non lues)
+    readonly_fields = ('est_lu',)
+
+
+@admin.register(CompteurNotifications)
+class CompteurNotificationsAdmin(admin.ModelAdmin):
+    list_display = ('utilisateur', 'non_lues')
+    readonly_fields = ('utilisateur', 'non_lues')
+
+
+@admin.register(MessageSortant)
+class MessageSortantAdmin(admin.ModelAdmin):
+    list_display = ('destinataire', 'message', 'statut', 'tentatives', 'cree_le')
+    list_filter = ('statut',)
+    readonly_fields = ('erreur', 'traite_le')
@@ -1,6 +1,8 @@
-
 from django.apps import AppConfig
 
 class NotificationsAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'notifications_app'
+
+    def ready(self):
+        from . import outbox, signals  # noqa: F401
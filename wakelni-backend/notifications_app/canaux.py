@@ -0,0 +1,38 @@
+# notifications_app/canaux.py
+"""
+Canaux de distribution des messages de la boîte d'envoi.
+
+Un canal est une fonction qui reçoit une liste de MessageSortant et les
+livre ; elle lève une exception pour que le lot soit retenté. Les canaux
+actifs sont listés dans NOTIFICATIONS_CANAUX (chemins importables) : un
+envoi de courriel ou de push s'ajoute ici sans toucher aux vues.
+
+Livraison « au moins une fois » : un canal externe peut recevoir deux fois
+le même message si un canal suivant échoue.
+"""
+from collections import Counter
+
+from django.db.models import Case, F, IntegerField, Value, When
+
+from .models import CompteurNotifications, Notification
+
+
+def en_base(messages):
+    """Notifications affichées dans l'application, compteurs compris."""
+    Notification.objects.bulk_create([
+        Notification(destinataire_id=m.destinataire_id, message=m.message)
+        for m in messages
+    ])
+
+    par_destinataire = Counter(m.destinataire_id for m in messages)
+    # normalement déjà créés avec l'utilisateur (signals.py)
+    CompteurNotifications.objects.bulk_create(
+        [CompteurNotifications(utilisateur_id=u) for u in par_destinataire],
+        ignore_conflicts=True,
+    )
+    CompteurNotifications.objects.filter(utilisateur_id__in=par_destinataire).update(
+        non_lues=F("non_lues") + Case(
+            *[When(utilisateur_id=u, then=Value(n)) for u, n in par_destinataire.items()],
+            output_field=IntegerField(),
+        )
+    )
@@ -0,0 +1,28 @@
+# notifications_app/management/commands/distribuer_notifications.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications_app.outbox import distribuer_en_attente
+
+
+class Command(BaseCommand):
+    help = (
+        "Distribue la boîte d'envoi des notifications (Notification, compteurs, "
+        "autres canaux). Avec --boucle, tourne en continu comme worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lot", type=int, default=500)
+        parser.add_argument("--boucle", action="store_true")
+        parser.add_argument("--intervalle", type=float, default=1.0, help="secondes")
+
+    def handle(self, *args, **options):
+        while True:
+            traites = distribuer_en_attente(limite=options["lot"])
+            if traites:
+                self.stdout.write(f"{traites} message(s) distribué(s).")
+            if not options["boucle"]:
+                break
+            if traites < options["lot"]:
+                time.sleep(options["intervalle"])
@@ -0,0 +1,48 @@
+# notifications_app/management/commands/purger_notifications.py
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from notifications_app.services import purger_lues
+
+
+class Command(BaseCommand):
+    help = (
+        "Supprime par lots les notifications lues plus anciennes que "
+        "NOTIFICATIONS_RETENTION_JOURS (à lancer chaque nuit)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--jours", type=int, default=settings.NOTIFICATIONS_RETENTION_JOURS,
+            help="âge minimum des notifications lues à supprimer",
+        )
+        parser.add_argument("--lot", type=int, default=1000)
+        parser.add_argument(
+            "--pause", type=float, default=0,
+            help="secondes entre deux lots (laisse respirer la base)",
+        )
+        parser.add_argument(
+            "--archive", default=None,
+            help="fichier JSON Lines où copier les notifications avant suppression",
+        )
+
+    def handle(self, *args, **options):
+        avant = timezone.now() - timedelta(days=options["jours"])
+        archive = open(options["archive"], "a", encoding="utf-8") if options["archive"] else None
+        total = 0
+        try:
+            while True:
+                supprimees = purger_lues(avant, limite=options["lot"], archive=archive)
+                total += supprimees
+                if supprimees < options["lot"]:
+                    break
+                if options["pause"]:
+                    time.sleep(options["pause"])
+        finally:
+            if archive is not None:
+                archive.close()
+        self.stdout.write(self.style.SUCCESS(f"{total} notification(s) supprimée(s)."))
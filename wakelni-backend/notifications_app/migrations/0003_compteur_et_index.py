@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications_app', '0002_initial'),
+        ('users', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompteurNotifications',
+            fields=[
+                ('utilisateur', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='compteur_notifications', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('non_lues', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='destinataire',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(models.F('destinataire'), models.OrderBy(models.F('cree_le'), descending=True), models.OrderBy(models.F('id'), descending=True), name='notification_boite_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['destinataire', 'est_lu', 'cree_le'], name='notification_lecture_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('est_lu', True)), fields=['cree_le'], name='notification_purge_idx'),
+        ),
+    ]
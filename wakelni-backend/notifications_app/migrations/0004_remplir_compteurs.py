@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count, Q
+
+
+def remplir_compteurs(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    CompteurNotifications = apps.get_model("notifications_app", "CompteurNotifications")
+
+    # un compteur par utilisateur, même à zéro : notifier() n'a plus qu'un UPDATE à faire
+    CompteurNotifications.objects.bulk_create(
+        [
+            CompteurNotifications(utilisateur_id=ligne["pk"], non_lues=ligne["n"])
+            for ligne in (
+                User.objects
+                .annotate(n=Count("notifications", filter=Q(notifications__est_lu=False)))
+                .values("pk", "n")
+                .order_by()
+            )
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications_app', '0003_compteur_et_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remplir_compteurs, migrations.RunPython.noop),
+    ]
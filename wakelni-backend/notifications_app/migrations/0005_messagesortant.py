@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications_app', '0004_remplir_compteurs'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MessageSortant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message', models.CharField(max_length=255)),
+                ('statut', models.CharField(choices=[('A_TRAITER', 'À traiter'), ('ERREUR', 'Erreur')], default='A_TRAITER', max_length=20)),
+                ('tentatives', models.PositiveIntegerField(default=0)),
+                ('erreur', models.TextField(blank=True)),
+                ('cree_le', models.DateTimeField(auto_now_add=True)),
+                ('traite_le', models.DateTimeField(blank=True, null=True)),
+                ('destinataire', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='messages_sortants', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('statut', 'A_TRAITER')), fields=['cree_le'], name='message_a_traiter_idx')],
+            },
+        ),
+    ]
@@ -1,16 +1,98 @@
-
 from django.db import models
 from django.conf import settings
+from django.db.models import F, Q
 
 class Notification(models.Model):
     destinataire = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
-        related_name='notifications'
+        related_name='notifications',
+        db_index=False,  # couvert par les index composites ci-dessous
     )
     message = models.CharField(max_length=255)
     est_lu = models.BooleanField(default=False)
     cree_le = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # boîte de réception paginée par curseur (cree_le, id)
+            models.Index(
+                "destinataire", F("cree_le").desc(), F("id").desc(),
+                name="notification_boite_idx",
+            ),
+            # non lues d'un utilisateur (filtre ?non_lues=1, marquer-lues)
+            models.Index(
+                fields=["destinataire", "est_lu", "cree_le"],
+                name="notification_lecture_idx",
+            ),
+            # purge des notifications lues (purger_notifications)
+            models.Index(
+                fields=["cree_le"],
+                name="notification_purge_idx",
+                condition=Q(est_lu=True),
+            ),
+        ]
+
     def __str__(self):
         return f"{self.destinataire.username} - {self.message[:30]}..."
+
+
+class CompteurNotifications(models.Model):
+    """
+    Nombre de notifications non lues, tenu à jour par notifications_app/services.py
+    (badge du header : une lecture par clé primaire au lieu d'un COUNT(*)).
+    """
+    utilisateur = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='compteur_notifications',
+    )
+    non_lues = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.utilisateur_id} : {self.non_lues} non lue(s)"
+
+
+class MessageSortant(models.Model):
+    """
+    Boîte d'envoi (outbox) : écrite par notifier() dans la transaction du
+    changement d'état qui la motive, distribuée ensuite par le worker
+    `distribuer_notifications` vers les canaux (NOTIFICATIONS_CANAUX).
+    Si la transaction est annulée, le message disparaît avec elle ; une fois
+    distribué, il est supprimé (seuls restent le retard et les erreurs).
+    """
+
+    STATUT_A_TRAITER = "A_TRAITER"
+    STATUT_ERREUR = "ERREUR"
+    STATUT_CHOICES = [
+        (STATUT_A_TRAITER, "À traiter"),
+        (STATUT_ERREUR, "Erreur"),
+    ]
+
+    destinataire = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='messages_sortants',
+    )
+    message = models.CharField(max_length=255)
+    statut = models.CharField(
+        max_length=20, choices=STATUT_CHOICES, default=STATUT_A_TRAITER
+    )
+    tentatives = models.PositiveIntegerField(default=0)
+    erreur = models.TextField(blank=True)
+    cree_le = models.DateTimeField(auto_now_add=True)
+    traite_le = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # file d'attente du worker : seuls les messages en attente
+            models.Index(
+                fields=["cree_le"],
+                name="message_a_traiter_idx",
+                condition=Q(statut="A_TRAITER"),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.destinataire_id} - {self.message[:30]} ({self.statut})"
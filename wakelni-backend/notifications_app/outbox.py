@@ -0,0 +1,114 @@
+# notifications_app/outbox.py
+"""
+Distribution de la boîte d'envoi (MessageSortant) par le worker
+`distribuer_notifications`. Les vues n'écrivent qu'une ligne, dans leur
+propre transaction ; tout le reste (Notification, compteurs, futurs
+courriels / push) se fait ici, par lots.
+"""
+import logging
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.models import F, Min
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from wakelni_backend import metrics
+
+from .models import MessageSortant
+
+logger = logging.getLogger(__name__)
+
+# au-delà, le message reste en ERREUR et n'est plus repris automatiquement
+TENTATIVES_MAX = 5
+
+
+def _en_attente():
+    return MessageSortant.objects.filter(statut=MessageSortant.STATUT_A_TRAITER)
+
+
+def _retard():
+    plus_ancien = _en_attente().aggregate(m=Min("cree_le"))["m"]
+    retard = (timezone.now() - plus_ancien).total_seconds() if plus_ancien else 0
+    return [({}, round(retard, 3))]
+
+
+# calculées au scrape (le worker tourne dans un autre processus que /metrics/)
+metrics.gauge(
+    "wakelni_notifications_outbox_en_attente",
+    "Messages de la boîte d'envoi pas encore distribués.",
+    fonction=lambda: [({}, _en_attente().count())],
+)
+metrics.gauge(
+    "wakelni_notifications_outbox_retard_secondes",
+    "Âge du plus ancien message en attente (0 si la file est vide).",
+    fonction=_retard,
+)
+metrics.gauge(
+    "wakelni_notifications_outbox_erreurs",
+    "Messages abandonnés après TENTATIVES_MAX échecs.",
+    fonction=lambda: [
+        ({}, MessageSortant.objects.filter(statut=MessageSortant.STATUT_ERREUR).count())
+    ],
+)
+
+
+@lru_cache(maxsize=None)
+def _canaux(chemins):
+    return [import_string(chemin) for chemin in chemins]
+
+
+def canaux():
+    return _canaux(tuple(settings.NOTIFICATIONS_CANAUX))
+
+
+@receiver(setting_changed)
+def _reinitialiser_canaux(setting, **kwargs):
+    if setting == "NOTIFICATIONS_CANAUX":
+        _canaux.cache_clear()
+
+
+def _envoyer(messages):
+    with transaction.atomic():
+        for canal in canaux():
+            canal(messages)
+
+
+def distribuer_en_attente(limite=500):
+    """
+    Distribue au plus `limite` messages, du plus ancien au plus récent.
+    Si le lot échoue, ses messages sont repris un par un : un message
+    invalide ne bloque pas les autres. Retourne le nombre de messages pris.
+    """
+    with transaction.atomic():
+        # skip_locked : plusieurs workers peuvent tourner en parallèle
+        lot = list(
+            _en_attente().select_for_update(skip_locked=True).order_by("cree_le", "pk")[:limite]
+        )
+        if not lot:
+            return 0
+
+        echecs = {}
+        try:
+            _envoyer(lot)
+        except Exception:
+            logger.exception("Échec de la distribution d'un lot de %s message(s)", len(lot))
+            for message in lot:
+                try:
+                    _envoyer([message])
+                except Exception as e:
+                    echecs[message.pk] = str(e)
+
+        # distribué = supprimé : la table ne contient que le retard
+        MessageSortant.objects.filter(pk__in=[m.pk for m in lot if m.pk not in echecs]).delete()
+        for pk, erreur in echecs.items():
+            MessageSortant.objects.filter(pk=pk).update(tentatives=F("tentatives") + 1, erreur=erreur)
+        if echecs:
+            MessageSortant.objects.filter(
+                pk__in=list(echecs), tentatives__gte=TENTATIVES_MAX
+            ).update(statut=MessageSortant.STATUT_ERREUR, traite_le=timezone.now())
+    return len(lot)
+
@@ -0,0 +1,13 @@
+# notifications_app/pagination.py
+from rest_framework.pagination import CursorPagination
+
+
+class NotificationCursorPagination(CursorPagination):
+    """
+    Boîte de réception par curseur (cree_le, id), servie par
+    l'index notification_boite_idx : pas d'OFFSET, coût constant par page.
+    """
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-cree_le", "-id")
@@ -0,0 +1,91 @@
+# notifications_app/services.py
+"""
+Toutes les écritures de notifications passent par ici (ou par le canal
+en_base du worker), pour que CompteurNotifications reste égal au nombre de
+notifications non lues.
+"""
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from .models import CompteurNotifications, MessageSortant, Notification
+
+
+def notifier(destinataire_id, message):
+    """
+    Met une notification dans la boîte d'envoi, dans la transaction en cours :
+    une seule insertion, et rien n'est envoyé si cette transaction est
+    annulée. Notification et compteur sont créés par le worker
+    `distribuer_notifications` (notifications_app/outbox.py).
+    """
+    return MessageSortant.objects.create(destinataire_id=destinataire_id, message=message)
+
+
+def nombre_non_lues(utilisateur_id):
+    return (
+        CompteurNotifications.objects
+        .filter(utilisateur_id=utilisateur_id)
+        .values_list("non_lues", flat=True)
+        .first()
+    ) or 0
+
+
+def marquer_lues(utilisateur_id, jusqu_a=None):
+    """
+    Marque comme lues toutes les notifications de l'utilisateur, ou seulement
+    celles d'id <= jusqu_a (ce que l'écran affichait). Un seul UPDATE ;
+    retourne le nombre de notifications réellement passées à lues.
+    """
+    qs = Notification.objects.filter(destinataire_id=utilisateur_id, est_lu=False)
+    if jusqu_a is not None:
+        qs = qs.filter(pk__lte=jusqu_a)
+    with transaction.atomic():
+        marquees = qs.update(est_lu=True)
+        if marquees:
+            CompteurNotifications.objects.filter(utilisateur_id=utilisateur_id).update(
+                non_lues=Greatest(F("non_lues") - marquees, 0)
+            )
+    return marquees
+
+
+def recompter(utilisateur_ids=None):
+    """Recalcule les compteurs depuis la table (migration, réparation)."""
+    qs = Notification.objects.filter(est_lu=False)
+    compteurs = CompteurNotifications.objects.all()
+    if utilisateur_ids is not None:
+        qs = qs.filter(destinataire_id__in=utilisateur_ids)
+        compteurs = compteurs.filter(utilisateur_id__in=utilisateur_ids)
+    with transaction.atomic():
+        compteurs.delete()
+        CompteurNotifications.objects.bulk_create([
+            CompteurNotifications(utilisateur_id=ligne["destinataire_id"], non_lues=ligne["n"])
+            for ligne in qs.values("destinataire_id").annotate(n=Count("pk")).order_by()
+        ])
+
+
+def purger_lues(avant, limite=1000, archive=None):
+    """
+    Supprime au plus `limite` notifications lues créées avant `avant`
+    (un SELECT d'ids sur notification_purge_idx puis un DELETE par clé
+    primaire : verrous courts, pas de long DELETE qui bloque la table).
+    archive : fichier texte ouvert, reçoit une ligne JSON par notification.
+    Le compteur ne bouge pas : seules les notifications lues sont purgées.
+    """
+    lot = (
+        Notification.objects
+        .filter(est_lu=True, cree_le__lt=avant)
+        .order_by("cree_le")
+        .values("id", "destinataire_id", "message", "cree_le")[:limite]
+    )
+    lignes = list(lot)
+    if not lignes:
+        return 0
+    if archive is not None:
+        for ligne in lignes:
+            archive.write(json.dumps(ligne, cls=DjangoJSONEncoder) + "\n")
+        archive.flush()
+    Notification.objects.filter(pk__in=[ligne["id"] for ligne in lignes]).delete()
+    return len(lignes)
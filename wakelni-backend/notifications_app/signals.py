@@ -0,0 +1,12 @@
+# notifications_app/signals.py
+from django.conf import settings
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import CompteurNotifications
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def creer_compteur(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        CompteurNotifications.objects.get_or_create(utilisateur=instance)
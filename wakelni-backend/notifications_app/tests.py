@@ -0,0 +1,227 @@
+import io
+import json
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from wakelni_backend import metrics
+
+from .models import CompteurNotifications, MessageSortant, Notification
+from .outbox import TENTATIVES_MAX, distribuer_en_attente
+from .services import marquer_lues, notifier, recompter
+
+User = get_user_model()
+
+
+class NotificationTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="client", password="x")
+        self.autre = User.objects.create_user(username="autre", password="x")
+        self.client.force_authenticate(self.user)
+
+    def notifier(self, utilisateur, message="n"):
+        notifier(utilisateur.id, message)
+        distribuer_en_attente()
+        return Notification.objects.latest("pk")
+
+    def non_lues(self):
+        return self.client.get("/api/notifications/non-lues/").data["non_lues"]
+
+
+class BoiteDeReceptionTests(NotificationTestCase):
+    def test_pagination_par_curseur(self):
+        ids = [self.notifier(self.user, f"message {i}").id for i in range(5)]
+        self.notifier(self.autre, "pas pour moi")
+
+        res = self.client.get("/api/notifications/", {"page_size": 3})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([n["id"] for n in res.data["results"]], ids[:-4:-1])
+
+        res = self.client.get(res.data["next"])
+        self.assertEqual([n["id"] for n in res.data["results"]], ids[1::-1])
+        self.assertIsNone(res.data["next"])
+
+    def test_filtre_non_lues(self):
+        lue = self.notifier(self.user, "lue")
+        self.notifier(self.user, "pas lue")
+        marquer_lues(self.user.id, jusqu_a=lue.id)
+
+        res = self.client.get("/api/notifications/", {"non_lues": 1})
+        self.assertEqual([n["message"] for n in res.data["results"]], ["pas lue"])
+
+
+    def test_etag_change_quand_une_notification_est_lue(self):
+        self.notifier(self.user)
+        etag = self.client.get("/api/notifications/")["ETag"]
+        self.assertEqual(
+            self.client.get("/api/notifications/", HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+
+        marquer_lues(self.user.id)
+        res = self.client.get("/api/notifications/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.data["results"][0]["est_lu"])
+
+
+class CompteurTests(NotificationTestCase):
+    def test_compteur_tenu_a_jour(self):
+        self.assertEqual(self.non_lues(), 0)
+        premieres = [self.notifier(self.user) for _ in range(3)]
+        self.notifier(self.user)
+        self.notifier(self.autre)
+        self.assertEqual(self.non_lues(), 4)
+
+        res = self.client.post(
+            "/api/notifications/marquer-lues/", {"jusqu_a": premieres[-1].id}, format="json"
+        )
+        self.assertEqual(res.data, {"marquees": 3, "non_lues": 1})
+
+        # rejouer ne décompte pas deux fois
+        res = self.client.post(
+            "/api/notifications/marquer-lues/", {"jusqu_a": premieres[-1].id}, format="json"
+        )
+        self.assertEqual(res.data, {"marquees": 0, "non_lues": 1})
+
+        res = self.client.post("/api/notifications/marquer-lues/", {}, format="json")
+        self.assertEqual(res.data, {"marquees": 1, "non_lues": 0})
+        self.assertEqual(Notification.objects.filter(destinataire=self.autre, est_lu=False).count(), 1)
+
+    def test_compteur_sans_count(self):
+        for _ in range(3):
+            self.notifier(self.user)
+        with CaptureQueriesContext(connection) as requetes:
+            self.assertEqual(self.non_lues(), 3)
+        self.assertEqual(len(requetes), 1)
+        self.assertNotIn("COUNT", requetes[0]["sql"].upper())
+
+    def test_marquer_lues_en_un_update(self):
+        for _ in range(20):
+            self.notifier(self.user)
+        with CaptureQueriesContext(connection) as requetes:
+            self.assertEqual(marquer_lues(self.user.id), 20)
+        updates = [q["sql"] for q in requetes if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 2)  # notifications + compteur
+
+    def test_jusqu_a_invalide(self):
+        res = self.client.post("/api/notifications/marquer-lues/", {"jusqu_a": "x"}, format="json")
+        self.assertEqual(res.status_code, 400)
+
+    def test_recompter(self):
+        self.notifier(self.user)
+        CompteurNotifications.objects.filter(utilisateur=self.user).update(non_lues=42)
+        recompter([self.user.id])
+        self.assertEqual(self.non_lues(), 1)
+
+
+class PurgeTests(NotificationTestCase):
+    def test_purge_par_lots_avec_archive(self):
+        vieilles = [self.notifier(self.user, f"vieille {i}") for i in range(5)]
+        non_lue = self.notifier(self.user, "vieille non lue")
+        marquer_lues(self.user.id, jusqu_a=vieilles[-1].id)
+        Notification.objects.update(cree_le=timezone.now() - timedelta(days=200))
+        recente = Notification.objects.create(destinataire=self.user, message="récente", est_lu=True)
+
+        archive = self.dossier_temporaire() / "archive.jsonl"
+        sortie = io.StringIO()
+        call_command(
+            "purger_notifications", "--jours", "90", "--lot", "2",
+            "--archive", str(archive), stdout=sortie,
+        )
+        self.assertIn("5 notification(s)", sortie.getvalue())
+        self.assertEqual(
+            set(Notification.objects.values_list("pk", flat=True)), {non_lue.pk, recente.pk}
+        )
+        lignes = [json.loads(l) for l in archive.read_text().splitlines()]
+        self.assertEqual([l["id"] for l in lignes], [n.pk for n in vieilles])
+        self.assertEqual(self.non_lues(), 1)
+
+    def dossier_temporaire(self):
+        dossier = tempfile.TemporaryDirectory()
+        self.addCleanup(dossier.cleanup)
+        return Path(dossier.name)
+
+
+def canal_en_panne(messages):
+    if any("boum" in m.message for m in messages):
+        raise RuntimeError("canal indisponible")
+
+
+class BoiteEnvoiTests(NotificationTestCase):
+    def test_rien_si_la_transaction_est_annulee(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                notifier(self.user.id, "commande annulée entre-temps")
+                raise RuntimeError
+        self.assertFalse(MessageSortant.objects.exists())
+
+    def test_distribution_par_lots(self):
+        for i in range(5):
+            notifier(self.user.id, f"m{i}")
+        notifier(self.autre.id, "autre")
+        self.assertEqual(self.non_lues(), 0)  # rien avant le worker
+
+        self.assertEqual(distribuer_en_attente(limite=4), 4)
+        self.assertEqual(MessageSortant.objects.count(), 2)
+        self.assertEqual(distribuer_en_attente(limite=4), 2)
+        self.assertEqual(distribuer_en_attente(limite=4), 0)
+
+        self.assertEqual(
+            list(Notification.objects.filter(destinataire=self.user).values_list("message", flat=True)),
+            [f"m{i}" for i in range(5)],
+        )
+        self.assertEqual(self.non_lues(), 5)
+        self.assertEqual(
+            CompteurNotifications.objects.get(utilisateur=self.autre).non_lues, 1
+        )
+
+    def test_requetes_constantes_par_lot(self):
+        def nb_requetes(n):
+            for _ in range(n):
+                notifier(self.user.id, "n")
+            with CaptureQueriesContext(connection) as requetes:
+                distribuer_en_attente()
+            return len(requetes)
+
+        self.assertEqual(nb_requetes(1), nb_requetes(50))
+
+    @override_settings(NOTIFICATIONS_CANAUX=[
+        "notifications_app.canaux.en_base", "notifications_app.tests.canal_en_panne",
+    ])
+    def test_un_message_en_echec_ne_bloque_pas_les_autres(self):
+        notifier(self.user.id, "ok 1")
+        notifier(self.user.id, "boum")
+        notifier(self.user.id, "ok 2")
+
+        distribuer_en_attente()
+        self.assertEqual(
+            sorted(Notification.objects.values_list("message", flat=True)), ["ok 1", "ok 2"]
+        )
+        self.assertEqual(self.non_lues(), 2)
+        restant = MessageSortant.objects.get()
+        self.assertEqual((restant.tentatives, restant.erreur), (1, "canal indisponible"))
+
+        for _ in range(TENTATIVES_MAX - 1):
+            distribuer_en_attente()
+        restant.refresh_from_db()
+        self.assertEqual(restant.statut, MessageSortant.STATUT_ERREUR)
+        self.assertEqual(distribuer_en_attente(), 0)
+
+    def test_metriques_de_retard(self):
+        notifier(self.user.id, "en retard")
+        MessageSortant.objects.update(cree_le=timezone.now() - timedelta(minutes=5))
+
+        exposition = metrics.exposition()
+        self.assertIn("wakelni_notifications_outbox_en_attente 1", exposition)
+        retard = next(
+            float(ligne.split()[-1]) for ligne in exposition.splitlines()
+            if ligne.startswith("wakelni_notifications_outbox_retard_secondes ")
+        )
+        self.assertGreaterEqual(retard, 300)
@@ -1,12 +1,64 @@
-
-from rest_framework import viewsets
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from wakelni_backend.conditional import requete_conditionnelle, validateur_queryset
 from .models import Notification
+from .pagination import NotificationCursorPagination
 from .serializers import NotificationSerializer
+from .services import marquer_lues, nombre_non_lues
+
+_validateur_liste = validateur_queryset("cree_le")
+
+
+def validateur_boite(vue, request):
+    # une notification lue change le compteur "non_lues" donc l'ETag ; lu
+    # dans CompteurNotifications (clé primaire) plutôt qu'un 2e COUNT
+    derniere_maj, valeurs = _validateur_liste(vue, request)
+    valeurs["non_lues"] = nombre_non_lues(request.user.id)
+    return derniere_maj, valeurs
+
 
 class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    GET  /api/notifications/                 (?non_lues=1, pagination par curseur)
+    GET  /api/notifications/non-lues/        -> {"non_lues": n}
+    POST /api/notifications/marquer-lues/    {"jusqu_a": id} optionnel
+    """
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = NotificationCursorPagination
 
     def get_queryset(self):
-        return Notification.objects.filter(destinataire=self.request.user).order_by('-cree_le')
+        qs = Notification.objects.filter(destinataire=self.request.user)
+        if self.request.query_params.get('non_lues') in ('1', 'true'):
+            qs = qs.filter(est_lu=False)
+        return qs.order_by('-cree_le', '-id')
+
+    @requete_conditionnelle(validateur_boite)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    # badge du header : lu dans CompteurNotifications, pas de COUNT(*)
+    @action(detail=False, methods=["get"], url_path="non-lues")
+    def non_lues(self, request):
+        return Response({"non_lues": nombre_non_lues(request.user.id)})
+
+    @action(detail=False, methods=["post"], url_path="marquer-lues")
+    def marquer_lues(self, request):
+        jusqu_a = request.data.get("jusqu_a")
+        if jusqu_a is not None:
+            try:
+                jusqu_a = int(jusqu_a)
+            except (TypeError, ValueError):
+                return Response(
+                    {"detail": "jusqu_a doit être un id de notification."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        marquees = marquer_lues(request.user.id, jusqu_a)
+        return Response({
+            "marquees": marquees,
+            "non_lues": nombre_non_lues(request.user.id),
+        })
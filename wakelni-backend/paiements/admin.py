@@ -1,3 +1,23 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import AnomaliePaiement, EvenementStripe, ExecutionReconciliation
+
+
+@admin.register(EvenementStripe)
+class EvenementStripeAdmin(admin.ModelAdmin):
+    list_display = ("id", "type", "statut", "tentatives", "recu_le", "traite_le")
+    list_filter = ("statut", "type")
+    search_fields = ("id",)
+
+
+@admin.register(ExecutionReconciliation)
+class ExecutionReconciliationAdmin(admin.ModelAdmin):
+    list_display = ("demarree_le", "terminee_le", "statut", "curseur")
+    readonly_fields = ("rapport",)
+
+
+@admin.register(AnomaliePaiement)
+class AnomaliePaiementAdmin(admin.ModelAdmin):
+    list_display = ("commande", "code", "resolue", "creee_le")
+    list_filter = ("code", "resolue")
+    list_editable = ("resolue",)
@@ -0,0 +1,123 @@
+# paiements/evenements.py
+"""
+Webhooks Stripe : la vue ne fait qu'enregistrer l'événement brut
+(enregistrer), le worker `traiter_evenements_stripe` le rejoue ensuite
+(traiter_en_attente). Stripe réessaie tant qu'il n'a pas reçu de 2xx : la
+réponse doit donc être rapide et ne jamais dépendre de notre logique métier.
+"""
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from commandes.models import Commande
+from commandes.reservations import liberer_commande
+from commandes.transitions import TransitionConcurrente, transitionner
+
+from .models import EvenementStripe
+from .services import materialiser_commande
+
+logger = logging.getLogger(__name__)
+
+# au-delà, l'événement reste en ERREUR et n'est plus repris automatiquement
+TENTATIVES_MAX = 5
+
+
+def enregistrer(evenement):
+    """
+    Stocke un événement Stripe décodé. Retourne False si cet id a déjà été
+    reçu (Stripe livre « au moins une fois »).
+    """
+    _obj, cree = EvenementStripe.objects.get_or_create(
+        id=evenement["id"],
+        defaults={"type": evenement.get("type", ""), "payload": evenement},
+    )
+    return cree
+
+
+def _commande_de_session(session):
+    # client_reference_id est posé au checkout ; stripe_session_id en repli
+    ref = session.get("client_reference_id")
+    filtre = {"pk": ref} if ref and str(ref).isdigit() else {"stripe_session_id": session["id"]}
+    return Commande.objects.filter(**filtre).first()
+
+
+def _session_payee(session):
+    if session.get("payment_status") != "paid":
+        # paiement différé : on attendra checkout.session.async_payment_succeeded
+        return EvenementStripe.STATUT_IGNORE
+    commande = _commande_de_session(session)
+    if commande is None:
+        raise LookupError(f"Commande introuvable pour la session {session['id']}.")
+    materialiser_commande(commande.pk, transaction_ref=session.get("payment_intent") or "")
+    return EvenementStripe.STATUT_TRAITE
+
+
+def _session_expiree(session):
+    commande = _commande_de_session(session)
+    if commande is None:
+        return EvenementStripe.STATUT_IGNORE
+    liberer_commande(commande)
+    if commande.statut == Commande.STATUT_EN_ATTENTE:
+        try:
+            transitionner(commande, Commande.STATUT_ANNULEE)
+        except TransitionConcurrente:
+            pass  # déjà annulée ou prise en charge entre-temps
+    return EvenementStripe.STATUT_TRAITE
+
+
+GESTIONNAIRES = {
+    "checkout.session.completed": _session_payee,
+    "checkout.session.async_payment_succeeded": _session_payee,
+    "checkout.session.expired": _session_expiree,
+}
+
+
+def traiter(evenement):
+    """Applique un EvenementStripe et met à jour son statut."""
+    gestionnaire = GESTIONNAIRES.get(evenement.type)
+    evenement.tentatives += 1
+    try:
+        if gestionnaire is None:
+            statut = EvenementStripe.STATUT_IGNORE
+        else:
+            with transaction.atomic():
+                statut = gestionnaire(evenement.payload["data"]["object"])
+        evenement.erreur = ""
+    except Exception as e:
+        logger.exception("Échec du traitement de l'événement Stripe %s", evenement.id)
+        statut = (
+            EvenementStripe.STATUT_ERREUR
+            if evenement.tentatives >= TENTATIVES_MAX
+            else EvenementStripe.STATUT_A_TRAITER
+        )
+        evenement.erreur = str(e)
+
+    evenement.statut = statut
+    evenement.traite_le = timezone.now()
+    evenement.save(update_fields=["statut", "tentatives", "erreur", "traite_le"])
+    return statut
+
+
+def traiter_en_attente(limite=100):
+    """
+    Traite les événements en attente, du plus ancien au plus récent.
+    Un événement en échec n'est retenté qu'au passage suivant du worker.
+    """
+    vus = []
+    while len(vus) < limite:
+        with transaction.atomic():
+            # skip_locked : plusieurs workers peuvent tourner en parallèle
+            evenement = (
+                EvenementStripe.objects
+                .select_for_update(skip_locked=True)
+                .filter(statut=EvenementStripe.STATUT_A_TRAITER)
+                .exclude(pk__in=vus)
+                .order_by("recu_le")
+                .first()
+            )
+            if evenement is None:
+                break
+            traiter(evenement)
+        vus.append(evenement.pk)
+    return len(vus)
@@ -0,0 +1,391 @@
+# paiements/gateways.py
+"""
+Passerelles de paiement. Les vues ne parlent jamais directement au module
+`stripe` : elles passent par `get_gateway()`, choisie par
+settings.PAIEMENT_GATEWAY :
+
+- "stripe" : Stripe Checkout (production)
+- "fake"   : Stripe simulé en mémoire (tests, charge en local) : sessions,
+             payment intents, latence et échecs configurables, aucun réseau
+
+Un chemin pointé ("monapp.gateways.MaGateway") est aussi accepté.
+
+Chaque appel passe par paiements/resilience.py : délai par tentative,
+reprises des opérations idempotentes, disjoncteur (503 quand il est ouvert).
+"""
+import abc
+import hashlib
+import hmac
+import json
+import random
+import threading
+import time
+import uuid
+from collections import namedtuple
+from datetime import timedelta
+from decimal import Decimal
+from functools import lru_cache
+
+import stripe
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from wakelni_backend import metrics
+
+from . import resilience
+
+duree_appels = metrics.histogram(
+    "wakelni_paiement_gateway_duree_secondes",
+    "Durée des appels à la passerelle de paiement.",
+)
+
+# id + URL de paiement vers laquelle rediriger le client
+SessionCheckout = namedtuple("SessionCheckout", ["id", "url"])
+
+# une ligne à facturer : nom du plat, prix unitaire (Decimal), quantité
+LigneFacturee = namedtuple("LigneFacturee", ["nom", "prix", "quantite"])
+
+
+class GatewayError(Exception):
+    """
+    La passerelle n'a pas pu traiter la demande. `transitoire` : panne,
+    délai dépassé, limite de débit... (retentable, compte pour le disjoncteur).
+    """
+
+    def __init__(self, message="", transitoire=False):
+        super().__init__(message)
+        self.transitoire = transitoire
+
+
+class GatewayIndisponible(GatewayError):
+    """Disjoncteur ouvert : on n'appelle même pas la passerelle."""
+
+    def __init__(self, reessayer_dans):
+        super().__init__("Service de paiement temporairement indisponible.")
+        self.reessayer_dans = reessayer_dans
+
+
+class SignatureInvalide(Exception):
+    pass
+
+
+# Stripe refuse un expires_at à moins de 30 minutes de la réception de l'appel
+DUREE_SESSION_MIN = timedelta(minutes=31)
+
+
+def cle_idempotence(commande):
+    return f"wakelni-checkout-commande-{commande.pk}"
+
+
+class PaymentGateway(abc.ABC):
+    """
+    Interface commune. Les sessions sont renvoyées au format Stripe
+    (dict avec id, status, payment_status, payment_intent,
+    client_reference_id) pour que paiements/evenements.py serve aux deux.
+    """
+
+    nom = ""
+    devise = "cad"
+
+    @abc.abstractmethod
+    def creer_session(self, commande, lignes, success_url, cancel_url, expire_le):
+        """Retourne une SessionCheckout ; lève GatewayError en cas d'échec."""
+
+    @abc.abstractmethod
+    def recuperer_session(self, session_id):
+        """Session au format Stripe ; lève GatewayError en cas d'échec."""
+
+    @abc.abstractmethod
+    def expirer_session(self, session_id):
+        """Ferme une session encore ouverte : plus personne ne pourra payer."""
+
+    def lire_evenement(self, payload, signature):
+        """
+        Vérifie la signature d'un webhook (schéma Stripe : HMAC-SHA256 de
+        "<t>.<corps>" avec STRIPE_WEBHOOK_SECRET) et retourne l'événement
+        décodé. Lève SignatureInvalide.
+        """
+        try:
+            stripe.WebhookSignature.verify_header(
+                payload,
+                signature,
+                settings.STRIPE_WEBHOOK_SECRET,
+                tolerance=stripe.Webhook.DEFAULT_TOLERANCE,
+            )
+            evenement = json.loads(payload)
+        except (stripe.SignatureVerificationError, ValueError) as e:
+            raise SignatureInvalide(str(e)) from e
+        if not isinstance(evenement, dict) or "id" not in evenement:
+            raise SignatureInvalide("Événement sans identifiant.")
+        return evenement
+
+    def _appeler(self, operation, fonction, *args, idempotent=False, **kwargs):
+        def tentative():
+            debut = time.perf_counter()
+            try:
+                return fonction(*args, **kwargs)
+            finally:
+                duree_appels.observe(
+                    time.perf_counter() - debut, gateway=self.nom, operation=operation
+                )
+
+        return resilience.appeler(
+            tentative,
+            disjoncteur=resilience.disjoncteur(
+                self.nom,
+                fenetre=settings.PAIEMENT_DISJONCTEUR_FENETRE,
+                min_appels=settings.PAIEMENT_DISJONCTEUR_MIN_APPELS,
+                seuil=settings.PAIEMENT_DISJONCTEUR_SEUIL,
+                duree_ouverture=settings.PAIEMENT_DISJONCTEUR_DUREE_S,
+            ),
+            erreur_transitoire=lambda e: getattr(e, "transitoire", False),
+            circuit_ouvert=lambda d: GatewayIndisponible(d.reessayer_dans()),
+            operation=operation,
+            gateway=self.nom,
+            idempotent=idempotent,
+            tentatives_max=settings.PAIEMENT_TENTATIVES_MAX,
+            delai_total=settings.PAIEMENT_DELAI_TOTAL_S,
+            delai_tentative=settings.PAIEMENT_TIMEOUT_S,
+        )
+
+
+class StripeGateway(PaymentGateway):
+    nom = "stripe"
+
+    # erreurs côté Stripe ou réseau : on peut réessayer plus tard
+    ERREURS_TRANSITOIRES = (
+        stripe.APIConnectionError,  # réseau, délai dépassé
+        stripe.RateLimitError,
+        stripe.APIError,            # 5xx
+    )
+
+    def __init__(self):
+        # délai par tentative ; les reprises sont gérées par resilience.appeler
+        stripe.default_http_client = stripe.new_default_http_client(
+            timeout=settings.PAIEMENT_TIMEOUT_S
+        )
+        stripe.max_network_retries = 0
+
+    def _stripe(self, fonction, *args, **kwargs):
+        # clé passée à chaque appel : rien n'est configuré à l'import
+        try:
+            return fonction(*args, api_key=settings.STRIPE_SECRET_KEY, **kwargs)
+        except stripe.StripeError as e:
+            raise GatewayError(
+                str(e), transitoire=isinstance(e, self.ERREURS_TRANSITOIRES)
+            ) from e
+
+    def creer_session(self, commande, lignes, success_url, cancel_url, expire_le):
+        line_items = [
+            {
+                "price_data": {
+                    "currency": self.devise,
+                    "unit_amount": int(Decimal(ligne.prix) * 100),  # prix en cents
+                    "product_data": {"name": ligne.nom},
+                },
+                "quantity": ligne.quantite,
+            }
+            for ligne in lignes
+        ]
+        session = self._appeler(
+            "creer_session",
+            self._stripe,
+            stripe.checkout.Session.create,
+            payment_method_types=["card"],
+            mode="payment",
+            line_items=line_items,
+            success_url=success_url,
+            cancel_url=cancel_url,
+            expires_at=int(expire_le.timestamp()),
+            # retrouvé par le webhook (paiements/evenements.py)
+            client_reference_id=str(commande.id),
+            # même commande -> même session, même après une reprise
+            idempotency_key=cle_idempotence(commande),
+            idempotent=True,
+        )
+        return SessionCheckout(session.id, session.url)
+
+    def recuperer_session(self, session_id):
+        session = self._appeler(
+            "recuperer_session",
+            self._stripe,
+            stripe.checkout.Session.retrieve,
+            session_id,
+            idempotent=True,
+        )
+        return session.to_dict()
+
+    def expirer_session(self, session_id):
+        # pas de reprise : un 2e appel échoue si le 1er a abouti
+        session = self._appeler(
+            "expirer_session",
+            self._stripe,
+            stripe.checkout.Session.expire,
+            session_id,
+        )
+        return session.to_dict()
+
+
+class FakeGateway(PaymentGateway):
+    """
+    Stripe simulé dans le processus. Réglages :
+
+    - PAIEMENT_FAKE_LATENCE_MS : latence ajoutée à chaque appel
+    - PAIEMENT_FAKE_TAUX_ECHEC : probabilité (0..1) d'une erreur transitoire
+    (une latence supérieure à PAIEMENT_TIMEOUT_S se comporte comme un délai
+    dépassé)
+
+    L'URL de paiement pointe vers FakeCheckoutView : l'ouvrir « paie » la
+    session (webhook checkout.session.completed enregistré comme s'il venait
+    de Stripe) puis redirige vers success_url.
+    """
+
+    nom = "fake"
+
+    # partagé par toutes les instances du processus
+    _sessions = {}
+    _idempotence = {}
+    _verrou = threading.Lock()
+
+    @classmethod
+    def reinitialiser(cls):
+        """Oublie toutes les sessions simulées (entre deux tests)."""
+        with cls._verrou:
+            cls._sessions.clear()
+            cls._idempotence.clear()
+
+    def _simuler_appel(self, fonction, *args):
+        latence = settings.PAIEMENT_FAKE_LATENCE_MS / 1000
+        if latence > settings.PAIEMENT_TIMEOUT_S:
+            time.sleep(settings.PAIEMENT_TIMEOUT_S)
+            raise GatewayError("Délai dépassé (simulé).", transitoire=True)
+        if latence:
+            time.sleep(latence)
+        if random.random() < settings.PAIEMENT_FAKE_TAUX_ECHEC:
+            raise GatewayError("Échec simulé.", transitoire=True)
+        return fonction(*args)
+
+    def creer_session(self, commande, lignes, success_url, cancel_url, expire_le):
+        return self._appeler(
+            "creer_session",
+            self._simuler_appel,
+            self._creer_session,
+            commande, lignes, success_url, cancel_url, expire_le,
+            idempotent=True,
+        )
+
+    def _creer_session(self, commande, lignes, success_url, cancel_url, expire_le):
+        cle = cle_idempotence(commande)
+        with self._verrou:
+            if cle in self._idempotence:
+                return self._idempotence[cle]
+        session_id = f"cs_fake_{uuid.uuid4().hex}"
+        session = {
+            "id": session_id,
+            "object": "checkout.session",
+            "amount_total": sum(int(Decimal(l.prix) * 100) * l.quantite for l in lignes),
+            "client_reference_id": str(commande.id),
+            "currency": self.devise,
+            "expires_at": int(expire_le.timestamp()),
+            "mode": "payment",
+            "payment_intent": None,
+            "payment_status": "unpaid",
+            "status": "open",
+            "success_url": success_url.replace("{CHECKOUT_SESSION_ID}", session_id),
+            "cancel_url": cancel_url,
+        }
+        url = f"{settings.PAIEMENT_FAKE_URL_BASE}/api/paiements/fake/{session_id}/"
+        with self._verrou:
+            self._sessions[session_id] = session
+            self._idempotence[cle] = SessionCheckout(session_id, url)
+        return self._idempotence[cle]
+
+    def recuperer_session(self, session_id):
+        return self._appeler(
+            "recuperer_session",
+            self._simuler_appel,
+            self._recuperer_session,
+            session_id,
+            idempotent=True,
+        )
+
+    def _recuperer_session(self, session_id):
+        with self._verrou:
+            session = self._sessions.get(session_id)
+        if session is None:
+            raise GatewayError(f"Session inconnue : {session_id}")
+        return dict(session)
+
+    def expirer_session(self, session_id):
+        evenement = self._appeler(
+            "expirer_session", self._simuler_appel, self.expirer, session_id
+        )
+        return evenement["data"]["object"]
+
+    def _terminer(self, session_id, statut, payment_status, type_evenement):
+        with self._verrou:
+            session = self._sessions.get(session_id)
+            if session is None:
+                raise GatewayError(f"Session inconnue : {session_id}")
+            if session["status"] != "open":
+                # comme Stripe : une session expirée ou payée est définitive
+                raise GatewayError(f"Session {session['status']} : {session_id}")
+            session["status"] = statut
+            session["payment_status"] = payment_status
+            if payment_status == "paid" and not session["payment_intent"]:
+                session["payment_intent"] = f"pi_fake_{uuid.uuid4().hex}"
+            session = dict(session)
+        return {
+            "id": f"evt_fake_{uuid.uuid4().hex}",
+            "object": "event",
+            "created": int(timezone.now().timestamp()),
+            "livemode": False,
+            "type": type_evenement,
+            "data": {"object": session},
+        }
+
+    def payer(self, session_id):
+        """Le client a payé : retourne l'événement checkout.session.completed."""
+        return self._terminer(session_id, "complete", "paid", "checkout.session.completed")
+
+    def expirer(self, session_id):
+        return self._terminer(session_id, "expired", "unpaid", "checkout.session.expired")
+
+    def signer(self, payload, horodatage=None):
+        """En-tête Stripe-Signature valide pour `payload` (scripts de charge, tests)."""
+        if isinstance(payload, bytes):
+            payload = payload.decode()
+        horodatage = horodatage or int(time.time())
+        signature = hmac.new(
+            settings.STRIPE_WEBHOOK_SECRET.encode(),
+            f"{horodatage}.{payload}".encode(),
+            hashlib.sha256,
+        ).hexdigest()
+        return f"t={horodatage},v1={signature}"
+
+
+GATEWAYS = {
+    "stripe": StripeGateway,
+    "fake": FakeGateway,
+}
+
+
+@lru_cache(maxsize=None)
+def _gateway(nom):
+    classe = GATEWAYS.get(nom) or import_string(nom)
+    return classe()
+
+
+def get_gateway():
+    return _gateway(settings.PAIEMENT_GATEWAY)
+
+
+@receiver(setting_changed)
+def _vider_cache_gateway(setting, **kwargs):
+    if setting == "PAIEMENT_GATEWAY":
+        _gateway.cache_clear()
+    if setting.startswith("PAIEMENT_DISJONCTEUR"):
+        resilience.reinitialiser()
@@ -0,0 +1,69 @@
+# paiements/management/commands/reconcilier_paiements.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from paiements.models import ExecutionReconciliation
+from paiements.reconciliation import Reconciliation
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare les commandes en attente / récentes aux sessions Stripe, "
+        "corrige ce qui peut l'être et signale le reste (à lancer chaque nuit). "
+        "Reprend automatiquement une exécution interrompue."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lot", type=int, default=500, help="commandes par lot")
+        parser.add_argument("--concurrence", type=int, default=4, help="appels Stripe en parallèle")
+        parser.add_argument("--debit", type=float, default=20, help="appels Stripe / seconde max (0 = illimité)")
+        parser.add_argument("--jours", type=int, default=2, help="fenêtre des commandes récentes")
+        parser.add_argument(
+            "--perimee-heures", type=float, default=2,
+            help="session encore ouverte après ce délai -> expirée",
+        )
+        parser.add_argument("--limite", type=int, default=None, help="commandes max pour ce passage")
+        parser.add_argument(
+            "--nouvelle", action="store_true",
+            help="ignore une exécution interrompue et repart du début",
+        )
+
+    def handle(self, *args, **options):
+        execution = None
+        if not options["nouvelle"]:
+            execution = (
+                ExecutionReconciliation.objects
+                .exclude(statut=ExecutionReconciliation.STATUT_TERMINEE)
+                .first()
+            )
+        if execution is None:
+            execution = ExecutionReconciliation.objects.create(
+                depuis=timezone.now() - timedelta(days=options["jours"])
+            )
+        else:
+            self.stdout.write(f"Reprise après la commande #{execution.curseur}.")
+            execution.statut = ExecutionReconciliation.STATUT_EN_COURS
+            execution.save(update_fields=["statut"])
+
+        reconciliation = Reconciliation(
+            execution,
+            lot=options["lot"],
+            concurrence=options["concurrence"],
+            debit=options["debit"],
+            perimee_apres=timedelta(hours=options["perimee_heures"]),
+            limite=options["limite"],
+            sortie=self.stdout.write,
+        )
+        complete = reconciliation.executer()
+
+        for cle, valeur in sorted(execution.rapport.items()):
+            self.stdout.write(f"  {cle}: {valeur}")
+        if complete:
+            self.stdout.write(self.style.SUCCESS("Réconciliation terminée."))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f"Réconciliation interrompue après la commande #{execution.curseur} "
+                "(relancer pour reprendre)."
+            ))
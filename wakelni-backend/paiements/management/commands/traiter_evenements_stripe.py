@@ -0,0 +1,28 @@
+# paiements/management/commands/traiter_evenements_stripe.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from paiements.evenements import traiter_en_attente
+
+
+class Command(BaseCommand):
+    help = (
+        "Traite les webhooks Stripe enregistrés (confirmation des commandes). "
+        "Avec --boucle, tourne en continu comme worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lot", type=int, default=100)
+        parser.add_argument("--boucle", action="store_true")
+        parser.add_argument("--intervalle", type=float, default=2.0, help="secondes")
+
+    def handle(self, *args, **options):
+        while True:
+            traites = traiter_en_attente(limite=options["lot"])
+            if traites:
+                self.stdout.write(f"{traites} événement(s) Stripe traité(s).")
+            if not options["boucle"]:
+                break
+            if traites < options["lot"]:
+                time.sleep(options["intervalle"])
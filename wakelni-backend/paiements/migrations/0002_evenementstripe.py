@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('paiements', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EvenementStripe',
+            fields=[
+                ('id', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('type', models.CharField(max_length=100)),
+                ('payload', models.JSONField()),
+                ('statut', models.CharField(choices=[('A_TRAITER', 'À traiter'), ('TRAITE', 'Traité'), ('IGNORE', 'Ignoré'), ('ERREUR', 'Erreur')], default='A_TRAITER', max_length=20)),
+                ('tentatives', models.PositiveIntegerField(default=0)),
+                ('erreur', models.TextField(blank=True)),
+                ('recu_le', models.DateTimeField(auto_now_add=True)),
+                ('traite_le', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['recu_le'],
+                'indexes': [models.Index(condition=models.Q(('statut', 'A_TRAITER')), fields=['recu_le'], name='evenement_a_traiter_idx')],
+            },
+        ),
+    ]
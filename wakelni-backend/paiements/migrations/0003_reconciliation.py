@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commandes', '0004_reservation_stock'),
+        ('paiements', '0002_evenementstripe'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExecutionReconciliation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('demarree_le', models.DateTimeField(auto_now_add=True)),
+                ('terminee_le', models.DateTimeField(blank=True, null=True)),
+                ('depuis', models.DateTimeField()),
+                ('curseur', models.PositiveBigIntegerField(default=0)),
+                ('statut', models.CharField(choices=[('EN_COURS', 'En cours'), ('INTERROMPUE', 'Interrompue'), ('TERMINEE', 'Terminée')], default='EN_COURS', max_length=20)),
+                ('rapport', models.JSONField(default=dict)),
+            ],
+            options={
+                'ordering': ['-demarree_le'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AnomaliePaiement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(choices=[('MONTANT_DIFFERENT', 'Montant différent de Stripe'), ('PAYE_LOCALEMENT_SEULEMENT', 'Payé chez nous, pas chez Stripe'), ('SESSION_INTROUVABLE', 'Session Stripe introuvable'), ('STOCK_INSUFFISANT', 'Payé mais stock insuffisant'), ('PAYE_APRES_ANNULATION', 'Payé chez Stripe, commande annulée')], max_length=40)),
+                ('details', models.TextField(blank=True)),
+                ('resolue', models.BooleanField(default=False)),
+                ('creee_le', models.DateTimeField(auto_now_add=True)),
+                ('commande', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='anomalies_paiement', to='commandes.commande')),
+                ('execution', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='anomalies', to='paiements.executionreconciliation')),
+            ],
+            options={
+                'ordering': ['-creee_le'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('resolue', False)), fields=('commande', 'code'), name='anomalie_ouverte_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('paiements', '0003_reconciliation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='executionreconciliation',
+            name='curseur_maj',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='executionreconciliation',
+            name='phase',
+            field=models.CharField(choices=[('EN_ATTENTE', 'Commandes en attente'), ('RECENTES', 'Commandes modifiées récemment')], default='EN_ATTENTE', max_length=20),
+        ),
+    ]
@@ -34,3 +34,139 @@ class Paiement(models.Model):
 
     def __str__(self):
         return f"Paiement {self.montant}$ pour cmd {self.commande.id} ({self.statut})"
+
+
+class EvenementStripe(models.Model):
+    """
+    Événement webhook Stripe reçu tel quel (payload brut), traité plus tard
+    par le worker `traiter_evenements_stripe`. L'id Stripe (evt_...) sert de
+    clé : Stripe peut livrer plusieurs fois le même événement.
+    """
+
+    STATUT_A_TRAITER = "A_TRAITER"
+    STATUT_TRAITE = "TRAITE"
+    STATUT_IGNORE = "IGNORE"
+    STATUT_ERREUR = "ERREUR"
+    STATUT_CHOICES = [
+        (STATUT_A_TRAITER, "À traiter"),
+        (STATUT_TRAITE, "Traité"),
+        (STATUT_IGNORE, "Ignoré"),
+        (STATUT_ERREUR, "Erreur"),
+    ]
+
+    id = models.CharField(primary_key=True, max_length=255)
+    type = models.CharField(max_length=100)
+    payload = models.JSONField()
+    statut = models.CharField(
+        max_length=20, choices=STATUT_CHOICES, default=STATUT_A_TRAITER
+    )
+    tentatives = models.PositiveIntegerField(default=0)
+    erreur = models.TextField(blank=True)
+    recu_le = models.DateTimeField(auto_now_add=True)
+    traite_le = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["recu_le"]
+        indexes = [
+            # file d'attente du worker : seuls les événements en attente
+            models.Index(
+                fields=["recu_le"],
+                name="evenement_a_traiter_idx",
+                condition=models.Q(statut="A_TRAITER"),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.type} {self.id} ({self.statut})"
+
+
+class ExecutionReconciliation(models.Model):
+    """
+    Passage de `reconcilier_paiements`, en deux phases : les commandes en
+    attente (par id), puis les autres commandes modifiées depuis `depuis`
+    (par (updated_at, id)). Le curseur (dernière commande traitée de la
+    phase) est sauvegardé après chaque lot : une exécution interrompue
+    reprend là où elle s'était arrêtée.
+    """
+
+    STATUT_EN_COURS = "EN_COURS"
+    STATUT_INTERROMPUE = "INTERROMPUE"
+    STATUT_TERMINEE = "TERMINEE"
+    STATUT_CHOICES = [
+        (STATUT_EN_COURS, "En cours"),
+        (STATUT_INTERROMPUE, "Interrompue"),
+        (STATUT_TERMINEE, "Terminée"),
+    ]
+
+    PHASE_EN_ATTENTE = "EN_ATTENTE"
+    PHASE_RECENTES = "RECENTES"
+    PHASE_CHOICES = [
+        (PHASE_EN_ATTENTE, "Commandes en attente"),
+        (PHASE_RECENTES, "Commandes modifiées récemment"),
+    ]
+
+    demarree_le = models.DateTimeField(auto_now_add=True)
+    terminee_le = models.DateTimeField(null=True, blank=True)
+    # fenêtre des commandes « récentes », figée pour que la reprise
+    # examine le même ensemble
+    depuis = models.DateTimeField()
+    phase = models.CharField(max_length=20, choices=PHASE_CHOICES, default=PHASE_EN_ATTENTE)
+    curseur = models.PositiveBigIntegerField(default=0)
+    # phase RECENTES : updated_at de la dernière commande traitée
+    curseur_maj = models.DateTimeField(null=True, blank=True)
+    statut = models.CharField(
+        max_length=20, choices=STATUT_CHOICES, default=STATUT_EN_COURS
+    )
+    rapport = models.JSONField(default=dict)
+
+    class Meta:
+        ordering = ["-demarree_le"]
+
+    def __str__(self):
+        return f"Réconciliation du {self.demarree_le:%Y-%m-%d %H:%M} ({self.statut})"
+
+
+class AnomaliePaiement(models.Model):
+    """Écart entre Stripe et nos données que la réconciliation ne corrige pas seule."""
+
+    MONTANT_DIFFERENT = "MONTANT_DIFFERENT"
+    PAYE_LOCALEMENT_SEULEMENT = "PAYE_LOCALEMENT_SEULEMENT"
+    SESSION_INTROUVABLE = "SESSION_INTROUVABLE"
+    STOCK_INSUFFISANT = "STOCK_INSUFFISANT"
+    PAYE_APRES_ANNULATION = "PAYE_APRES_ANNULATION"
+    CODE_CHOICES = [
+        (MONTANT_DIFFERENT, "Montant différent de Stripe"),
+        (PAYE_LOCALEMENT_SEULEMENT, "Payé chez nous, pas chez Stripe"),
+        (SESSION_INTROUVABLE, "Session Stripe introuvable"),
+        (STOCK_INSUFFISANT, "Payé mais stock insuffisant"),
+        (PAYE_APRES_ANNULATION, "Payé chez Stripe, commande annulée"),
+    ]
+
+    commande = models.ForeignKey(
+        Commande, on_delete=models.CASCADE, related_name="anomalies_paiement"
+    )
+    execution = models.ForeignKey(
+        ExecutionReconciliation,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="anomalies",
+    )
+    code = models.CharField(max_length=40, choices=CODE_CHOICES)
+    details = models.TextField(blank=True)
+    resolue = models.BooleanField(default=False)
+    creee_le = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-creee_le"]
+        constraints = [
+            # une seule anomalie ouverte par commande et par type
+            models.UniqueConstraint(
+                fields=["commande", "code"],
+                condition=models.Q(resolue=False),
+                name="anomalie_ouverte_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.code} - commande #{self.commande_id}"
@@ -0,0 +1,268 @@
+# paiements/reconciliation.py
+"""
+Réconciliation Stripe <-> commandes (commande `reconcilier_paiements`).
+
+Les commandes en attente puis les commandes récentes sont parcourues par
+lots, en deux passes de pagination par clé qui lisent chacune un index
+(commande_session_attente_idx, puis commande_maj_idx) : mémoire et coût
+par lot constants, quelle que soit la taille de la table. Pour
+chaque lot, les sessions sont lues en parallèle (pool borné, débit plafonné)
+puis comparées à nos données, dans le thread principal :
+
+- payée chez Stripe, pas chez nous      -> commande matérialisée
+- session expirée, commande en attente  -> stock libéré, commande annulée
+- session ouverte depuis trop longtemps -> session expirée, idem
+- le reste (montants, sessions introuvables...) -> AnomaliePaiement
+"""
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Q
+from django.utils import timezone
+
+from commandes.models import Commande
+from commandes.reservations import liberer_commande
+from commandes.transitions import TransitionConcurrente, transitionner
+
+from .gateways import GatewayError, GatewayIndisponible, get_gateway
+from .models import AnomaliePaiement, ExecutionReconciliation, StatutPaiement
+from .services import materialiser_commande
+
+
+class Limiteur:
+    """Au plus `debit` appels par seconde, tous threads confondus (0 = illimité)."""
+
+    def __init__(self, debit):
+        self.intervalle = 1 / debit if debit else 0
+        self._prochain = time.monotonic()
+        self._verrou = threading.Lock()
+
+    def attendre(self):
+        if not self.intervalle:
+            return
+        with self._verrou:
+            maintenant = time.monotonic()
+            attente = self._prochain - maintenant
+            self._prochain = max(self._prochain, maintenant) + self.intervalle
+        if attente > 0:
+            time.sleep(attente)
+
+
+def commandes_en_attente(apres_id=0):
+    """
+    1re passe : commandes en attente liées à une session, par id.
+    stripe_session_id > '' écarte NULL et '' et reprend mot pour mot la
+    condition de l'index partiel commande_session_attente_idx.
+    """
+    return (
+        Commande.objects
+        .filter(statut=Commande.STATUT_EN_ATTENTE, stripe_session_id__gt="", pk__gt=apres_id)
+        .select_related("paiement")
+        .order_by("pk")
+    )
+
+
+def commandes_recentes(depuis, jusqu_a, apres=None):
+    """
+    2e passe : autres commandes liées à une session et modifiées entre
+    `depuis` et `jusqu_a` (début de l'exécution : une commande que la 1re
+    passe vient de confirmer n'est pas revue), par (updated_at, id) sur
+    commande_maj_idx. apres : (updated_at, id) de la dernière commande vue.
+    """
+    qs = (
+        Commande.objects
+        .filter(updated_at__gte=depuis, updated_at__lt=jusqu_a, stripe_session_id__gt="")
+        .exclude(statut=Commande.STATUT_EN_ATTENTE)
+    )
+    if apres is not None:
+        maj, pk = apres
+        qs = qs.filter(Q(updated_at__gt=maj) | Q(updated_at=maj, pk__gt=pk))
+    return qs.select_related("paiement").order_by("updated_at", "pk")
+
+
+def _montant_stripe(session):
+    if session.get("amount_total") is None:
+        return None
+    return (Decimal(session["amount_total"]) / 100).quantize(Decimal("0.01"))
+
+
+class Reconciliation:
+    def __init__(
+        self, execution, lot=500, concurrence=4, debit=20, perimee_apres=None,
+        limite=None, sortie=None,
+    ):
+        self.execution = execution
+        self.lot = lot
+        self.concurrence = concurrence
+        self.limiteur = Limiteur(debit)
+        self.perimee_apres = perimee_apres or timedelta(hours=2)
+        self.limite = limite
+        self.sortie = sortie
+        self.gateway = get_gateway()
+        self.rapport = Counter(execution.rapport)
+
+    # ---------- parcours ----------
+
+    def executer(self):
+        """Retourne True si tout a été parcouru, False si interrompu (reprise possible)."""
+        examinees = 0
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrence) as pool:
+                while self.limite is None or examinees < self.limite:
+                    taille = self.lot
+                    if self.limite is not None:
+                        taille = min(taille, self.limite - examinees)
+                    commandes = list(self._lot()[:taille])
+                    if not commandes:
+                        if self.execution.phase == ExecutionReconciliation.PHASE_EN_ATTENTE:
+                            self._sauvegarder(
+                                phase=ExecutionReconciliation.PHASE_RECENTES,
+                                curseur=0,
+                                curseur_maj=None,
+                            )
+                            continue
+                        self._terminer(ExecutionReconciliation.STATUT_TERMINEE)
+                        return True
+
+                    # avant _comparer, qui peut modifier les commandes
+                    dernier = commandes[-1]
+                    curseur = {"curseur": dernier.pk, "curseur_maj": dernier.updated_at}
+
+                    sessions = pool.map(self._lire_session, commandes)
+                    for commande, session in zip(commandes, sessions):
+                        self._comparer(commande, session)
+
+                    examinees += len(commandes)
+                    self._sauvegarder(**curseur)
+        except GatewayIndisponible:
+            # disjoncteur ouvert : inutile d'insister, on reprendra au prochain lancement
+            self.rapport["interruptions"] += 1
+        self._terminer(ExecutionReconciliation.STATUT_INTERROMPUE)
+        return False
+
+    def _lot(self):
+        execution = self.execution
+        if execution.phase == ExecutionReconciliation.PHASE_EN_ATTENTE:
+            return commandes_en_attente(execution.curseur)
+        apres = None
+        if execution.curseur_maj is not None:
+            apres = (execution.curseur_maj, execution.curseur)
+        return commandes_recentes(execution.depuis, execution.demarree_le, apres)
+
+    def _lire_session(self, commande):
+        self.limiteur.attendre()
+        try:
+            return self.gateway.recuperer_session(commande.stripe_session_id)
+        except GatewayIndisponible:
+            raise
+        except GatewayError as e:
+            return e
+
+    def _sauvegarder(self, **champs):
+        for nom, valeur in champs.items():
+            setattr(self.execution, nom, valeur)
+        self.execution.rapport = dict(self.rapport)
+        self.execution.save(update_fields=[*champs, "rapport"])
+
+    def _terminer(self, statut):
+        self._sauvegarder(statut=statut, terminee_le=timezone.now())
+
+    # ---------- décisions ----------
+
+    def _signaler(self, commande, code, details=""):
+        _anomalie, creee = AnomaliePaiement.objects.get_or_create(
+            commande=commande,
+            code=code,
+            resolue=False,
+            defaults={"details": details, "execution": self.execution},
+        )
+        self.rapport[f"anomalie_{code.lower()}"] += 1
+        if creee and self.sortie:
+            self.sortie(f"#{commande.pk} {code} {details}".rstrip())
+
+    def _comparer(self, commande, session):
+        self.rapport["examinees"] += 1
+        paiement = getattr(commande, "paiement", None)
+        paye_chez_nous = paiement is not None and paiement.statut == StatutPaiement.SUCCES
+
+        if isinstance(session, GatewayError):
+            if session.transitoire:
+                self.rapport["erreurs_gateway"] += 1
+            else:
+                self._signaler(commande, AnomaliePaiement.SESSION_INTROUVABLE, str(session))
+            return
+
+        if session.get("payment_status") == "paid":
+            self._session_payee(commande, session, paiement, paye_chez_nous)
+        elif paye_chez_nous:
+            self._signaler(
+                commande,
+                AnomaliePaiement.PAYE_LOCALEMENT_SEULEMENT,
+                f"session {session.get('status')}, paiement {session.get('payment_status')}",
+            )
+        elif commande.statut == Commande.STATUT_EN_ATTENTE:
+            self._session_non_payee(commande, session)
+        else:
+            self.rapport["conformes"] += 1
+
+    def _session_payee(self, commande, session, paiement, paye_chez_nous):
+        if commande.statut == Commande.STATUT_ANNULEE and not paye_chez_nous:
+            # remboursement à décider par un humain
+            self._signaler(commande, AnomaliePaiement.PAYE_APRES_ANNULATION)
+            return
+
+        if not paye_chez_nous:
+            _commande, paiement, _deja = materialiser_commande(
+                commande.pk, transaction_ref=session.get("payment_intent") or ""
+            )
+            if paiement.statut != StatutPaiement.SUCCES:
+                # refusé par materialiser_commande (commande annulée, stock
+                # épuisé) : anomalie déjà ouverte
+                self.rapport["paiements_refuses"] += 1
+                return
+            self.rapport["confirmees"] += 1
+
+        montant = _montant_stripe(session)
+        if montant is not None and montant != paiement.montant:
+            self._signaler(
+                commande,
+                AnomaliePaiement.MONTANT_DIFFERENT,
+                f"Stripe {montant} $, chez nous {paiement.montant} $",
+            )
+        elif paye_chez_nous:
+            self.rapport["conformes"] += 1
+
+    def _session_non_payee(self, commande, session):
+        statut_session = session.get("status")
+        if statut_session == "open":
+            if commande.created_at > timezone.now() - self.perimee_apres:
+                self.rapport["en_cours"] += 1  # le client est peut-être en train de payer
+                return
+            self.limiteur.attendre()
+            try:
+                session = self.gateway.expirer_session(session["id"])
+            except GatewayIndisponible:
+                raise
+            except GatewayError:
+                self.rapport["erreurs_gateway"] += 1
+                return
+            self.rapport["sessions_expirees"] += 1
+            if session.get("payment_status") == "paid":
+                # payée entre notre lecture et l'expiration
+                self._session_payee(commande, session, None, False)
+                return
+            statut_session = session.get("status")
+
+        if statut_session == "expired":
+            liberer_commande(commande)
+            try:
+                transitionner(commande, Commande.STATUT_ANNULEE)
+            except TransitionConcurrente:
+                return  # le client ou le cuisinier l'a déjà fait évoluer
+            self.rapport["annulees"] += 1
+        else:
+            self.rapport["en_cours"] += 1
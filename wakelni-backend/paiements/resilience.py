@@ -0,0 +1,183 @@
+# paiements/resilience.py
+"""
+Appels sortants vers la passerelle de paiement : délai global par appel,
+reprises avec jitter (opérations idempotentes seulement) et disjoncteur.
+
+Le disjoncteur est propre à chaque processus : quand Stripe est en panne,
+chaque worker WSGI l'apprend en quelques appels puis répond 503 tout de
+suite au lieu de rester bloqué jusqu'au timeout.
+"""
+import random
+import threading
+import time
+from collections import deque
+
+from wakelni_backend import metrics
+
+FERME = "ferme"
+DEMI_OUVERT = "demi_ouvert"
+OUVERT = "ouvert"
+CODES_ETAT = {FERME: 0, DEMI_OUVERT: 1, OUVERT: 2}
+
+_disjoncteurs = {}
+_verrou = threading.Lock()
+
+
+def _etats_disjoncteurs():
+    return [
+        ({"gateway": nom}, CODES_ETAT[d.etat])
+        for nom, d in list(_disjoncteurs.items())
+    ]
+
+
+etat_disjoncteur = metrics.gauge(
+    "wakelni_paiement_disjoncteur_etat",
+    "État du disjoncteur de la passerelle (0 fermé, 1 demi-ouvert, 2 ouvert).",
+    fonction=_etats_disjoncteurs,
+)
+appels = metrics.counter(
+    "wakelni_paiement_gateway_appels_total",
+    "Appels à la passerelle de paiement, par résultat.",
+)
+reprises = metrics.counter(
+    "wakelni_paiement_gateway_reprises_total",
+    "Nouvelles tentatives après une erreur transitoire.",
+)
+
+
+class Disjoncteur:
+    """
+    Fenêtre glissante des `fenetre` derniers appels : au-delà de `seuil`
+    (proportion d'erreurs transitoires, dès `min_appels` appels), le circuit
+    s'ouvre pendant `duree_ouverture` secondes. Ensuite un seul appel test
+    passe (demi-ouvert) : succès -> fermé, échec -> rouvert.
+    """
+
+    def __init__(
+        self, nom, fenetre=20, min_appels=10, seuil=0.5, duree_ouverture=30,
+        horloge=time.monotonic,
+    ):
+        self.nom = nom
+        self.min_appels = min_appels
+        self.seuil = seuil
+        self.duree_ouverture = duree_ouverture
+        self.horloge = horloge
+        self._resultats = deque(maxlen=fenetre)
+        self._verrou = threading.Lock()
+        self._etat = FERME
+        self._ouvert_le = 0.0
+        self._essai_en_cours = False
+
+    @property
+    def etat(self):
+        with self._verrou:
+            return self._etat_courant()
+
+    def _etat_courant(self):
+        if self._etat == OUVERT and self.horloge() - self._ouvert_le >= self.duree_ouverture:
+            self._etat = DEMI_OUVERT
+            self._essai_en_cours = False
+        return self._etat
+
+    def reessayer_dans(self):
+        """Secondes avant le prochain appel test (en-tête Retry-After)."""
+        with self._verrou:
+            restant = self.duree_ouverture - (self.horloge() - self._ouvert_le)
+        return max(1, int(restant + 0.999))
+
+    def autoriser(self):
+        """False si l'appel doit échouer tout de suite (circuit ouvert)."""
+        with self._verrou:
+            etat = self._etat_courant()
+            if etat == FERME:
+                return True
+            if etat == DEMI_OUVERT and not self._essai_en_cours:
+                self._essai_en_cours = True
+                return True
+            return False
+
+    def enregistrer(self, succes):
+        with self._verrou:
+            if self._etat_courant() == DEMI_OUVERT:
+                self._essai_en_cours = False
+                if succes:
+                    self._etat = FERME
+                    self._resultats.clear()
+                else:
+                    self._ouvrir()
+                return
+
+            self._resultats.append(succes)
+            erreurs = self._resultats.count(False)
+            if (
+                len(self._resultats) >= self.min_appels
+                and erreurs / len(self._resultats) >= self.seuil
+            ):
+                self._ouvrir()
+
+    def _ouvrir(self):
+        self._etat = OUVERT
+        self._ouvert_le = self.horloge()
+        self._resultats.clear()
+
+
+def disjoncteur(nom, **reglages):
+    """Disjoncteur partagé du processus pour cette passerelle."""
+    with _verrou:
+        if nom not in _disjoncteurs:
+            _disjoncteurs[nom] = Disjoncteur(nom, **reglages)
+        return _disjoncteurs[nom]
+
+
+def reinitialiser():
+    """Oublie l'état des disjoncteurs (tests, changement de réglages)."""
+    _disjoncteurs.clear()
+
+
+def appeler(
+    fonction, *, disjoncteur, erreur_transitoire, circuit_ouvert, operation,
+    gateway, idempotent=False, tentatives_max=3, delai_total=20.0,
+    delai_tentative=10.0, attente_base=0.2, horloge=time.monotonic,
+    dormir=time.sleep,
+):
+    """
+    Exécute fonction() sous la protection du disjoncteur.
+
+    - erreur_transitoire(exc) -> bool : l'erreur compte contre le disjoncteur
+      et peut être retentée ; les autres (requête invalide, carte refusée...)
+      prouvent que le service répond et remontent telles quelles.
+    - circuit_ouvert(disjoncteur) -> exception levée quand le circuit est ouvert.
+    - idempotent : seules ces opérations sont retentées (backoff exponentiel,
+      « full jitter »), tant que la tentative suivante tient dans delai_total.
+    """
+    echeance = horloge() + delai_total
+    tentative = 0
+    while True:
+        tentative += 1
+        if not disjoncteur.autoriser():
+            appels.inc(gateway=gateway, operation=operation, resultat="rejete")
+            raise circuit_ouvert(disjoncteur)
+        try:
+            resultat = fonction()
+        except Exception as e:
+            if not erreur_transitoire(e):
+                disjoncteur.enregistrer(True)
+                appels.inc(gateway=gateway, operation=operation, resultat="erreur")
+                raise
+            disjoncteur.enregistrer(False)
+            appels.inc(gateway=gateway, operation=operation, resultat="erreur_transitoire")
+
+            attente = random.uniform(0, attente_base * 2 ** (tentative - 1))
+            if (
+                not idempotent
+                or tentative >= tentatives_max
+                or horloge() + attente + delai_tentative > echeance
+            ):
+                raise
+            reprises.inc(gateway=gateway, operation=operation)
+            dormir(attente)
+            continue
+
+        disjoncteur.enregistrer(True)
+        appels.inc(gateway=gateway, operation=operation, resultat="ok")
+        return resultat
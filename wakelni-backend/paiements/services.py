@@ -0,0 +1,173 @@
+# paiements/services.py
+from django.db import transaction
+from django.utils import timezone
+
+from commandes.models import Commande, LigneCommande, ReservationStock
+from commandes.reservations import StockInsuffisant, consommer as consommer_reservations, reserver
+from commandes.signals import signaler_apres_commit
+from notifications_app.services import notifier
+from paniers.models import LignePanier, Panier
+
+from .models import AnomaliePaiement, Paiement, StatutPaiement, TypePaiement
+
+
+class _PanierModifie(Exception):
+    pass
+
+
+def _reserver_depuis_panier(commande):
+    """
+    Commande sans réservation (checkout antérieur aux réservations de
+    stock) : réserve le panier actuel du client, à condition qu'il
+    corresponde encore à ce qui a été payé (commande.total). Sinon rien
+    n'est réservé et _PanierModifie est levée.
+    """
+    lignes = [
+        (ligne.plat, ligne.quantite)
+        for ligne in LignePanier.objects
+        .filter(panier__client_id=commande.client_id)
+        .select_related("plat")
+    ]
+    if not lignes:
+        raise StockInsuffisant(
+            None, "Ni réservation ni panier à partir desquels créer la commande."
+        )
+    with transaction.atomic():
+        reservations = reserver(commande, lignes)
+        montant = sum(r.quantite * r.prix_unitaire for r in reservations)
+        if montant != commande.total:
+            # sortie du bloc : réservations annulées (savepoint)
+            raise _PanierModifie(
+                f"Panier modifié après le paiement : {montant} $ au panier, "
+                f"{commande.total} $ payés."
+            )
+
+
+def _refuser(commande, paiement, code, details, transaction_ref):
+    """
+    Paiement reçu qu'on ne peut pas appliquer : anomalie ouverte (remboursement
+    à décider par un humain) et Paiement en ECHEC, que ConfirmPaymentView
+    présente au client. Rien n'est consommé.
+    """
+    AnomaliePaiement.objects.get_or_create(
+        commande=commande, code=code, resolue=False, defaults={"details": details}
+    )
+    if paiement is None:
+        return Paiement.objects.create(
+            commande=commande,
+            montant=commande.total,
+            statut=StatutPaiement.ECHEC,
+            type=TypePaiement.CARTE_CREDIT,
+            transaction_ref=transaction_ref or "",
+        )
+    paiement.statut = StatutPaiement.ECHEC
+    if not paiement.transaction_ref:
+        paiement.transaction_ref = transaction_ref or ""
+    paiement.save(update_fields=["statut", "transaction_ref"])
+    return paiement
+
+
+def materialiser_commande(commande_id, transaction_ref=""):
+    """
+    Paiement confirmé -> commande définitive, en une seule transaction et
+    en un nombre constant de requêtes (quelle que soit la taille du panier) :
+
+    - sortie de stock des réservations (un UPDATE groupé, voir commandes/reservations.py)
+    - lignes de commande créées d'un coup à partir des réservations
+      (ce qui a été réservé et payé au checkout)
+    - panier vidé, notification au cuisinier, Paiement en SUCCES
+    - commande poussée dans la file temps réel du cuisinier, après le commit
+
+    Une commande sans réservation (checkout antérieur aux réservations de
+    stock) est reprise du panier du client : réservée puis consommée comme
+    les autres si le panier vaut toujours le montant payé ; sinon anomalie
+    MONTANT_DIFFERENT et Paiement en ECHEC.
+
+    Plus assez de stock (réservation expirée puis reprise par un autre
+    client) : anomalie STOCK_INSUFFISANT et Paiement en ECHEC, remboursement
+    à faire à la main.
+
+    Une commande qui n'est plus EN_ATTENTE (annulée pendant le paiement)
+    n'est pas matérialisée : anomalie PAYE_APRES_ANNULATION et Paiement en
+    ECHEC (voir _refuser).
+
+    Idempotent : si le Paiement est déjà en SUCCES ou en ECHEC, rien n'est
+    refait. Retourne (commande, paiement, deja_traite).
+    """
+    with transaction.atomic():
+        # verrou : deux confirmations de la même session ne se chevauchent pas
+        commande = Commande.objects.select_for_update().get(pk=commande_id)
+        paiement = Paiement.objects.filter(commande=commande).first()
+        if paiement and paiement.statut in (StatutPaiement.SUCCES, StatutPaiement.ECHEC):
+            return commande, paiement, True
+
+        if commande.statut != Commande.STATUT_EN_ATTENTE:
+            paiement = _refuser(
+                commande,
+                paiement,
+                AnomaliePaiement.PAYE_APRES_ANNULATION,
+                f"Paiement reçu pour une commande {commande.get_statut_display().lower()}.",
+                transaction_ref,
+            )
+            return commande, paiement, False
+
+        try:
+            if not ReservationStock.objects.filter(commande=commande).exists():
+                _reserver_depuis_panier(commande)
+            reservations = consommer_reservations(commande)
+        except StockInsuffisant as e:
+            # reserver() / consommer() n'ont rien modifié (tout ou rien)
+            paiement = _refuser(
+                commande, paiement, AnomaliePaiement.STOCK_INSUFFISANT, str(e), transaction_ref
+            )
+            return commande, paiement, False
+        except _PanierModifie as e:
+            paiement = _refuser(
+                commande, paiement, AnomaliePaiement.MONTANT_DIFFERENT, str(e), transaction_ref
+            )
+            return commande, paiement, False
+
+        LigneCommande.objects.bulk_create([
+            LigneCommande(
+                commande=commande,
+                plat_id=r.plat_id,
+                quantite=r.quantite,
+                sous_total=r.quantite * r.prix_unitaire,
+            )
+            for r in reservations
+        ])
+
+        # vider le panier (un seul DELETE)
+        LignePanier.objects.filter(panier__client_id=commande.client_id).delete()
+        Panier.objects.filter(client_id=commande.client_id).update(updated_at=timezone.now())
+
+        # le cuisinier ne voit la commande qu'une fois payée (un seul par panier)
+        if reservations:
+            commande.cuisinier_id = reservations[0].plat.cuisinier_id
+        commande.updated_at = timezone.now()
+        commande.save(update_fields=["cuisinier", "updated_at"])
+        signaler_apres_commit(commande, "nouvelle")
+
+        if reservations:
+            plat = reservations[0].plat
+            notifier(
+                commande.cuisinier_id,
+                f"Nouvelle commande payée #{commande.id} "
+                f"pour votre plat {plat.nom}.",
+            )
+
+        if paiement is None:
+            paiement = Paiement.objects.create(
+                commande=commande,
+                montant=commande.total,
+                statut=StatutPaiement.SUCCES,
+                type=TypePaiement.CARTE_CREDIT,  # ici on force "carte", tu pourras raffiner
+                transaction_ref=transaction_ref or "",
+            )
+        else:
+            paiement.statut = StatutPaiement.SUCCES
+            if not paiement.transaction_ref:
+                paiement.transaction_ref = transaction_ref or ""
+            paiement.save(update_fields=["statut", "transaction_ref"])
+
+    return commande, paiement, False
@@ -1,3 +1,572 @@
-from django.test import TestCase
+import hashlib
+import hmac
+import json
+import time
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from commandes.models import Commande, LigneCommande, ReservationStock
+from commandes.reservations import liberer_commande, reserver
+from notifications_app.models import MessageSortant
+from paniers.models import LignePanier, Panier
+from plats.models import Plat
+
+from . import resilience
+from .gateways import FakeGateway, GatewayError, LigneFacturee
+from .models import (
+    AnomaliePaiement,
+    EvenementStripe,
+    ExecutionReconciliation,
+    Paiement,
+    StatutPaiement,
+)
+from .reconciliation import commandes_en_attente, commandes_recentes
+from .services import materialiser_commande
+
+User = get_user_model()
+
+FIXTURES_STRIPE = Path(__file__).parent / "fixtures" / "stripe"
+SECRET_WEBHOOK = "whsec_test"
+
+
+class PaiementTestCase(TestCase):
+    def setUp(self):
+        resilience.reinitialiser()
+        FakeGateway.reinitialiser()
+        self.client_user = User.objects.create_user(
+            username="client", password="x", role=User.Role.CLIENT
+        )
+        self.cuisinier = User.objects.create_user(
+            username="chef", password="x", role=User.Role.CUISINIER
+        )
+        self.panier = Panier.objects.create(client=self.client_user)
+
+    def commande_payee(self, nb_lignes, session_id="cs_test"):
+        plats = Plat.objects.bulk_create([
+            Plat(
+                cuisinier=self.cuisinier,
+                nom=f"Plat {i}",
+                prix=Decimal("10"),
+                stock=5,
+                ville="Montréal",
+            )
+            for i in range(nb_lignes)
+        ])
+        LignePanier.objects.bulk_create([
+            LignePanier(panier=self.panier, plat=plat, quantite=2, prix_unitaire=plat.prix)
+            for plat in plats
+        ])
+        commande = Commande.objects.create(
+            client=self.client_user,
+            total=Decimal("20") * nb_lignes,
+            stripe_session_id=session_id,
+        )
+        reserver(commande, [(plat, 2) for plat in plats])
+        return commande
+
+
+class MaterialisationTests(PaiementTestCase):
+    def nb_requetes(self, nb_lignes):
+        commande = self.commande_payee(nb_lignes, session_id=f"cs_{nb_lignes}")
+        with CaptureQueriesContext(connection) as ctx:
+            materialiser_commande(commande.pk, transaction_ref="pi_test")
+        LignePanier.objects.filter(panier=self.panier).delete()
+        return len(ctx.captured_queries)
+
+    def test_nombre_de_requetes_constant(self):
+        # même nombre de requêtes pour 1, 10 et 100 lignes
+        self.assertEqual(len({self.nb_requetes(n) for n in (1, 10, 100)}), 1)
+
+    def test_materialisation_complete(self):
+        commande = self.commande_payee(3)
+        commande, paiement, deja = materialiser_commande(commande.pk, "pi_1")
+
+        self.assertFalse(deja)
+        self.assertEqual(paiement.statut, StatutPaiement.SUCCES)
+        self.assertEqual(paiement.transaction_ref, "pi_1")
+        lignes = LigneCommande.objects.filter(commande=commande)
+        self.assertEqual(lignes.count(), 3)
+        self.assertTrue(all(l.sous_total == Decimal("20") for l in lignes))
+        self.assertFalse(LignePanier.objects.filter(panier=self.panier).exists())
+        self.assertEqual(MessageSortant.objects.filter(destinataire=self.cuisinier).count(), 1)
+        self.assertEqual(
+            list(Plat.objects.values_list("stock", "stock_reserve").distinct()), [(3, 0)]
+        )
+        self.assertFalse(
+            ReservationStock.objects.exclude(statut=ReservationStock.STATUT_CONSOMMEE).exists()
+        )
+
+    def test_rejouer_ne_refait_rien(self):
+        commande = self.commande_payee(2)
+        materialiser_commande(commande.pk, "pi_1")
+        _commande, paiement, deja = materialiser_commande(commande.pk, "pi_1")
+
+        self.assertTrue(deja)
+        self.assertEqual(Paiement.objects.count(), 1)
+        self.assertEqual(LigneCommande.objects.count(), 2)
+        self.assertEqual(MessageSortant.objects.count(), 1)
+        self.assertEqual(set(Plat.objects.values_list("stock", flat=True)), {3})
+
+    def test_commande_sans_reservation_reprise_du_panier(self):
+        commande = self.commande_payee(2)
+        ReservationStock.objects.all().delete()
+        Plat.objects.update(stock_reserve=0)
+
+        commande, paiement, _deja = materialiser_commande(commande.pk, "pi_1")
+
+        self.assertEqual(paiement.statut, StatutPaiement.SUCCES)
+        self.assertEqual(LigneCommande.objects.filter(commande=commande).count(), 2)
+        self.assertEqual(commande.cuisinier, self.cuisinier)
+        self.assertFalse(LignePanier.objects.exists())
+        self.assertEqual(
+            list(Plat.objects.values_list("stock", "stock_reserve").distinct()), [(3, 0)]
+        )
+
+    def test_commande_sans_reservation_panier_modifie(self):
+        commande = self.commande_payee(2)
+        ReservationStock.objects.all().delete()
+        Plat.objects.update(stock_reserve=0)
+        # le client a changé son panier entre le checkout et le webhook
+        LignePanier.objects.filter(pk=LignePanier.objects.first().pk).update(quantite=3)
+
+        _commande, paiement, _deja = materialiser_commande(commande.pk, "pi_1")
+
+        self.assertEqual(paiement.statut, StatutPaiement.ECHEC)
+        self.assertTrue(AnomaliePaiement.objects.filter(
+            commande=commande, code=AnomaliePaiement.MONTANT_DIFFERENT
+        ).exists())
+        self.assertFalse(LigneCommande.objects.exists())
+        self.assertFalse(ReservationStock.objects.exists())
+        self.assertEqual(
+            list(Plat.objects.values_list("stock", "stock_reserve").distinct()), [(5, 0)]
+        )
+        self.assertEqual(LignePanier.objects.count(), 2)
+
+    def test_commande_sans_reservation_ni_panier(self):
+        commande = self.commande_payee(1)
+        ReservationStock.objects.all().delete()
+        LignePanier.objects.all().delete()
+
+        _commande, paiement, _deja = materialiser_commande(commande.pk, "pi_1")
+
+        self.assertEqual(paiement.statut, StatutPaiement.ECHEC)
+        self.assertTrue(AnomaliePaiement.objects.filter(
+            commande=commande, code=AnomaliePaiement.STOCK_INSUFFISANT
+        ).exists())
+        self.assertFalse(LigneCommande.objects.exists())
+
+    def test_commande_annulee_non_materialisee(self):
+        commande = self.commande_payee(2)
+        Commande.objects.filter(pk=commande.pk).update(statut=Commande.STATUT_ANNULEE)
+
+        _commande, paiement, deja = materialiser_commande(commande.pk, "pi_1")
+
+        self.assertFalse(deja)
+        self.assertEqual(paiement.statut, StatutPaiement.ECHEC)
+        self.assertTrue(AnomaliePaiement.objects.filter(
+            commande=commande, code=AnomaliePaiement.PAYE_APRES_ANNULATION
+        ).exists())
+        self.assertFalse(LigneCommande.objects.exists())
+        self.assertEqual(LignePanier.objects.filter(panier=self.panier).count(), 2)
+        self.assertEqual(set(Plat.objects.values_list("stock", flat=True)), {5})
+        self.assertFalse(MessageSortant.objects.exists())
+
+
+@override_settings(STRIPE_WEBHOOK_SECRET=SECRET_WEBHOOK)
+class WebhookStripeTests(PaiementTestCase):
+    """Rejoue des événements Stripe enregistrés (aucun appel réseau)."""
+
+    def setUp(self):
+        super().setUp()
+        self.commande = self.commande_payee(2, session_id="cs_test_a1Qw7Hk3Lz9Pm2Xv5Rt8Yb4Nc6Ud0Ef")
+        self.api = APIClient()
+        self.api.force_authenticate(self.client_user)
+
+    def evenement(self, nom):
+        evenement = json.loads((FIXTURES_STRIPE / f"{nom}.json").read_text())
+        evenement["data"]["object"]["client_reference_id"] = str(self.commande.id)
+        return evenement
+
+    def envoyer(self, evenement, secret=SECRET_WEBHOOK):
+        corps = json.dumps(evenement)
+        horodatage = int(time.time())
+        signature = hmac.new(
+            secret.encode(), f"{horodatage}.{corps}".encode(), hashlib.sha256
+        ).hexdigest()
+        return APIClient().post(
+            "/api/paiements/webhook/",
+            corps,
+            content_type="application/json",
+            HTTP_STRIPE_SIGNATURE=f"t={horodatage},v1={signature}",
+        )
+
+    def confirmer(self):
+        return self.api.post(
+            "/api/paiements/confirm/",
+            {"session_id": self.commande.stripe_session_id},
+            format="json",
+        )
+
+    def test_signature_invalide_refusee(self):
+        r = self.envoyer(self.evenement("checkout_session_completed"), secret="whsec_autre")
+        self.assertEqual(r.status_code, 400)
+        self.assertFalse(EvenementStripe.objects.exists())
+
+    def test_paiement_confirme_par_le_worker(self):
+        evenement = self.evenement("checkout_session_completed")
+        self.assertEqual(self.envoyer(evenement).status_code, 200)
+        self.assertEqual(self.envoyer(evenement).status_code, 200)  # relivraison
+        self.assertEqual(EvenementStripe.objects.count(), 1)
+
+        # reçu mais pas encore traité : le frontend patiente
+        self.assertEqual(self.confirmer().status_code, 202)
+        self.assertFalse(LigneCommande.objects.exists())
+
+        call_command("traiter_evenements_stripe", stdout=StringIO())
+
+        r = self.confirmer()
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.data["transaction_ref"], "pi_3QfXk0Ew4xTqZ8nR1uV2wX3y")
+        self.assertEqual(LigneCommande.objects.filter(commande=self.commande).count(), 2)
+        self.assertEqual(
+            EvenementStripe.objects.get().statut, EvenementStripe.STATUT_TRAITE
+        )
+
+    def test_stock_epuise_etat_definitif(self):
+        # réservation expirée puis stock vendu à quelqu'un d'autre
+        liberer_commande(self.commande)
+        Plat.objects.update(stock=0)
+        self.envoyer(self.evenement("checkout_session_completed"))
+        call_command("traiter_evenements_stripe", stdout=StringIO())
+
+        r = self.confirmer()
+        self.assertEqual(r.status_code, 409)  # le frontend arrête d'attendre
+        self.assertEqual(r.data["statut"], StatutPaiement.ECHEC)
+        self.assertTrue(AnomaliePaiement.objects.filter(
+            commande=self.commande, code=AnomaliePaiement.STOCK_INSUFFISANT
+        ).exists())
+        self.assertFalse(LigneCommande.objects.exists())
+
+    def test_session_expiree_libere_le_stock(self):
+        self.envoyer(self.evenement("checkout_session_expired"))
+        call_command("traiter_evenements_stripe", stdout=StringIO())
+
+        self.assertEqual(set(Plat.objects.values_list("stock_reserve", flat=True)), {0})
+        self.assertEqual(self.confirmer().status_code, 202)
+
+
+@override_settings(
+    PAIEMENT_GATEWAY="fake",
+    PAIEMENT_FAKE_URL_BASE="",
+    STRIPE_WEBHOOK_SECRET=SECRET_WEBHOOK,
+)
+class FakeGatewayTests(PaiementTestCase):
+    """Tunnel complet panier -> checkout -> paiement -> confirmation, sans Stripe."""
+
+    def setUp(self):
+        super().setUp()
+        self.plat = Plat.objects.create(
+            cuisinier=self.cuisinier, nom="Tajine", prix=Decimal("15"), stock=4
+        )
+        LignePanier.objects.create(
+            panier=self.panier, plat=self.plat, quantite=3, prix_unitaire=self.plat.prix
+        )
+        self.api = APIClient()
+        self.api.force_authenticate(self.client_user)
+
+    def test_tunnel_complet(self):
+        r = self.api.post("/api/paiements/create-checkout-session/")
+        self.assertEqual(r.status_code, 200)
+        commande = Commande.objects.get()
+        self.assertTrue(commande.stripe_session_id.startswith("cs_fake_"))
+        self.assertIsNone(commande.cuisinier)  # invisible côté cuisinier avant paiement
+
+        # la « page Stripe » simulée paie et renvoie vers le frontend
+        r = APIClient().get(r.data["url"])
+        self.assertEqual(r.status_code, 302)
+        self.assertIn(f"session_id={commande.stripe_session_id}", r["Location"])
+
+        call_command("traiter_evenements_stripe", stdout=StringIO())
+        r = self.api.post(
+            "/api/paiements/confirm/",
+            {"session_id": commande.stripe_session_id},
+            format="json",
+        )
+        self.assertEqual(r.status_code, 200)
+        self.assertTrue(r.data["transaction_ref"].startswith("pi_fake_"))
+        commande.refresh_from_db()
+        self.assertEqual(commande.cuisinier, self.cuisinier)
+        self.plat.refresh_from_db()
+        self.assertEqual((self.plat.stock, self.plat.stock_reserve), (1, 0))
+
+    @override_settings(PAIEMENT_FAKE_TAUX_ECHEC=1)
+    def test_echec_passerelle_rend_le_stock(self):
+        r = self.api.post("/api/paiements/create-checkout-session/")
+
+        self.assertEqual(r.status_code, 502)
+        self.assertFalse(Commande.objects.exists())
+        self.plat.refresh_from_db()
+        self.assertEqual(self.plat.stock_reserve, 0)
+
+    def test_webhook_signe_par_la_fausse_passerelle(self):
+        self.api.post("/api/paiements/create-checkout-session/")
+        commande = Commande.objects.get()
+        gateway = FakeGateway()
+        corps = json.dumps(gateway.payer(commande.stripe_session_id))
+
+        r = APIClient().post(
+            "/api/paiements/webhook/",
+            corps,
+            content_type="application/json",
+            HTTP_STRIPE_SIGNATURE=gateway.signer(corps),
+        )
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(EvenementStripe.objects.count(), 1)
+
+    @override_settings(RESERVATION_STOCK_TTL_MINUTES=10)
+    def test_session_au_moins_30_minutes(self):
+        self.api.post("/api/paiements/create-checkout-session/")
+        commande = Commande.objects.get()
+
+        session = FakeGateway().recuperer_session(commande.stripe_session_id)
+        self.assertGreaterEqual(
+            session["expires_at"], (timezone.now() + timedelta(minutes=30)).timestamp()
+        )
+        # la réservation expire avec la session
+        reservation = ReservationStock.objects.get(commande=commande)
+        self.assertEqual(int(reservation.expire_le.timestamp()), session["expires_at"])
+
+    def test_annulation_expire_la_session(self):
+        r = self.api.post("/api/paiements/create-checkout-session/")
+        commande = Commande.objects.get()
+
+        self.assertEqual(self.api.post(f"/api/commandes/{commande.pk}/annuler/").status_code, 200)
+        session = FakeGateway().recuperer_session(commande.stripe_session_id)
+        self.assertEqual(session["status"], "expired")
+        # la page de paiement ne peut plus payer
+        self.assertEqual(APIClient().get(r.data["url"]).status_code, 502)
+        self.plat.refresh_from_db()
+        self.assertEqual(self.plat.stock_reserve, 0)
+
+    def test_annulation_refusee_si_deja_payee(self):
+        self.api.post("/api/paiements/create-checkout-session/")
+        commande = Commande.objects.get()
+        FakeGateway().payer(commande.stripe_session_id)
+
+        r = self.api.post(f"/api/commandes/{commande.pk}/annuler/")
+
+        self.assertEqual(r.status_code, 409)
+        commande.refresh_from_db()
+        self.assertEqual(commande.statut, Commande.STATUT_EN_ATTENTE)
+
+    @override_settings(PAIEMENT_GATEWAY="stripe")
+    def test_page_simulee_absente_avec_stripe(self):
+        self.assertEqual(APIClient().get("/api/paiements/fake/cs_x/").status_code, 404)
+
+    @override_settings(PAIEMENT_DISJONCTEUR_MIN_APPELS=3, PAIEMENT_FAKE_TAUX_ECHEC=1)
+    def test_disjoncteur_ouvert_repond_503(self):
+        # 3 tentatives en échec -> circuit ouvert
+        self.assertEqual(self.api.post("/api/paiements/create-checkout-session/").status_code, 502)
+
+        r = self.api.post("/api/paiements/create-checkout-session/")
+        self.assertEqual(r.status_code, 503)
+        self.assertIn("Retry-After", r)
+        self.assertFalse(Commande.objects.exists())
+        self.plat.refresh_from_db()
+        self.assertEqual(self.plat.stock_reserve, 0)
+
+
+@override_settings(PAIEMENT_GATEWAY="fake", PAIEMENT_FAKE_URL_BASE="")
+class ReconciliationTests(PaiementTestCase):
+    def commande_avec_session(self, age=timedelta(0)):
+        commande = self.commande_payee(1, session_id=None)
+        session = FakeGateway().creer_session(
+            commande,
+            [LigneFacturee("Plat", Decimal("10"), 2)],
+            success_url="http://front/ok?session_id={CHECKOUT_SESSION_ID}",
+            cancel_url="http://front/panier",
+            expire_le=timezone.now() + timedelta(minutes=30),
+        )
+        Commande.objects.filter(pk=commande.pk).update(
+            stripe_session_id=session.id, created_at=timezone.now() - age
+        )
+        commande.stripe_session_id = session.id
+        return commande
+
+    def reconcilier(self, *args):
+        sortie = StringIO()
+        call_command("reconcilier_paiements", "--debit", "0", *args, stdout=sortie)
+        return sortie.getvalue()
+
+    def test_lots_lus_par_index(self):
+        maintenant = timezone.now()
+        passes = {
+            "commande_session_attente_idx": commandes_en_attente(42)[:500],
+            "commande_maj_idx": commandes_recentes(
+                maintenant - timedelta(days=2), maintenant, (maintenant, 42)
+            )[:500],
+        }
+        for index, lot in passes.items():
+            with self.subTest(index=index), connection.cursor() as curseur:
+                if connection.vendor == "postgresql":
+                    # table presque vide : forcer le plan qu'on aurait à grande échelle
+                    curseur.execute("SET LOCAL enable_seqscan = off")
+                self.assertIn(index, lot.explain())
+
+    def test_ecarts_corriges_ou_signales(self):
+        payee = self.commande_avec_session()
+        FakeGateway().payer(payee.stripe_session_id)  # webhook jamais reçu
+        abandonnee = self.commande_avec_session(age=timedelta(hours=5))
+        en_cours = self.commande_avec_session()
+        paye_localement = self.commande_avec_session()
+        Paiement.objects.create(
+            commande=paye_localement, montant=Decimal("20"), statut=StatutPaiement.SUCCES
+        )
+        inconnue = self.commande_payee(1, session_id="cs_inconnue")
+
+        self.assertIn("Réconciliation terminée", self.reconcilier())
+
+        self.assertEqual(payee.paiement.statut, StatutPaiement.SUCCES)
+        abandonnee.refresh_from_db()
+        self.assertEqual(abandonnee.statut, Commande.STATUT_ANNULEE)
+        self.assertEqual(
+            FakeGateway().recuperer_session(abandonnee.stripe_session_id)["status"], "expired"
+        )
+        en_cours.refresh_from_db()
+        self.assertEqual(en_cours.statut, Commande.STATUT_EN_ATTENTE)
+        self.assertEqual(
+            set(AnomaliePaiement.objects.values_list("commande_id", "code")),
+            {
+                (paye_localement.pk, AnomaliePaiement.PAYE_LOCALEMENT_SEULEMENT),
+                (inconnue.pk, AnomaliePaiement.SESSION_INTROUVABLE),
+            },
+        )
+        rapport = ExecutionReconciliation.objects.get().rapport
+        self.assertEqual(
+            (rapport["examinees"], rapport["confirmees"], rapport["annulees"]), (5, 1, 1)
+        )
+
+        # relancer ne duplique pas les anomalies
+        self.reconcilier()
+        self.assertEqual(AnomaliePaiement.objects.count(), 2)
+
+    def test_reprise_apres_interruption(self):
+        commandes = [self.commande_avec_session() for _ in range(3)]
+
+        self.reconcilier("--lot", "1", "--limite", "2")
+        execution = ExecutionReconciliation.objects.get()
+        self.assertEqual(execution.statut, ExecutionReconciliation.STATUT_INTERROMPUE)
+        self.assertEqual(execution.curseur, commandes[1].pk)
+
+        self.assertIn(f"Reprise après la commande #{commandes[1].pk}", self.reconcilier())
+        execution.refresh_from_db()
+        self.assertEqual(execution.statut, ExecutionReconciliation.STATUT_TERMINEE)
+        self.assertEqual(execution.rapport["examinees"], 3)
+
+    def test_disjoncteur_ouvert_interrompt(self):
+        self.commande_avec_session()
+        with self.settings(PAIEMENT_FAKE_TAUX_ECHEC=1, PAIEMENT_DISJONCTEUR_MIN_APPELS=1):
+            self.assertIn("interrompue", self.reconcilier())
+        self.assertEqual(
+            ExecutionReconciliation.objects.get().statut,
+            ExecutionReconciliation.STATUT_INTERROMPUE,
+        )
+
+
+class Horloge:
+    def __init__(self):
+        self.maintenant = 0.0
+
+    def __call__(self):
+        return self.maintenant
+
+    def dormir(self, secondes):
+        self.maintenant += secondes
+
+
+class ResilienceTests(SimpleTestCase):
+    def setUp(self):
+        self.horloge = Horloge()
+        self.disjoncteur = resilience.Disjoncteur(
+            "test", fenetre=4, min_appels=4, seuil=0.5, duree_ouverture=30,
+            horloge=self.horloge,
+        )
+
+    def appeler(self, fonction, **kwargs):
+        return resilience.appeler(
+            fonction,
+            disjoncteur=self.disjoncteur,
+            erreur_transitoire=lambda e: getattr(e, "transitoire", False),
+            circuit_ouvert=lambda d: RuntimeError("ouvert"),
+            operation="test",
+            gateway="test",
+            horloge=self.horloge,
+            dormir=self.horloge.dormir,
+            **kwargs,
+        )
+
+    def test_reprises_seulement_si_idempotent_et_transitoire(self):
+        self.disjoncteur = resilience.Disjoncteur("test", min_appels=100)
+        essais = []
+
+        def panne():
+            essais.append(1)
+            raise GatewayError("panne", transitoire=True)
+
+        with self.assertRaises(GatewayError):
+            self.appeler(panne, idempotent=True, tentatives_max=3)
+        self.assertEqual(len(essais), 3)
+
+        essais.clear()
+        with self.assertRaises(GatewayError):
+            self.appeler(panne, idempotent=False)
+        self.assertEqual(len(essais), 1)
+
+        def refus():
+            essais.append(1)
+            raise GatewayError("carte refusée")
+
+        essais.clear()
+        with self.assertRaises(GatewayError):
+            self.appeler(refus, idempotent=True)
+        self.assertEqual(len(essais), 1)
+
+    def test_budget_total_respecte(self):
+        essais = []
+
+        def lent():
+            essais.append(1)
+            self.horloge.maintenant += 8
+            raise GatewayError("délai dépassé", transitoire=True)
+
+        with self.assertRaises(GatewayError):
+            self.appeler(lent, idempotent=True, tentatives_max=5, delai_total=15, delai_tentative=8)
+        self.assertEqual(len(essais), 1)
+
+    def test_cycle_du_disjoncteur(self):
+        for succes in (True, False, False, True):
+            self.disjoncteur.enregistrer(succes)
+        self.assertEqual(self.disjoncteur.etat, resilience.OUVERT)
+        self.assertFalse(self.disjoncteur.autoriser())
+        self.assertEqual(self.disjoncteur.reessayer_dans(), 30)
+
+        self.horloge.maintenant += 30
+        self.assertTrue(self.disjoncteur.autoriser())   # appel test
+        self.assertFalse(self.disjoncteur.autoriser())  # un seul à la fois
+        self.disjoncteur.enregistrer(False)
+        self.assertEqual(self.disjoncteur.etat, resilience.OUVERT)
+
+        self.horloge.maintenant += 30
+        self.assertTrue(self.disjoncteur.autoriser())
+        self.disjoncteur.enregistrer(True)
+        self.assertEqual(self.disjoncteur.etat, resilience.FERME)
@@ -1,7 +1,14 @@
 from django.urls import path
-from .views import CreateCheckoutSessionView, ConfirmPaymentView
+from .views import (
+    ConfirmPaymentView,
+    CreateCheckoutSessionView,
+    FakeCheckoutView,
+    StripeWebhookView,
+)
 
 urlpatterns = [
     path("create-checkout-session/", CreateCheckoutSessionView.as_view()),
     path("confirm/", ConfirmPaymentView.as_view()),
+    path("webhook/", StripeWebhookView.as_view()),
+    path("fake/<str:session_id>/", FakeCheckoutView.as_view()),
 ]
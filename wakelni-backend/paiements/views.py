@@ -1,98 +1,166 @@
 # paiements/views.py
-import stripe
-from decimal import Decimal
-
-from django.conf import settings
+from django.db import transaction
+from django.http import Http404, HttpResponseRedirect
+from django.utils import timezone
 from rest_framework import status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from paniers.models import Panier
 from paniers.views import get_or_create_panier_courant
-from commandes.models import Commande, LigneCommande
-from notifications_app.models import Notification  # ✅ import de la notif
+from commandes.models import Commande
+from commandes.reservations import (
+    StockInsuffisant,
+    duree_reservation,
+    liberer_commande,
+    prolonger_commande,
+    reserver,
+)
 
 # ✅ IMPORTS POUR PAIEMENT
-from .models import Paiement, StatutPaiement, TypePaiement
-
-stripe.api_key = settings.STRIPE_SECRET_KEY
+from .evenements import enregistrer
+from .gateways import (
+    DUREE_SESSION_MIN,
+    FakeGateway,
+    GatewayError,
+    GatewayIndisponible,
+    LigneFacturee,
+    SignatureInvalide,
+    get_gateway,
+)
+from .models import StatutPaiement
+
+
+def reponse_erreur_gateway(erreur):
+    if isinstance(erreur, GatewayIndisponible):
+        # disjoncteur ouvert : échec immédiat, le client réessaiera plus tard
+        return Response(
+            {"detail": str(erreur)},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": str(erreur.reessayer_dans)},
+        )
+    return Response(
+        {"detail": "Le service de paiement est indisponible, réessayez."},
+        status=status.HTTP_502_BAD_GATEWAY,
+    )
 
 
 class CreateCheckoutSessionView(APIView):
     """
     1) Récupère le panier courant
-    2) Crée une session Stripe Checkout
-    3) Crée une Commande en statut EN_ATTENTE
-    ⚠️ Ne diminue PAS le stock, ne vide PAS le panier.
+    2) Crée une Commande en statut EN_ATTENTE et réserve le stock (TTL)
+    3) Crée une session Stripe Checkout qui expire avec la réservation
+    ⚠️ Ne diminue PAS le stock (il est seulement réservé), ne vide PAS le panier.
     """
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request):
-        # 1) Récupérer le panier du client
-        panier = get_or_create_panier_courant(request.user)
+        # 1) Récupérer le panier du client (total + nb de lignes calculés en SQL)
+        panier = Panier.objects.avec_totaux().get(
+            pk=get_or_create_panier_courant(request.user).pk
+        )
 
-        if not panier.lignes.exists():
+        if not panier.nb_lignes:
             return Response(
                 {"detail": "Votre panier est vide."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # 2) Construire les line_items pour Stripe
-        line_items = []
+        # 2) Lignes à facturer (prix courant du plat)
+        lignes = []
+        lignes_facturees = []
         for ligne in panier.lignes.select_related("plat"):
             plat = ligne.plat
-            unit_amount = int(Decimal(plat.prix) * 100)  # prix en cents
-
-            line_items.append(
-                {
-                    "price_data": {
-                        "currency": "cad",
-                        "unit_amount": unit_amount,
-                        "product_data": {
-                            "name": plat.nom,
-                        },
-                    },
-                    "quantity": ligne.quantite,
-                }
-            )
+            lignes.append((plat, ligne.quantite))
+            lignes_facturees.append(LigneFacturee(plat.nom, plat.prix, ligne.quantite))
 
-        # 3) Créer la session Stripe Checkout
+        # 3) Créer une commande en attente + réserver le stock (tout ou rien)
+        expire_le = timezone.now() + duree_reservation()
+        try:
+            with transaction.atomic():
+                commande = Commande.objects.create(
+                    client=request.user,
+                    total=panier.total,      # annoté par avec_totaux()
+                    statut="EN_ATTENTE",     # par défaut côté client
+                )
+                reserver(commande, lignes, expire_le=expire_le)
+        except StockInsuffisant as e:
+            return Response({"detail": str(e)}, status=status.HTTP_409_CONFLICT)
+
+        # 4) Créer la session de paiement (expire avec la réservation).
+        # Stripe exige au moins 30 minutes à partir de maintenant : si le TTL
+        # est trop court, la réservation est rallongée pour rester alignée.
+        minimum = timezone.now() + DUREE_SESSION_MIN
+        if expire_le < minimum:
+            expire_le = minimum
+            prolonger_commande(commande, expire_le)
         FRONT_URL = "http://localhost:3000"
 
-        session = stripe.checkout.Session.create(
-            payment_method_types=["card"],
-            mode="payment",
-            line_items=line_items,
-            success_url=(
-                f"{FRONT_URL}/client/paiement/success"
-                "?session_id={{CHECKOUT_SESSION_ID}}"
-            ),
-            cancel_url=f"{FRONT_URL}/client/panier",
-        )
+        try:
+            session = get_gateway().creer_session(
+                commande,
+                lignes_facturees,
+                success_url=(
+                    f"{FRONT_URL}/client/paiement/success"
+                    "?session_id={CHECKOUT_SESSION_ID}"
+                ),
+                cancel_url=f"{FRONT_URL}/client/panier",
+                expire_le=expire_le,
+            )
+        except GatewayError as e:
+            # pas de session : on rend le stock et on oublie la commande
+            liberer_commande(commande)
+            commande.delete()
+            return reponse_erreur_gateway(e)
 
-        # 4) Créer une commande en attente dans ta BDD
-        Commande.objects.create(
-            client=request.user,
-            total=panier.total,      # propriété calculée
-            stripe_session_id=session.id,
-            statut="EN_ATTENTE",     # par défaut côté client
-        )
+        commande.stripe_session_id = session.id
+        commande.save(update_fields=["stripe_session_id", "updated_at"])
 
-        # 5) Retourner l’URL Stripe
+        # 5) Retourner l’URL de paiement
         return Response({"url": session.url}, status=status.HTTP_200_OK)
 
 
+class StripeWebhookView(APIView):
+    """
+    POST /api/paiements/webhook/  (appelé par Stripe, pas par le frontend)
+
+    Vérifie la signature (en-tête Stripe-Signature, HMAC du corps brut avec
+    STRIPE_WEBHOOK_SECRET) puis enregistre l'événement tel quel. Le
+    traitement (confirmation de la commande) est fait par le worker
+    `python manage.py traiter_evenements_stripe --boucle`.
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request):
+        try:
+            # corps brut : la signature porte sur ces octets
+            evenement = get_gateway().lire_evenement(
+                request.body, request.headers.get("Stripe-Signature")
+            )
+        except SignatureInvalide:
+            return Response(
+                {"detail": "Signature Stripe invalide."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        enregistrer(evenement)  # doublon : déjà reçu, on acquitte quand même
+        return Response({"detail": "Événement reçu."}, status=status.HTTP_200_OK)
+
+
 class ConfirmPaymentView(APIView):
     """
-    Appelée après le retour Stripe sur /client/paiement/success.
+    POST /api/paiements/confirm/
+    body: { "session_id": "cs_..." }
 
-    - Vérifie auprès de Stripe que la session est bien payée
-    - Passe la commande EN_ATTENTE -> (logique de ton app, ici EN_ATTENTE conservé)
-    - Crée les lignes de commande à partir du panier
-    - Diminue le stock
-    - Vide le panier
-    - ✅ Crée / met à jour un objet Paiement pour la commande
+    Appelée après le retour Stripe sur /client/paiement/success. Simple
+    lecture d'état : la commande est confirmée par le webhook Stripe
+    (StripeWebhookView + worker), même si le client a fermé l'onglet.
 
-    Idempotent : si la commande est déjà confirmée, on ne refait rien.
+    - 200 + infos facture si le paiement est confirmé
+    - 202 tant que le webhook n'a pas encore été traité (le frontend réessaie)
+    - 409 si le paiement a été reçu mais la commande refusée (stock épuisé,
+      commande annulée) : état définitif, remboursement traité à part
     """
     permission_classes = [permissions.IsAuthenticated]
 
@@ -107,117 +175,42 @@ class ConfirmPaymentView(APIView):
         # on enlève d'éventuelles accolades { ... }
         session_id = str(raw_session_id).strip("{}")
 
-        # 1) Vérifier la session Stripe
-        try:
-            session = stripe.checkout.Session.retrieve(session_id)
-        except Exception as e:
-            return Response(
-                {"detail": f"Impossible de récupérer la session Stripe : {e}"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        # On vérifie que le paiement est bien 'paid'
-        if session.get("payment_status") != "paid":
-            return Response(
-                {"detail": "Le paiement n'est pas confirmé par Stripe."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        # 2) Récupérer la commande liée à cette session
-        try:
-            commande = Commande.objects.get(
-                stripe_session_id=session_id,
-                client=request.user,
-            )
-        except Commande.DoesNotExist:
+        commande = (
+            Commande.objects
+            .filter(stripe_session_id=session_id, client=request.user)
+            .select_related("paiement")
+            .first()
+        )
+        if commande is None:
             return Response(
                 {"detail": "Commande introuvable pour cette session."},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        # Si la commande est déjà confirmée, on ne refait pas la logique panier/stock
-        if commande.statut != "EN_ATTENTE":
-            # ✅ Mais on renvoie quand même des infos de paiement/facture si le Paiement existe
-            paiement = Paiement.objects.filter(commande=commande).first()
-            if paiement:
-                return Response(
-                    {
-                        "detail": "Commande déjà confirmée.",
-                        "commande_id": commande.id,
-                        "montant": str(paiement.montant),
-                        "date": paiement.date.isoformat(),
-                        "statut": paiement.statut,
-                        "type": paiement.type,
-                        "transaction_ref": paiement.transaction_ref,
-                    },
-                    status=status.HTTP_200_OK,
-                )
-            # fallback : ancien comportement
+        paiement = getattr(commande, "paiement", None)
+        if paiement is not None and paiement.statut == StatutPaiement.ECHEC:
             return Response(
-                {"detail": "Commande déjà confirmée."},
-                status=status.HTTP_200_OK,
-            )
-
-        # 3) Récupérer le panier courant
-        panier = get_or_create_panier_courant(request.user)
-
-        # 4) Créer les lignes de commande et diminuer le stock
-        for ligne in panier.lignes.select_related("plat"):
-            plat = ligne.plat
-
-            # créer la ligne de commande
-            LigneCommande.objects.create(
-                commande=commande,
-                plat=plat,
-                quantite=ligne.quantite,
-                sous_total=ligne.sous_total,
+                {
+                    "detail": (
+                        "Votre paiement a été reçu mais la commande n'a pas pu "
+                        "être confirmée. Vous serez remboursé."
+                    ),
+                    "commande_id": commande.id,
+                    "statut": paiement.statut,
+                },
+                status=status.HTTP_409_CONFLICT,
             )
-
-            # diminuer le stock si présent
-            if hasattr(plat, "stock") and plat.stock is not None:
-                plat.stock = max(0, plat.stock - ligne.quantite)
-                plat.save()
-
-        # 5) Vider le panier
-        panier.lignes.all().delete()
-
-        # 6) Mettre la commande en préparation (ou EN_ATTENTE selon ta logique)
-        # NOTE : dans ton commentaire tu mentionnes EN_PREPARATION, mais ici
-        # je laisse EN_ATTENTE pour ne pas casser ton code existant.
-        commande.statut = "EN_ATTENTE"
-        commande.save()
-
-        # 7) Créer une notification pour le cuisinier (première ligne)
-        premiere_ligne = commande.lignes.select_related("plat__cuisinier").first()
-        if premiere_ligne and hasattr(premiere_ligne.plat, "cuisinier"):
-            Notification.objects.create(
-                destinataire=premiere_ligne.plat.cuisinier,
-                message=(
-                    f"Nouvelle commande payée #{commande.id} "
-                    f"pour votre plat {premiere_ligne.plat.nom}."
-                ),
+        if paiement is None or paiement.statut != StatutPaiement.SUCCES:
+            return Response(
+                {
+                    "detail": "Paiement en cours de confirmation.",
+                    "commande_id": commande.id,
+                    "statut": paiement.statut if paiement else StatutPaiement.EN_ATTENTE,
+                },
+                status=status.HTTP_202_ACCEPTED,
             )
 
-        # 8) ✅ Créer ou mettre à jour le Paiement lié à la commande
-        # On suppose que Commande.total contient le montant final
-        paiement, created = Paiement.objects.get_or_create(
-            commande=commande,
-            defaults={
-                "montant": commande.total,
-                "statut": StatutPaiement.SUCCES,
-                "type": TypePaiement.CARTE_CREDIT,  # ici on force "carte", tu pourras raffiner
-                "transaction_ref": session.get("payment_intent", "") or "",
-            },
-        )
-
-        if not created:
-            # Si le paiement existait déjà, on met à jour au cas où
-            paiement.statut = StatutPaiement.SUCCES
-            if not paiement.transaction_ref:
-                paiement.transaction_ref = session.get("payment_intent", "") or paiement.transaction_ref
-            paiement.save()
-
-        # 9) Réponse finale (compatible avec ton frontend actuel + infos facture)
+        # compatible avec le frontend actuel + infos facture
         return Response(
             {
                 "detail": "Paiement confirmé, commande en préparation.",
@@ -230,3 +223,30 @@ class ConfirmPaymentView(APIView):
             },
             status=status.HTTP_200_OK,
         )
+
+
+class FakeCheckoutView(APIView):
+    """
+    GET /api/paiements/fake/<session_id>/  (uniquement avec PAIEMENT_GATEWAY="fake")
+    ?annuler=1 -> retour au panier sans payer
+
+    Remplace la page de paiement Stripe : la session est payée, le webhook
+    simulé est enregistré comme un vrai, puis redirection vers success_url.
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, session_id):
+        gateway = get_gateway()
+        if not isinstance(gateway, FakeGateway):
+            raise Http404
+
+        try:
+            session = gateway.recuperer_session(session_id)
+            if request.query_params.get("annuler"):
+                return HttpResponseRedirect(session["cancel_url"])
+            enregistrer(gateway.payer(session_id))
+        except GatewayError as e:
+            return reponse_erreur_gateway(e)
+
+        return HttpResponseRedirect(session["success_url"])
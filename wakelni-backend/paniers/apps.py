@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class PaniersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'paniers'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -1,8 +1,54 @@
 import uuid
+from decimal import Decimal
+
 from django.conf import settings
 from django.db import models
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Coalesce
 from plats.models import Plat
 
+MONTANT = models.DecimalField(max_digits=10, decimal_places=2)
+
+
+def _montant(quantite, prix_unitaire):
+    return models.ExpressionWrapper(F(quantite) * F(prix_unitaire), output_field=MONTANT)
+
+
+class PanierQuerySet(models.QuerySet):
+    def avec_lignes(self):
+        """Précharge les lignes et leur plat : rendu du panier sans N+1."""
+        return self.prefetch_related(
+            models.Prefetch(
+                "lignes",
+                queryset=(
+                    LignePanier.objects
+                    .avec_sous_total()
+                    .select_related("plat")
+                    .order_by("id")
+                ),
+            )
+        )
+
+    def avec_totaux(self):
+        """
+        Total, nombre de lignes et nombre d'articles calculés par la base
+        (une seule requête d'agrégat, sans charger les lignes).
+        """
+        return self.annotate(
+            total_calcule=Coalesce(
+                Sum(_montant("lignes__quantite", "lignes__prix_unitaire")),
+                Value(Decimal("0.00")),
+                output_field=MONTANT,
+            ),
+            nb_lignes=Count("lignes"),
+            nb_articles=Coalesce(Sum("lignes__quantite"), Value(0)),
+        )
+
+
+class LignePanierQuerySet(models.QuerySet):
+    def avec_sous_total(self):
+        return self.annotate(sous_total_calcule=_montant("quantite", "prix_unitaire"))
+
 
 class Panier(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -15,9 +61,20 @@ class Panier(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PanierQuerySet.as_manager()
+
     @property
     def total(self):
-        return sum(ligne.sous_total for ligne in self.lignes.all())
+        # annoté par Panier.objects.avec_totaux(), sinon agrégat SQL à la demande
+        if hasattr(self, "total_calcule"):
+            return self.total_calcule
+        return self.lignes.aggregate(
+            total=Coalesce(
+                Sum(_montant("quantite", "prix_unitaire")),
+                Value(Decimal("0.00")),
+                output_field=MONTANT,
+            )
+        )["total"]
 
     def __str__(self):
         return f"Panier #{self.id} de {self.client.username}"
@@ -34,8 +91,12 @@ class LignePanier(models.Model):
     prix_unitaire = models.DecimalField(max_digits=8, decimal_places=2)
     remarques = models.CharField(max_length=255, blank=True)
 
+    objects = LignePanierQuerySet.as_manager()
+
     @property
     def sous_total(self):
+        if hasattr(self, "sous_total_calcule"):
+            return self.sous_total_calcule
         return self.quantite * self.prix_unitaire
 
     class Meta:
@@ -1,7 +1,7 @@
 # paniers/serializers.py
 from rest_framework import serializers
 from .models import Panier, LignePanier
-from plats.serializers import PlatSerializer   # 👈 important
+from plats.images import url_media
 
 
 class LignePanierSerializer(serializers.ModelSerializer):
@@ -24,17 +24,18 @@ class LignePanierSerializer(serializers.ModelSerializer):
 
     def get_plat_photo_url(self, obj):
         """
-        On réutilise PlatSerializer pour avoir exactement la même URL
-        que sur /api/plats/ (là où les images fonctionnent déjà).
+        Même résolveur que PlatSerializer.photo_url (même URL que sur /api/plats/),
+        sans instancier un PlatSerializer par ligne.
         """
-        request = self.context.get("request")
-        plat_data = PlatSerializer(obj.plat, context={"request": request}).data
-        return plat_data.get("photo_url")
+        return url_media(obj.plat.photo.name, self.context.get("request"))
 
 
 class PanierSerializer(serializers.ModelSerializer):
     lignes = LignePanierSerializer(many=True, read_only=True)
     total = serializers.DecimalField(max_digits=8, decimal_places=2, read_only=True)
+    # annotés par Panier.objects.avec_totaux()
+    nb_lignes = serializers.IntegerField(read_only=True)
+    nb_articles = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Panier
@@ -45,5 +46,48 @@ class PanierSerializer(serializers.ModelSerializer):
             "updated_at",
             "lignes",
             "total",
+            "nb_lignes",
+            "nb_articles",
         ]
         read_only_fields = ("client", "created_at", "updated_at", "total")
+
+
+class ResumePanierSerializer(serializers.Serializer):
+    """Résumé léger pour le badge du header (sans les lignes)."""
+    nb_lignes = serializers.IntegerField()
+    nb_articles = serializers.IntegerField()
+    total = serializers.DecimalField(max_digits=8, decimal_places=2)
+
+
+class OperationPanierSerializer(serializers.Serializer):
+    """
+    Une opération d'un lot (POST /api/paniers/operations/) :
+    - ajouter   : quantite s'ajoute à la ligne (créée si besoin)
+    - definir   : la ligne prend exactement cette quantité (0 -> supprimée)
+    - supprimer : la ligne est retirée
+    """
+    OPS = ("ajouter", "definir", "supprimer")
+
+    op = serializers.ChoiceField(choices=OPS)
+    plat_id = serializers.UUIDField()
+    quantite = serializers.IntegerField(min_value=0, default=1)
+
+    def validate(self, attrs):
+        if attrs["op"] == "ajouter" and attrs["quantite"] <= 0:
+            raise serializers.ValidationError({"quantite": "La quantité doit être > 0."})
+        return attrs
+
+
+class LotOperationsPanierSerializer(serializers.Serializer):
+    operations = OperationPanierSerializer(many=True, allow_empty=False)
+    # True : on repart d'un panier vide (restauration d'un ancien panier)
+    vider = serializers.BooleanField(default=False)
+
+    MAX_OPERATIONS = 200
+
+    def validate_operations(self, value):
+        if len(value) > self.MAX_OPERATIONS:
+            raise serializers.ValidationError(
+                f"Au plus {self.MAX_OPERATIONS} opérations par requête."
+            )
+        return value
@@ -0,0 +1,23 @@
+# paniers/signals.py
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import LignePanier, Panier
+
+
+def toucher(panier_id):
+    # updated_at du panier sert de validateur ETag pour /mon-panier/
+    Panier.objects.filter(pk=panier_id).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=LignePanier)
+def toucher_panier(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    toucher(instance.panier_id)
+
+
+# Pas de receiver post_delete : sa seule présence empêche Django de supprimer
+# les lignes en un seul DELETE (une requête + un signal par ligne). Les vues
+# qui suppriment des lignes appellent toucher() elles-mêmes.
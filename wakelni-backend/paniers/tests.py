@@ -1,3 +1,155 @@
-from django.test import TestCase
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from plats.models import Plat
+
+from .models import LignePanier, Panier
+
+User = get_user_model()
+
+
+class PanierTestCase(APITestCase):
+    def setUp(self):
+        self.client_user = User.objects.create_user(
+            username="client", password="x", role=User.Role.CLIENT
+        )
+        self.cuisinier = User.objects.create_user(
+            username="chef", password="x", role=User.Role.CUISINIER
+        )
+        self.client.force_authenticate(self.client_user)
+
+    def creer_plat(self, **kwargs):
+        data = {"nom": "Plat", "prix": Decimal("10.00"), "stock": 10}
+        data.update(kwargs)
+        return Plat.objects.create(cuisinier=self.cuisinier, **data)
+
+
+class PanierConditionnelTests(PanierTestCase):
+    def test_304_tant_que_le_panier_ne_change_pas(self):
+        plat = self.creer_plat()
+
+        res = self.client.get("/api/paniers/mon-panier/")
+        self.assertEqual(res.status_code, 200)
+        etag = res["ETag"]
+
+        res = self.client.get("/api/paniers/mon-panier/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 304)
+
+        self.client.post("/api/paniers/ajouter/", {"plat_id": str(plat.id)})
+        res = self.client.get("/api/paniers/mon-panier/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.data["lignes"]), 1)
+
+
+class PanierRequetesTests(PanierTestCase):
+    def remplir_panier(self, nb_lignes):
+        panier, _ = Panier.objects.get_or_create(client=self.client_user)
+        panier.lignes.all().delete()
+        for i in range(nb_lignes):
+            plat = self.creer_plat(nom=f"Plat {i}")
+            # photo posée sans save() : pas de génération de variantes
+            Plat.objects.filter(pk=plat.pk).update(photo=f"plats/plat_{i}.jpg")
+            LignePanier.objects.create(
+                panier=panier, plat=plat, quantite=2, prix_unitaire=plat.prix
+            )
+
+    def nb_requetes_mon_panier(self):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get("/api/paniers/mon-panier/")
+        self.assertEqual(res.status_code, 200)
+        return len(ctx.captured_queries), res.data
+
+    def test_nombre_de_requetes_constant(self):
+        self.remplir_panier(1)
+        requetes_1, data = self.nb_requetes_mon_panier()
+        self.assertEqual(len(data["lignes"]), 1)
+        self.assertTrue(data["lignes"][0]["plat_photo_url"].endswith("/media/plats/plat_0.jpg"))
+
+        self.remplir_panier(50)
+        requetes_50, data = self.nb_requetes_mon_panier()
+        self.assertEqual(len(data["lignes"]), 50)
+
+        self.assertEqual(requetes_1, requetes_50)
+
+
+class PanierTotauxTests(PanierTestCase):
+    def test_totaux_calcules_en_sql(self):
+        panier = Panier.objects.create(client=self.client_user)
+        for prix, quantite in ((Decimal("10.50"), 2), (Decimal("3.25"), 3)):
+            plat = self.creer_plat(prix=prix)
+            LignePanier.objects.create(
+                panier=panier, plat=plat, quantite=quantite, prix_unitaire=prix
+            )
+
+        with self.assertNumQueries(1):
+            annote = Panier.objects.avec_totaux().get(pk=panier.pk)
+            self.assertEqual(annote.total, Decimal("30.75"))
+            self.assertEqual((annote.nb_lignes, annote.nb_articles), (2, 5))
+
+        # sans annotation : même résultat via un agrégat à la demande
+        self.assertEqual(panier.total, Decimal("30.75"))
+
+        res = self.client.get("/api/paniers/resume/")
+        self.assertEqual(
+            res.data, {"nb_lignes": 2, "nb_articles": 5, "total": "30.75"}
+        )
+
+        res = self.client.get("/api/paniers/mon-panier/")
+        self.assertEqual(res.data["total"], "30.75")
+        self.assertEqual(res.data["lignes"][0]["sous_total"], Decimal("21.00"))
+
+
+class OperationsPanierTests(PanierTestCase):
+    def test_lot_applique_en_une_fois(self):
+        a = self.creer_plat(nom="A", stock=5)
+        b = self.creer_plat(nom="B", stock=5)
+        c = self.creer_plat(nom="C", stock=5)
+        self.client.post("/api/paniers/ajouter/", {"plat_id": str(a.id), "quantite": 1})
+        self.client.post("/api/paniers/ajouter/", {"plat_id": str(c.id), "quantite": 1})
+
+        res = self.client.post("/api/paniers/operations/", {"operations": [
+            {"op": "ajouter", "plat_id": str(a.id), "quantite": 2},
+            {"op": "ajouter", "plat_id": str(b.id), "quantite": 4},
+            {"op": "definir", "plat_id": str(b.id), "quantite": 2},
+            {"op": "supprimer", "plat_id": str(c.id)},
+        ]}, format="json")
+
+        self.assertEqual(res.status_code, 200, res.data)
+        quantites = {l["plat_nom"]: l["quantite"] for l in res.data["lignes"]}
+        self.assertEqual(quantites, {"A": 3, "B": 2})
+        self.assertEqual(res.data["total"], "50.00")
+
+    def test_tout_ou_rien(self):
+        a = self.creer_plat(nom="A", stock=5)
+        autre_chef = User.objects.create_user(
+            username="chef2", password="x", role=User.Role.CUISINIER
+        )
+        b = Plat.objects.create(cuisinier=autre_chef, nom="B", prix=1, stock=5)
+
+        res = self.client.post("/api/paniers/operations/", {"operations": [
+            {"op": "ajouter", "plat_id": str(a.id), "quantite": 9},
+        ]}, format="json")
+        self.assertEqual(res.status_code, 400)
+        self.assertIn(str(a.id), res.data["operations"])
+
+        res = self.client.post("/api/paniers/operations/", {"operations": [
+            {"op": "ajouter", "plat_id": str(a.id), "quantite": 1},
+            {"op": "ajouter", "plat_id": str(b.id), "quantite": 1},
+        ]}, format="json")
+        self.assertEqual(res.status_code, 400)
+        self.assertFalse(LignePanier.objects.exists())
+
+    def test_vider_puis_restaurer(self):
+        a = self.creer_plat(nom="A")
+        b = self.creer_plat(nom="B")
+        self.client.post("/api/paniers/ajouter/", {"plat_id": str(a.id), "quantite": 1})
+
+        res = self.client.post("/api/paniers/operations/", {
+            "vider": True,
+            "operations": [{"op": "definir", "plat_id": str(b.id), "quantite": 2}],
+        }, format="json")
+        self.assertEqual([l["plat_nom"] for l in res.data["lignes"]], ["B"])
@@ -2,6 +2,8 @@
 from django.urls import path
 from .views import (
     MonPanierView,
+    OperationsPanierView,
+    ResumePanierView,
     AjouterAuPanierView,
     MettreAJourItemView,
     SupprimerItemView,
@@ -10,6 +12,8 @@ from .views import (
 
 urlpatterns = [
     path("mon-panier/", MonPanierView.as_view(), name="mon-panier"),
+    path("resume/", ResumePanierView.as_view(), name="resume-panier"),
+    path("operations/", OperationsPanierView.as_view(), name="operations-panier"),
     path("ajouter/", AjouterAuPanierView.as_view(), name="ajouter-panier"),
 
     #  int et pas uuid
@@ -1,11 +1,20 @@
 # paniers/views.py
+from django.db import transaction
+from django.db.models import Count
 from rest_framework import permissions, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.exceptions import ValidationError, PermissionDenied
 
+from wakelni_backend.conditional import requete_conditionnelle, validateur_queryset
+
 from .models import Panier, LignePanier
-from .serializers import PanierSerializer
+from .signals import toucher
+from .serializers import (
+    LotOperationsPanierSerializer,
+    PanierSerializer,
+    ResumePanierSerializer,
+)
 from plats.models import Plat
 
 
@@ -19,6 +28,16 @@ def get_or_create_panier_courant(user):
     return panier
 
 
+def serialiser_panier(panier, request):
+    """
+    Sérialise le panier en rechargeant ses lignes + plats en une requête
+    (prefetch), totaux calculés par la base : nombre de requêtes constant
+    quelle que soit la taille du panier.
+    """
+    panier = Panier.objects.avec_totaux().avec_lignes().get(pk=panier.pk)
+    return PanierSerializer(panier, context={"request": request}).data
+
+
 class MonPanierView(APIView):
     """
     GET /api/paniers/mon-panier/
@@ -27,10 +46,38 @@ class MonPanierView(APIView):
 
     permission_classes = [permissions.IsAuthenticated]
 
+    # updated_at du panier est touché à chaque modification de ligne (paniers/signals.toucher)
+    @requete_conditionnelle(validateur_queryset(
+        "updated_at",
+        extra={"nb_lignes": Count("lignes")},
+        queryset=lambda vue: Panier.objects.filter(
+            pk=get_or_create_panier_courant(vue.request.user).pk
+        ),
+    ))
     def get(self, request):
         panier = get_or_create_panier_courant(request.user)
-        serializer = PanierSerializer(panier, context={"request": request})
-        return Response(serializer.data)
+        return Response(serialiser_panier(panier, request))
+
+
+class ResumePanierView(APIView):
+    """
+    GET /api/paniers/resume/
+    -> { "nb_lignes": 2, "nb_articles": 5, "total": "42.00" }
+    Une seule requête d'agrégat, pour le badge du header.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        if getattr(request.user, "role", None) != "CLIENT":
+            raise PermissionDenied("Seuls les clients peuvent utiliser le panier.")
+        panier = Panier.objects.avec_totaux().filter(client=request.user).first()
+        data = (
+            {"nb_lignes": panier.nb_lignes, "nb_articles": panier.nb_articles, "total": panier.total}
+            if panier
+            else {"nb_lignes": 0, "nb_articles": 0, "total": 0}
+        )
+        return Response(ResumePanierSerializer(data).data)
 
 
 class AjouterAuPanierView(APIView):
@@ -62,7 +109,7 @@ class AjouterAuPanierView(APIView):
         except Plat.DoesNotExist:
             raise ValidationError({"plat_id": "Plat introuvable ou inactif."})
 
-        if plat.stock <= 0:
+        if plat.stock_disponible <= 0:
             raise ValidationError({"plat_id": "Ce plat est en rupture de stock."})
 
         # 🔒 RÈGLE : un seul cuisinier par panier
@@ -88,7 +135,7 @@ class AjouterAuPanierView(APIView):
         )
 
         nouvelle_quantite = item.quantite + quantite
-        if nouvelle_quantite > plat.stock:
+        if nouvelle_quantite > plat.stock_disponible:
             raise ValidationError(
                 {"quantite": "Quantité demandée supérieure au stock disponible."}
             )
@@ -96,8 +143,108 @@ class AjouterAuPanierView(APIView):
         item.quantite = nouvelle_quantite
         item.save()
 
-        serializer = PanierSerializer(panier, context={"request": request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(serialiser_panier(panier, request), status=status.HTTP_200_OK)
+
+
+class OperationsPanierView(APIView):
+    """
+    POST /api/paniers/operations/
+    body: {
+        "vider": false,
+        "operations": [
+            {"op": "ajouter", "plat_id": "<uuid>", "quantite": 2},
+            {"op": "definir", "plat_id": "<uuid>", "quantite": 1},
+            {"op": "supprimer", "plat_id": "<uuid>"}
+        ]
+    }
+    -> Applique toutes les opérations en une transaction (tout ou rien) :
+       stock et règle "un seul cuisinier" vérifiés sur le panier final,
+       écritures groupées (bulk_create / bulk_update), panier renvoyé une fois.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = LotOperationsPanierSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        operations = serializer.validated_data["operations"]
+
+        panier = get_or_create_panier_courant(request.user)
+
+        with transaction.atomic():
+            # verrou sur le panier : deux lots concurrents s'appliquent l'un après l'autre
+            Panier.objects.select_for_update().filter(pk=panier.pk).first()
+
+            lignes = {
+                ligne.plat_id: ligne
+                for ligne in LignePanier.objects.filter(panier=panier)
+            }
+            plat_ids = {op["plat_id"] for op in operations} | set(lignes)
+            plats = Plat.objects.in_bulk(plat_ids)
+
+            # 1) état final du panier (plat_id -> quantité)
+            quantites = {} if serializer.validated_data["vider"] else {
+                plat_id: ligne.quantite for plat_id, ligne in lignes.items()
+            }
+            for op in operations:
+                plat_id = op["plat_id"]
+                if op["op"] == "ajouter":
+                    quantites[plat_id] = quantites.get(plat_id, 0) + op["quantite"]
+                elif op["op"] == "definir":
+                    quantites[plat_id] = op["quantite"]
+                else:
+                    quantites[plat_id] = 0
+            quantites = {p: q for p, q in quantites.items() if q > 0}
+
+            # 2) validations sur l'état final
+            erreurs = {}
+            for plat_id, quantite in quantites.items():
+                plat = plats.get(plat_id)
+                if plat is None or not plat.est_actif:
+                    erreurs[str(plat_id)] = "Plat introuvable ou inactif."
+                elif quantite > plat.stock_disponible:
+                    erreurs[str(plat_id)] = "Quantité demandée supérieure au stock disponible."
+            if erreurs:
+                raise ValidationError({"operations": erreurs})
+
+            if len({plats[p].cuisinier_id for p in quantites}) > 1:
+                raise ValidationError(
+                    {
+                        "detail": (
+                            "Vous ne pouvez commander qu'auprès d'un seul cuisinier à la fois. "
+                            "Validez ou videz votre panier avant de choisir un autre cuisinier."
+                        )
+                    }
+                )
+
+            # 3) écritures groupées
+            a_creer, a_modifier = [], []
+            for plat_id, quantite in quantites.items():
+                ligne = lignes.get(plat_id)
+                if ligne is None:
+                    a_creer.append(LignePanier(
+                        panier=panier,
+                        plat_id=plat_id,
+                        quantite=quantite,
+                        prix_unitaire=plats[plat_id].prix,
+                    ))
+                elif ligne.quantite != quantite:
+                    ligne.quantite = quantite
+                    a_modifier.append(ligne)
+            a_supprimer = [
+                ligne.pk for plat_id, ligne in lignes.items() if plat_id not in quantites
+            ]
+
+            if a_supprimer:
+                LignePanier.objects.filter(pk__in=a_supprimer).delete()
+            if a_creer:
+                LignePanier.objects.bulk_create(a_creer)
+            if a_modifier:
+                LignePanier.objects.bulk_update(a_modifier, ["quantite"])
+            # les écritures groupées ne déclenchent pas paniers/signals.py
+            toucher(panier.pk)
+
+        return Response(serialiser_panier(panier, request), status=status.HTTP_200_OK)
 
 
 class MettreAJourItemView(APIView):
@@ -128,16 +275,16 @@ class MettreAJourItemView(APIView):
         if quantite <= 0:
             # on supprime la ligne
             item.delete()
+            toucher(panier.pk)
         else:
-            if quantite > item.plat.stock:
+            if quantite > item.plat.stock_disponible:
                 raise ValidationError(
                     {"quantite": "Quantité demandée supérieure au stock disponible."}
                 )
             item.quantite = quantite
             item.save()
 
-        serializer = PanierSerializer(panier, context={"request": request})
-        return Response(serializer.data)
+        return Response(serialiser_panier(panier, request))
 
 
 class SupprimerItemView(APIView):
@@ -157,9 +304,9 @@ class SupprimerItemView(APIView):
             raise ValidationError({"item": "Élément de panier introuvable."})
 
         item.delete()
+        toucher(panier.pk)
 
-        serializer = PanierSerializer(panier, context={"request": request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(serialiser_panier(panier, request), status=status.HTTP_200_OK)
 
 
 class ViderPanierView(APIView):
@@ -173,5 +320,5 @@ class ViderPanierView(APIView):
     def delete(self, request):
         panier = get_or_create_panier_courant(request.user)
         panier.lignes.all().delete()
-        serializer = PanierSerializer(panier, context={"request": request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        toucher(panier.pk)
+        return Response(serialiser_panier(panier, request), status=status.HTTP_200_OK)
@@ -0,0 +1,73 @@
+# plats/cache.py
+"""
+Cache read-through des pages du catalogue public (GET /api/plats/).
+
+Les pages sérialisées sont stockées sous une clé qui contient la
+"version du catalogue". Toute sauvegarde / suppression de Plat
+incrémente cette version (plats/signals.py) : les anciennes pages ne
+sont plus jamais lues et expirent d'elles-mêmes (TTL).
+
+Le stockage passe par l'alias de cache Django "catalogue" : mémoire
+locale par défaut, Redis (RedisCache) si CATALOGUE_CACHE_URL est défini.
+En mémoire locale, l'invalidation ne vaut que pour le processus courant :
+le TTL borne alors la fraîcheur entre workers.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+
+from wakelni_backend import metrics
+
+CLE_VERSION = "catalogue:version"
+
+hits = metrics.counter(
+    "wakelni_catalogue_cache_hits_total", "Pages du catalogue servies depuis le cache."
+)
+misses = metrics.counter(
+    "wakelni_catalogue_cache_misses_total", "Pages du catalogue recalculées."
+)
+
+
+def _cache():
+    return caches[getattr(settings, "CATALOGUE_CACHE_ALIAS", "catalogue")]
+
+
+def version():
+    cache = _cache()
+    valeur = cache.get(CLE_VERSION)
+    if valeur is None:
+        cache.add(CLE_VERSION, 1, timeout=None)
+        valeur = cache.get(CLE_VERSION, 1)
+    return valeur
+
+
+def invalider():
+    """Passe à une nouvelle version du catalogue (appelé sur post_save / post_delete)."""
+    cache = _cache()
+    try:
+        cache.incr(CLE_VERSION)
+    except ValueError:
+        # clé absente (cache vidé / redémarré) : on repart d'une version neuve
+        cache.add(CLE_VERSION, 1, timeout=None)
+        cache.incr(CLE_VERSION)
+
+
+def cle_page(request):
+    """Clé d'une page : version + hôte (URLs absolues des photos) + query string."""
+    params = sorted(request.query_params.lists())
+    brut = f"{request.get_host()}|{params}".encode()
+    return f"catalogue:v{version()}:{hashlib.sha1(brut).hexdigest()}"
+
+
+def lire_page(cle):
+    data = _cache().get(cle)
+    if data is None:
+        misses.inc()
+    else:
+        hits.inc()
+    return data
+
+
+def ecrire_page(cle, data):
+    _cache().set(cle, data, timeout=getattr(settings, "CATALOGUE_CACHE_TTL", 300))
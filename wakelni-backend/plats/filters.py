@@ -0,0 +1,50 @@
+# plats/filters.py
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import F
+from rest_framework.exceptions import ValidationError
+
+from .tags import decouper_tags
+
+VALEURS_VRAIES = {"1", "true", "oui", "yes"}
+
+
+def _decimal(params, nom):
+    valeur = params.get(nom)
+    if valeur in (None, ""):
+        return None
+    try:
+        return Decimal(valeur)
+    except InvalidOperation:
+        raise ValidationError({nom: "Doit être un nombre."})
+
+
+def filtrer_catalogue(qs, params):
+    """
+    Filtres serveur du catalogue (GET /api/plats/) :
+
+    ?ville=Montréal        -> ville (insensible à la casse)
+    ?prix_min=5&prix_max=20
+    ?tags=halal,vegan      -> le plat doit avoir TOUS ces tags
+    ?en_stock=1            -> seulement les plats avec des portions disponibles
+                              (stock non réservé par un paiement en cours)
+    """
+    ville = (params.get("ville") or "").strip()
+    if ville:
+        qs = qs.filter(ville__iexact=ville)
+
+    prix_min = _decimal(params, "prix_min")
+    if prix_min is not None:
+        qs = qs.filter(prix__gte=prix_min)
+
+    prix_max = _decimal(params, "prix_max")
+    if prix_max is not None:
+        qs = qs.filter(prix__lte=prix_max)
+
+    for tag in decouper_tags(params.get("tags")):
+        qs = qs.filter(etiquettes__nom=tag)
+
+    if (params.get("en_stock") or "").lower() in VALEURS_VRAIES:
+        qs = qs.filter(stock__gt=F("stock_reserve"))
+
+    return qs
@@ -0,0 +1,117 @@
+# plats/images.py
+"""
+Variantes redimensionnées de Plat.photo (miniature / moyenne), en JPEG
+et en WebP, générées à l'upload (plats/signals.py) ou par la commande
+generer_variantes_photos. Les noms des fichiers sont stockés dans
+Plat.photo_variantes : {"thumb": {"jpeg": "...", "webp": "..."}, ...}.
+"""
+import logging
+import os
+from functools import lru_cache
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# nom -> boîte maximale (largeur, hauteur), proportions conservées
+VARIANTES = {
+    "thumb": (320, 320),
+    "medium": (800, 800),
+}
+
+# format -> (format Pillow, extension, options d'enregistrement)
+FORMATS = {
+    "jpeg": ("JPEG", "jpg", {"quality": 82, "optimize": True, "progressive": True}),
+    "webp": ("WEBP", "webp", {"quality": 80, "method": 4}),
+}
+
+DOSSIER = "plats/variantes"
+
+
+@lru_cache(maxsize=4096)
+def _url_stockage(nom):
+    return default_storage.url(nom)
+
+
+@receiver(setting_changed)
+def _vider_cache_urls(setting, **kwargs):
+    if setting in ("MEDIA_URL", "STORAGES"):
+        _url_stockage.cache_clear()
+
+
+def url_media(nom, request=None):
+    """
+    URL publique (absolue si on a la requête) d'un fichier média.
+    Résolveur partagé par les serializers des plats et du panier :
+    pas d'objet serializer à construire, et l'URL de stockage est mise en cache.
+    """
+    if not nom:
+        return None
+    url = _url_stockage(nom)
+    if request is not None:
+        return request.build_absolute_uri(url)
+    return url
+
+
+def _nom_variante(nom_photo, variante, extension):
+    base = os.path.splitext(os.path.basename(nom_photo))[0]
+    return f"{DOSSIER}/{base}_{variante}.{extension}"
+
+
+def supprimer_variantes(variantes):
+    for formats in (variantes or {}).values():
+        for nom in formats.values():
+            if default_storage.exists(nom):
+                default_storage.delete(nom)
+
+
+def generer_variantes(photo):
+    """Crée toutes les variantes d'une photo ; retourne la map des noms de fichiers."""
+    photo.open("rb")
+    try:
+        with Image.open(photo) as source:
+            image = ImageOps.exif_transpose(source).convert("RGB")
+    finally:
+        photo.close()
+
+    variantes = {}
+    for variante, boite in VARIANTES.items():
+        copie = image.copy()
+        copie.thumbnail(boite, Image.LANCZOS)
+        variantes[variante] = {}
+        for fmt, (format_pil, extension, options) in FORMATS.items():
+            tampon = BytesIO()
+            copie.save(tampon, format_pil, **options)
+            nom = _nom_variante(photo.name, variante, extension)
+            if default_storage.exists(nom):
+                default_storage.delete(nom)
+            variantes[variante][fmt] = default_storage.save(
+                nom, ContentFile(tampon.getvalue())
+            )
+    return variantes
+
+
+def maj_variantes(plat):
+    """
+    Régénère les variantes d'un plat (ou les supprime si la photo a été retirée)
+    et les enregistre sans repasser par save() (pas de nouveau signal).
+    """
+    from .models import Plat
+
+    supprimer_variantes(plat.photo_variantes)
+    variantes = {}
+    if plat.photo:
+        try:
+            variantes = generer_variantes(plat.photo)
+        except (OSError, ValueError):
+            logger.warning("Variantes impossibles pour la photo %s", plat.photo.name, exc_info=True)
+
+    Plat.objects.filter(pk=plat.pk).update(photo_variantes=variantes)
+    plat.photo_variantes = variantes
+    plat._photo_initiale = plat.photo.name or ""
+    return variantes
@@ -0,0 +1,27 @@
+# plats/management/commands/generer_variantes_photos.py
+from django.core.management.base import BaseCommand
+
+from plats.images import maj_variantes
+from plats.models import Plat
+
+
+class Command(BaseCommand):
+    help = "Génère les miniatures / WebP des photos de plats existantes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Régénérer aussi les plats qui ont déjà des variantes.",
+        )
+
+    def handle(self, *args, **options):
+        qs = Plat.objects.exclude(photo="").exclude(photo__isnull=True)
+        if not options["force"]:
+            qs = qs.filter(photo_variantes={})
+
+        total = 0
+        for plat in qs.iterator(chunk_size=100):
+            if maj_variantes(plat):
+                total += 1
+        self.stdout.write(self.style.SUCCESS(f"{total} photo(s) traitée(s)."))
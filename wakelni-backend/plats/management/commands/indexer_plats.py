@@ -0,0 +1,16 @@
+# plats/management/commands/indexer_plats.py
+from django.core.management.base import BaseCommand
+
+from plats.models import Plat
+from plats.search import indexer_plat
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index de recherche de tous les plats."
+
+    def handle(self, *args, **options):
+        total = 0
+        for plat in Plat.objects.iterator(chunk_size=500):
+            indexer_plat(plat)
+            total += 1
+        self.stdout.write(self.style.SUCCESS(f"{total} plat(s) indexé(s)."))
@@ -0,0 +1,17 @@
+# plats/management/commands/recalculer_tags.py
+from django.core.management.base import BaseCommand
+
+from plats.models import Plat
+from plats.tags import recalculer_compteurs, synchroniser_tags
+
+
+class Command(BaseCommand):
+    help = "Resynchronise Plat.etiquettes depuis Plat.tags et recalcule Tag.nb_plats."
+
+    def handle(self, *args, **options):
+        total = 0
+        for plat in Plat.objects.iterator(chunk_size=500):
+            synchroniser_tags(plat)
+            total += 1
+        recalculer_compteurs()
+        self.stdout.write(self.style.SUCCESS(f"{total} plat(s) resynchronisé(s)."))
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:40
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plats', '0004_remove_plat_photo_url_plat_photo'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='plat',
+            index=models.Index(models.OrderBy(models.F('cree_le'), descending=True), models.OrderBy(models.F('id'), descending=True), condition=models.Q(('est_actif', True)), name='plat_catalogue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plat',
+            index=models.Index(django.db.models.functions.text.Upper('ville'), models.OrderBy(models.F('cree_le'), descending=True), condition=models.Q(('est_actif', True)), name='plat_ville_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plat',
+            index=models.Index(models.F('prix'), models.F('cree_le'), condition=models.Q(('est_actif', True)), name='plat_prix_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plat',
+            index=models.Index(models.OrderBy(models.F('cree_le'), descending=True), models.OrderBy(models.F('id'), descending=True), condition=models.Q(('est_actif', True), ('stock__gt', 0)), name='plat_en_stock_idx'),
+        ),
+    ]
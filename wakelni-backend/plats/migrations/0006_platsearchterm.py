@@ -0,0 +1,85 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:41
+
+import re
+import unicodedata
+from collections import Counter
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# copie figée de l'analyseur de plats/search.py au moment de cette migration :
+# une migration ne dépend pas du code courant de l'application
+POIDS_CHAMPS = {"nom": 8, "tags": 4, "ingredients": 2, "description": 1}
+
+MOTS_VIDES = {
+    "a", "au", "aux", "avec", "ce", "ces", "dans", "de", "des", "du", "en",
+    "et", "la", "le", "les", "ou", "par", "pour", "sans", "sur", "un", "une",
+}
+
+SUFFIXES = (
+    "issements", "issement", "ements", "ement", "ations", "ation",
+    "euses", "euse", "ettes", "ette", "ees", "ee", "es", "er", "ez",
+    "e", "s", "x",
+)
+
+_MOT = re.compile(r"[a-z0-9]+")
+
+
+def analyser(texte):
+    decompose = unicodedata.normalize("NFKD", texte or "")
+    texte = "".join(c for c in decompose if not unicodedata.combining(c)).lower()
+    termes = []
+    for mot in _MOT.findall(texte):
+        if len(mot) <= 1 or mot in MOTS_VIDES:
+            continue
+        for suffixe in SUFFIXES:
+            if mot.endswith(suffixe) and len(mot) - len(suffixe) >= 3:
+                mot = mot[: -len(suffixe)]
+                break
+        termes.append(mot[:64])
+    return termes
+
+
+def termes_ponderes(plat):
+    poids = Counter()
+    for champ, poids_champ in POIDS_CHAMPS.items():
+        valeur = getattr(plat, champ, "") or ""
+        if champ == "tags":
+            valeur = valeur.replace(",", " ")
+        for terme in analyser(valeur):
+            poids[terme] += poids_champ
+    return poids
+
+
+def indexer_plats_existants(apps, schema_editor):
+    Plat = apps.get_model("plats", "Plat")
+    PlatSearchTerm = apps.get_model("plats", "PlatSearchTerm")
+    for plat in Plat.objects.iterator(chunk_size=500):
+        PlatSearchTerm.objects.bulk_create([
+            PlatSearchTerm(plat=plat, terme=terme, poids=poids)
+            for terme, poids in termes_ponderes(plat).items()
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plats', '0005_plat_catalogue_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('terme', models.CharField(max_length=64)),
+                ('poids', models.PositiveIntegerField(default=1)),
+                ('plat', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='termes_recherche', to='plats.plat')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['terme', 'plat'], name='plat_terme_idx')],
+                'unique_together': {('plat', 'terme')},
+            },
+        ),
+        migrations.RunPython(indexer_plats_existants, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plats', '0006_platsearchterm'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nom', models.CharField(max_length=50, unique=True)),
+                ('nb_plats', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PlatTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('plat', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='plats.plat')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='plats.tag')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='plat',
+            name='etiquettes',
+            field=models.ManyToManyField(blank=True, related_name='plats', through='plats.PlatTag', to='plats.tag'),
+        ),
+        migrations.AddIndex(
+            model_name='plattag',
+            index=models.Index(fields=['tag', 'plat'], name='plattag_tag_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='plattag',
+            unique_together={('plat', 'tag')},
+        ),
+    ]
@@ -0,0 +1,52 @@
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+# copie figée de plats/tags.py au moment de cette migration
+def decouper_tags(texte):
+    noms = []
+    for morceau in (texte or "").split(","):
+        nom = " ".join(morceau.split()).lower()[:50]
+        if nom and nom not in noms:
+            noms.append(nom)
+    return noms
+
+
+def recalculer_compteurs(Tag, PlatTag):
+    comptes = (
+        PlatTag.objects
+        .filter(tag=OuterRef("pk"), plat__est_actif=True)
+        .values("tag")
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    Tag.objects.update(nb_plats=Coalesce(Subquery(comptes), Value(0)))
+
+
+def decouper_tags_existants(apps, schema_editor):
+    Plat = apps.get_model("plats", "Plat")
+    Tag = apps.get_model("plats", "Tag")
+    PlatTag = apps.get_model("plats", "PlatTag")
+
+    tags = {}
+    liens = []
+    for plat in Plat.objects.exclude(tags="").iterator(chunk_size=500):
+        for nom in decouper_tags(plat.tags):
+            if nom not in tags:
+                tags[nom] = Tag.objects.create(nom=nom)
+            liens.append(PlatTag(plat=plat, tag=tags[nom]))
+    PlatTag.objects.bulk_create(liens, batch_size=1000)
+
+    recalculer_compteurs(Tag, PlatTag)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plats', '0007_tags_normalises'),
+    ]
+
+    operations = [
+        migrations.RunPython(decouper_tags_existants, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plats', '0008_tags_donnees'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plat',
+            name='modifie_le',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plats', '0009_plat_modifie_le'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plat',
+            name='photo_variantes',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plats', '0010_plat_photo_variantes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plat',
+            name='stock_reserve',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plats', '0011_plat_stock_reserve'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plat',
+            name='nb_avis',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='plat',
+            name='nb_notes_1',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='plat',
+            name='nb_notes_2',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='plat',
+            name='nb_notes_3',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='plat',
+            name='nb_notes_4',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='plat',
+            name='nb_notes_5',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='plat',
+            name='note_moyenne',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='plat',
+            name='somme_notes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='plat',
+            index=models.Index(models.OrderBy(models.F('note_moyenne'), descending=True), models.OrderBy(models.F('cree_le'), descending=True), models.OrderBy(models.F('id'), descending=True), condition=models.Q(('est_actif', True)), name='plat_note_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plats', '0012_agregats_notes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='plat',
+            name='plat_en_stock_idx',
+        ),
+        migrations.AddIndex(
+            model_name='plat',
+            index=models.Index(models.OrderBy(models.F('cree_le'), descending=True), models.OrderBy(models.F('id'), descending=True), condition=models.Q(('est_actif', True), ('stock__gt', models.F('stock_reserve'))), name='plat_en_stock_idx'),
+        ),
+    ]
@@ -2,6 +2,21 @@
 import uuid
 from django.conf import settings
 from django.db import models
+from django.db.models import F, Q
+from django.db.models.functions import Upper
+
+
+class Tag(models.Model):
+    """
+    Tag normalisé (minuscules) d'un plat : "halal", "vegan", ...
+    nb_plats est un agrégat maintenu (plats ACTIFS portant ce tag),
+    mis à jour par plats/tags.py à chaque sauvegarde / suppression de plat.
+    """
+    nom = models.CharField(max_length=50, unique=True)
+    nb_plats = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.nom} ({self.nb_plats})"
 
 
 class Plat(models.Model):
@@ -20,25 +35,132 @@ class Plat(models.Model):
 
     prix = models.DecimalField(max_digits=8, decimal_places=2)
     stock = models.IntegerField(default=0)
+    # portions bloquées par des paiements en cours (voir commandes/reservations.py)
+    stock_reserve = models.PositiveIntegerField(default=0)
 
     ville = models.CharField(max_length=100, blank=True)
     adresse = models.CharField(max_length=255, blank=True)
 
     est_actif = models.BooleanField(default=True)
+    # texte libre "halal,vegan" conservé pour l'API ; la relation
+    # "etiquettes" (synchronisée à la sauvegarde) sert aux filtres / facettes
     tags = models.CharField(max_length=255, blank=True)
+    etiquettes = models.ManyToManyField(
+        Tag,
+        through="PlatTag",
+        related_name="plats",
+        blank=True,
+    )
 
     photo = models.ImageField(
         upload_to="plats/",  # sera dans MEDIA_ROOT/plats/
         blank=True,
         null=True
     )
+    # miniatures / WebP générées à partir de "photo" (voir plats/images.py)
+    photo_variantes = models.JSONField(default=dict, blank=True)
+
+    # agrégats des avis, tenus à jour par avis/notes.py à chaque avis
+    # (commande recalculer_notes pour les reconstruire)
+    nb_avis = models.PositiveIntegerField(default=0)
+    somme_notes = models.PositiveIntegerField(default=0)
+    nb_notes_1 = models.PositiveIntegerField(default=0)
+    nb_notes_2 = models.PositiveIntegerField(default=0)
+    nb_notes_3 = models.PositiveIntegerField(default=0)
+    nb_notes_4 = models.PositiveIntegerField(default=0)
+    nb_notes_5 = models.PositiveIntegerField(default=0)
+    # somme_notes / nb_avis, stockée pour trier le catalogue (0 sans avis)
+    note_moyenne = models.FloatField(default=0)
 
     cree_le = models.DateTimeField(auto_now_add=True)
+    modifie_le = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # index composites pour la pagination par curseur (cree_le, id)
+        # et les filtres du catalogue (seuls les plats actifs sont listés)
+        indexes = [
+            models.Index(
+                F("cree_le").desc(), F("id").desc(),
+                name="plat_catalogue_idx",
+                condition=Q(est_actif=True),
+            ),
+            models.Index(
+                Upper("ville"), F("cree_le").desc(),
+                name="plat_ville_idx",
+                condition=Q(est_actif=True),
+            ),
+            models.Index(
+                "prix", "cree_le",
+                name="plat_prix_idx",
+                condition=Q(est_actif=True),
+            ),
+            models.Index(
+                F("cree_le").desc(), F("id").desc(),
+                name="plat_en_stock_idx",
+                # même prédicat que ?en_stock=1 (plats/filters.py)
+                condition=Q(est_actif=True, stock__gt=F("stock_reserve")),
+            ),
+            # catalogue trié par note (?tri=note)
+            models.Index(
+                F("note_moyenne").desc(), F("cree_le").desc(), F("id").desc(),
+                name="plat_note_idx",
+                condition=Q(est_actif=True),
+            ),
+        ]
+
+    @property
+    def stock_disponible(self):
+        return max(0, self.stock - self.stock_reserve)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # état connu en base, utilisé pour maintenir Tag.nb_plats
+        instance._est_actif_initial = instance.__dict__.get("est_actif")
+        instance._photo_initiale = instance.__dict__.get("photo") or ""
+        return instance
 
     def __str__(self):
         return f"{self.nom} ({self.cuisinier.username})"
 
 
+class PlatTag(models.Model):
+    plat = models.ForeignKey(Plat, on_delete=models.CASCADE)
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE)
+
+    class Meta:
+        unique_together = ("plat", "tag")
+        indexes = [
+            models.Index(fields=["tag", "plat"], name="plattag_tag_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.plat_id} -> {self.tag_id}"
+
+
+class PlatSearchTerm(models.Model):
+    """
+    Index inversé de recherche : un terme normalisé (sans accents, racinisé)
+    et son poids pour un plat. Maintenu par plats/signals.py.
+    """
+    plat = models.ForeignKey(
+        Plat,
+        on_delete=models.CASCADE,
+        related_name="termes_recherche",
+    )
+    terme = models.CharField(max_length=64)
+    poids = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        unique_together = ("plat", "terme")
+        indexes = [
+            models.Index(fields=["terme", "plat"], name="plat_terme_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.terme} ({self.poids}) -> {self.plat_id}"
+
+
 class Avis(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     plat = models.ForeignKey(Plat, on_delete=models.CASCADE, related_name="avis")
@@ -0,0 +1,30 @@
+# plats/pagination.py
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+
+
+class PlatCursorPagination(CursorPagination):
+    """
+    Pagination par curseur (keyset) du catalogue.
+
+    Le tri (cree_le, id) est stable : une page coûte la même chose
+    qu'il y ait 100 ou 100 000 plats (pas d'OFFSET).
+    ?page_size=... permet au front d'ajuster la taille (max 100).
+    ?tri=note : mieux notés d'abord (Plat.note_moyenne, index plat_note_idx).
+    """
+    page_size = 24
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-cree_le", "-id")
+    tris = {
+        "recent": ("-cree_le", "-id"),
+        "note": ("-note_moyenne", "-cree_le", "-id"),
+    }
+
+    def get_ordering(self, request, queryset, view):
+        tri = request.query_params.get("tri")
+        if not tri:
+            return self.ordering
+        if tri not in self.tris:
+            raise ValidationError({"tri": f"Valeurs possibles : {', '.join(self.tris)}."})
+        return self.tris[tri]
@@ -0,0 +1,119 @@
+# plats/search.py
+"""
+Index de recherche plein texte des plats (nom, description, ingrédients, tags).
+
+Le texte est normalisé en Python (minuscules, sans accents, racinisation
+française légère) puis stocké dans une table de termes inversée
+(PlatSearchTerm). Le même traitement est appliqué à la requête, ce qui
+rend la recherche insensible aux accents ("épicé" trouve "epice") et
+identique sur PostgreSQL comme sur SQLite.
+"""
+import re
+import unicodedata
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, Sum
+
+# poids de chaque champ dans le score de pertinence
+POIDS_CHAMPS = {
+    "nom": 8,
+    "tags": 4,
+    "ingredients": 2,
+    "description": 1,
+}
+
+MOTS_VIDES = {
+    "a", "au", "aux", "avec", "ce", "ces", "dans", "de", "des", "du", "en",
+    "et", "la", "le", "les", "ou", "par", "pour", "sans", "sur", "un", "une",
+}
+
+# suffixes retirés (le plus long d'abord) : racinisation volontairement légère
+SUFFIXES = (
+    "issements", "issement", "ements", "ement", "ations", "ation",
+    "euses", "euse", "ettes", "ette", "ees", "ee", "es", "er", "ez",
+    "e", "s", "x",
+)
+
+LONGUEUR_MIN_RACINE = 3
+LONGUEUR_MAX_TERME = 64
+
+_MOT = re.compile(r"[a-z0-9]+")
+
+
+def sans_accents(texte):
+    decompose = unicodedata.normalize("NFKD", texte)
+    return "".join(c for c in decompose if not unicodedata.combining(c))
+
+
+def raciniser(mot):
+    for suffixe in SUFFIXES:
+        if mot.endswith(suffixe) and len(mot) - len(suffixe) >= LONGUEUR_MIN_RACINE:
+            return mot[: -len(suffixe)]
+    return mot
+
+
+def analyser(texte):
+    """Texte brut -> liste de termes normalisés (avec répétitions)."""
+    mots = _MOT.findall(sans_accents(texte or "").lower())
+    return [
+        raciniser(mot)[:LONGUEUR_MAX_TERME]
+        for mot in mots
+        if len(mot) > 1 and mot not in MOTS_VIDES
+    ]
+
+
+def termes_ponderes(plat):
+    """{terme: poids} pour un plat, en cumulant les poids de chaque champ."""
+    poids = Counter()
+    for champ, poids_champ in POIDS_CHAMPS.items():
+        valeur = getattr(plat, champ, "") or ""
+        if champ == "tags":
+            valeur = valeur.replace(",", " ")
+        for terme in analyser(valeur):
+            poids[terme] += poids_champ
+    return poids
+
+
+def indexer_plat(plat):
+    """(Ré)indexe un plat : appelé à chaque sauvegarde (voir plats/signals.py)."""
+    from .models import PlatSearchTerm
+
+    termes = [
+        PlatSearchTerm(plat=plat, terme=terme, poids=poids)
+        for terme, poids in termes_ponderes(plat).items()
+    ]
+    with transaction.atomic():
+        PlatSearchTerm.objects.filter(plat=plat).delete()
+        PlatSearchTerm.objects.bulk_create(termes)
+
+
+def rechercher(requete, limite=20):
+    """
+    Retourne les plats actifs correspondant à la requête, classés par
+    pertinence : nombre de termes trouvés, puis somme des poids.
+    """
+    from .models import Plat, PlatSearchTerm
+
+    termes = sorted(set(analyser(requete)))
+    if not termes:
+        return []
+
+    classement = list(
+        PlatSearchTerm.objects
+        .filter(terme__in=termes, plat__est_actif=True)
+        .values("plat_id")
+        .annotate(nb_termes=Count("terme"), score=Sum("poids"))
+        .order_by("-nb_termes", "-score", "plat_id")[:limite]
+    )
+
+    plats = Plat.objects.select_related("cuisinier").in_bulk(
+        [ligne["plat_id"] for ligne in classement]
+    )
+    resultats = []
+    for ligne in classement:
+        plat = plats.get(ligne["plat_id"])
+        if plat is not None:
+            plat.score_recherche = ligne["score"]
+            resultats.append(plat)
+    return resultats
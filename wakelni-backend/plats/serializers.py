@@ -1,5 +1,6 @@
 # plats/serializers.py
 from rest_framework import serializers
+from .images import url_media
 from .models import Plat
 
 
@@ -16,6 +17,11 @@ class PlatSerializer(serializers.ModelSerializer):
 
     # et on renvoie une URL publique "photo_url"
     photo_url = serializers.SerializerMethodField(read_only=True)
+    # + les variantes redimensionnées : {"thumb": {"jpeg": url, "webp": url}, "medium": {...}}
+    photo_variants = serializers.SerializerMethodField(read_only=True)
+    # agrégats maintenus par avis/notes.py : aucune requête supplémentaire
+    note_moyenne = serializers.SerializerMethodField(read_only=True)
+    repartition_notes = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = Plat
@@ -26,22 +32,37 @@ class PlatSerializer(serializers.ModelSerializer):
             'ingredients',
             'prix',
             'stock',
+            'stock_disponible',
             'ville',
             'adresse',
             'est_actif',
             'tags',
             'photo',       # fichier en entrée
             'photo_url',   # URL en sortie
+            'photo_variants',
             'cuisinier',
+            'note_moyenne',
+            'nb_avis',
+            'repartition_notes',
             'cree_le',
         ]
-        read_only_fields = ('cuisinier', 'cree_le', 'photo_url')
+        read_only_fields = (
+            'cuisinier', 'cree_le', 'photo_url', 'photo_variants', 'stock_disponible',
+            'nb_avis',
+        )
 
     def get_photo_url(self, obj):
+        return url_media(obj.photo.name, self.context.get('request'))
+
+    def get_note_moyenne(self, obj):
+        return round(obj.note_moyenne, 2) if obj.nb_avis else None
+
+    def get_repartition_notes(self, obj):
+        return {note: getattr(obj, f"nb_notes_{note}") for note in range(1, 6)}
+
+    def get_photo_variants(self, obj):
         request = self.context.get('request')
-        if obj.photo and hasattr(obj.photo, 'url'):
-            url = obj.photo.url
-            if request is not None:
-                return request.build_absolute_uri(url)
-            return url
-        return None
+        return {
+            variante: {fmt: url_media(nom, request) for fmt, nom in formats.items()}
+            for variante, formats in (obj.photo_variantes or {}).items()
+        }
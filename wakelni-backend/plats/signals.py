@@ -0,0 +1,52 @@
+# plats/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import cache
+from .images import maj_variantes, supprimer_variantes
+from .models import Plat
+from .search import indexer_plat
+from .tags import retirer_plat_des_compteurs, synchroniser_tags
+
+
+@receiver(post_save, sender=Plat)
+def maj_index_recherche(sender, instance, raw=False, **kwargs):
+    # les termes sont supprimés en cascade avec le plat (pas besoin de post_delete)
+    if raw:
+        return
+    indexer_plat(instance)
+
+
+@receiver(post_save, sender=Plat)
+def maj_tags(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    synchroniser_tags(instance, created=created)
+
+
+@receiver(pre_delete, sender=Plat)
+def retirer_tags(sender, instance, **kwargs):
+    retirer_plat_des_compteurs(instance)
+
+
+@receiver(post_save, sender=Plat)
+def maj_photo_variantes(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # seulement si la photo a changé depuis le chargement (ou à la création)
+    if (instance.photo.name or "") != getattr(instance, "_photo_initiale", ""):
+        maj_variantes(instance)
+
+
+@receiver(post_delete, sender=Plat)
+def supprimer_photo_variantes(sender, instance, **kwargs):
+    supprimer_variantes(instance.photo_variantes)
+
+
+@receiver(post_save, sender=Plat)
+@receiver(post_delete, sender=Plat)
+def invalider_cache_catalogue(sender, **kwargs):
+    # après commit : une lecture concurrente ne peut pas remettre en cache
+    # l'ancienne version sous la nouvelle clé
+    transaction.on_commit(cache.invalider)
@@ -0,0 +1,89 @@
+# plats/tags.py
+"""
+Synchronisation entre le champ texte Plat.tags ("halal, vegan") et la
+relation normalisée Plat.etiquettes, avec maintien incrémental de
+Tag.nb_plats (nombre de plats actifs par tag) pour les facettes.
+"""
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+LONGUEUR_MAX_TAG = 50
+
+
+def decouper_tags(texte):
+    """'Halal, vegan,,halal' -> ['halal', 'vegan'] (ordre conservé, sans doublons)."""
+    noms = []
+    for morceau in (texte or "").split(","):
+        nom = " ".join(morceau.split()).lower()[:LONGUEUR_MAX_TAG]
+        if nom and nom not in noms:
+            noms.append(nom)
+    return noms
+
+
+def _tags_par_nom(noms):
+    from .models import Tag
+
+    existants = {t.nom: t for t in Tag.objects.filter(nom__in=noms)}
+    manquants = [Tag(nom=nom) for nom in noms if nom not in existants]
+    if manquants:
+        Tag.objects.bulk_create(manquants, ignore_conflicts=True)
+        existants = {t.nom: t for t in Tag.objects.filter(nom__in=noms)}
+    return existants
+
+
+def _ajuster_compteurs(tag_ids, delta):
+    from .models import Tag
+
+    if tag_ids:
+        Tag.objects.filter(pk__in=tag_ids).update(nb_plats=F("nb_plats") + delta)
+
+
+def synchroniser_tags(plat, created=False):
+    """Met à jour PlatTag et Tag.nb_plats après la sauvegarde d'un plat."""
+    from .models import PlatTag
+
+    with transaction.atomic():
+        anciens = set() if created else set(
+            PlatTag.objects.filter(plat=plat).values_list("tag_id", flat=True)
+        )
+        nouveaux = {t.pk for t in _tags_par_nom(decouper_tags(plat.tags)).values()}
+
+        PlatTag.objects.filter(plat=plat, tag_id__in=anciens - nouveaux).delete()
+        PlatTag.objects.bulk_create(
+            [PlatTag(plat=plat, tag_id=tag_id) for tag_id in nouveaux - anciens]
+        )
+
+        # un plat ne compte dans les facettes que s'il est actif
+        etait_actif = not created and getattr(plat, "_est_actif_initial", plat.est_actif)
+        comptes_avant = anciens if etait_actif else set()
+        comptes_apres = nouveaux if plat.est_actif else set()
+        _ajuster_compteurs(comptes_avant - comptes_apres, -1)
+        _ajuster_compteurs(comptes_apres - comptes_avant, +1)
+
+    plat._est_actif_initial = plat.est_actif
+
+
+def retirer_plat_des_compteurs(plat):
+    """Avant suppression d'un plat actif : ses tags perdent un plat."""
+    from .models import PlatTag
+
+    if plat.est_actif:
+        _ajuster_compteurs(
+            list(PlatTag.objects.filter(plat=plat).values_list("tag_id", flat=True)),
+            -1,
+        )
+
+
+def recalculer_compteurs():
+    """Recalcule tous les Tag.nb_plats depuis zéro (réparation)."""
+    from .models import PlatTag, Tag
+
+    comptes = (
+        PlatTag.objects
+        .filter(tag=OuterRef("pk"), plat__est_actif=True)
+        .values("tag")
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    Tag.objects.update(nb_plats=Coalesce(Subquery(comptes), Value(0)))
@@ -0,0 +1,238 @@
+import shutil
+import tempfile
+from decimal import Decimal
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from . import cache
+from .models import Plat
+
+User = get_user_model()
+
+
+class PlatsTestCase(APITestCase):
+    def setUp(self):
+        caches["catalogue"].clear()
+
+
+class CatalogueTests(PlatsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cuisinier = User.objects.create_user(
+            username="chef", password="x", role=User.Role.CUISINIER
+        )
+
+    def creer_plat(self, **kwargs):
+        data = {"nom": "Plat", "prix": Decimal("10.00"), "stock": 5}
+        data.update(kwargs)
+        return Plat.objects.create(cuisinier=self.cuisinier, **data)
+
+    def test_pagination_par_curseur(self):
+        for i in range(5):
+            self.creer_plat(nom=f"Plat {i}")
+        self.creer_plat(nom="Inactif", est_actif=False)
+
+        res = self.client.get("/api/plats/?page_size=2")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.data["results"]), 2)
+
+        vus = [p["id"] for p in res.data["results"]]
+        while res.data["next"]:
+            res = self.client.get(res.data["next"])
+            vus += [p["id"] for p in res.data["results"]]
+
+        self.assertEqual(len(vus), 5)
+        self.assertEqual(len(set(vus)), 5)
+
+    def test_filtres(self):
+        self.creer_plat(nom="Couscous", ville="Montréal", prix=Decimal("15"), tags="halal")
+        self.creer_plat(nom="Brik", ville="Laval", prix=Decimal("5"), tags="halal")
+        self.creer_plat(nom="Lablabi", ville="montréal", prix=Decimal("8"), stock=0)
+        # tout le stock est réservé par des paiements en cours
+        self.creer_plat(nom="Ojja", ville="Montréal", prix=Decimal("12"), stock=2, stock_reserve=2)
+
+        def noms(qs):
+            res = self.client.get(f"/api/plats/?{qs}")
+            self.assertEqual(res.status_code, 200)
+            return sorted(p["nom"] for p in res.data["results"])
+
+        self.assertEqual(noms("ville=MONTRéAL"), ["Couscous", "Lablabi", "Ojja"])
+        self.assertEqual(noms("prix_min=6&prix_max=10"), ["Lablabi"])
+        self.assertEqual(noms("tags=halal"), ["Brik", "Couscous"])
+        self.assertEqual(noms("ville=Montréal&en_stock=1"), ["Couscous"])
+
+    def test_cache_invalide_a_la_sauvegarde(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            plat = self.creer_plat(nom="Avant")
+        hits = cache.hits.valeur()
+
+        self.assertEqual(self.client.get("/api/plats/").data["results"][0]["nom"], "Avant")
+        self.assertEqual(self.client.get("/api/plats/").data["results"][0]["nom"], "Avant")
+        self.assertEqual(cache.hits.valeur(), hits + 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            plat.nom = "Après"
+            plat.save()
+        self.assertEqual(self.client.get("/api/plats/").data["results"][0]["nom"], "Après")
+
+    def test_prix_invalide(self):
+        res = self.client.get("/api/plats/?prix_min=abc")
+        self.assertEqual(res.status_code, 400)
+
+
+class RechercheTests(PlatsTestCase):
+    def setUp(self):
+        super().setUp()
+        cuisinier = User.objects.create_user(
+            username="chef", password="x", role=User.Role.CUISINIER
+        )
+        self.couscous = Plat.objects.create(
+            cuisinier=cuisinier, nom="Couscous épicé", prix=Decimal("15"),
+            ingredients="semoule, agneau, harissa", tags="halal,tunisien",
+        )
+        self.brik = Plat.objects.create(
+            cuisinier=cuisinier, nom="Brik à l'oeuf", prix=Decimal("5"),
+            description="Feuille croustillante, sauce epicee",
+        )
+
+    def rechercher(self, q):
+        res = self.client.get("/api/plats/recherche/", {"q": q})
+        self.assertEqual(res.status_code, 200)
+        return [p["nom"] for p in res.data]
+
+    def test_insensible_aux_accents_et_classee(self):
+        # le nom pèse plus que la description
+        self.assertEqual(self.rechercher("EPICE"), ["Couscous épicé", "Brik à l'oeuf"])
+        self.assertEqual(self.rechercher("tunisien"), ["Couscous épicé"])
+
+    def test_index_maj_a_la_sauvegarde(self):
+        self.brik.nom = "Brik au thon"
+        self.brik.save()
+        self.assertEqual(self.rechercher("thon"), ["Brik au thon"])
+
+        self.brik.est_actif = False
+        self.brik.save()
+        self.assertEqual(self.rechercher("thon"), [])
+
+    def test_requete_vide(self):
+        self.assertEqual(self.rechercher("de la"), [])
+
+
+class TagsTests(PlatsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cuisinier = User.objects.create_user(
+            username="chef", password="x", role=User.Role.CUISINIER
+        )
+
+    def creer_plat(self, **kwargs):
+        data = {"nom": "Plat", "prix": Decimal("10")}
+        data.update(kwargs)
+        return Plat.objects.create(cuisinier=self.cuisinier, **data)
+
+    def facettes(self):
+        res = self.client.get("/api/plats/tags/")
+        self.assertEqual(res.status_code, 200)
+        return {t["nom"]: t["nb_plats"] for t in res.data}
+
+    def test_facettes_maintenues(self):
+        plat = self.creer_plat(tags="Halal, vegan")
+        self.creer_plat(tags="halal")
+        self.assertEqual(self.facettes(), {"halal": 2, "vegan": 1})
+
+        plat.tags = "halal,epice"
+        plat.save()
+        self.assertEqual(self.facettes(), {"halal": 2, "epice": 1})
+
+        plat.est_actif = False
+        plat.save()
+        self.assertEqual(self.facettes(), {"halal": 1})
+
+        plat.est_actif = True
+        plat.save()
+        plat.delete()
+        self.assertEqual(self.facettes(), {"halal": 1})
+
+    def test_filtre_tag_exact(self):
+        self.creer_plat(nom="Halal", tags="halal")
+        self.creer_plat(nom="Non halal", tags="non-halal")
+
+        res = self.client.get("/api/plats/", {"tags": "HALAL"})
+        self.assertEqual([p["nom"] for p in res.data["results"]], ["Halal"])
+        # le champ "tags" de l'API reste le texte saisi
+        self.assertEqual(res.data["results"][0]["tags"], "halal")
+
+
+class CatalogueConditionnelTests(PlatsTestCase):
+    def test_etag(self):
+        cuisinier = User.objects.create_user(
+            username="chef", password="x", role=User.Role.CUISINIER
+        )
+        Plat.objects.create(cuisinier=cuisinier, nom="A", prix=Decimal("5"))
+
+        res = self.client.get("/api/plats/")
+        self.assertIn("ETag", res)
+        res = self.client.get("/api/plats/", HTTP_IF_NONE_MATCH=res["ETag"])
+        self.assertEqual(res.status_code, 304)
+
+        b = Plat.objects.create(cuisinier=cuisinier, nom="B", prix=Decimal("5"))
+        res = self.client.get("/api/plats/", HTTP_IF_NONE_MATCH=res["ETag"])
+        self.assertEqual(res.status_code, 200)
+
+        # une suppression ne fait pas avancer max(modifie_le) : pas de
+        # Last-Modified, donc pas de faux 304 sur If-Modified-Since seul
+        self.assertNotIn("Last-Modified", res)
+        etag = res["ETag"]
+        b.delete()
+        res = self.client.get("/api/plats/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        res = self.client.get(
+            "/api/plats/", HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT"
+        )
+        self.assertEqual(res.status_code, 200)
+
+
+MEDIA_TEST = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TEST)
+class PhotoVariantesTests(PlatsTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_TEST, ignore_errors=True)
+        super().tearDownClass()
+
+    def photo(self, nom="brik.jpg"):
+        tampon = BytesIO()
+        Image.new("RGB", (1600, 1200), "orange").save(tampon, "JPEG")
+        return SimpleUploadedFile(nom, tampon.getvalue(), content_type="image/jpeg")
+
+    def test_variantes_generees_et_exposees(self):
+        cuisinier = User.objects.create_user(
+            username="chef", password="x", role=User.Role.CUISINIER
+        )
+        plat = Plat.objects.create(
+            cuisinier=cuisinier, nom="Brik", prix=Decimal("5"), photo=self.photo()
+        )
+        self.assertEqual(set(plat.photo_variantes), {"thumb", "medium"})
+        with default_storage.open(plat.photo_variantes["thumb"]["webp"]) as f:
+            self.assertEqual(Image.open(f).size, (320, 240))
+
+        res = self.client.get("/api/plats/")
+        variants = res.data["results"][0]["photo_variants"]
+        self.assertTrue(variants["medium"]["jpeg"].startswith("http://testserver/media/"))
+
+        # photo retirée -> variantes supprimées
+        anciennes = plat.photo_variantes
+        plat = Plat.objects.get(pk=plat.pk)
+        plat.photo = None
+        plat.save()
+        self.assertEqual(plat.photo_variantes, {})
+        self.assertFalse(default_storage.exists(anciennes["thumb"]["jpeg"]))
@@ -1,9 +1,17 @@
 # plats/urls.py
 from django.urls import path
-from .views import PlatListCreateView, MesPlatsView, PlatDetailView
+from .views import (
+    FacettesTagsView,
+    MesPlatsView,
+    PlatDetailView,
+    PlatListCreateView,
+    RecherchePlatsView,
+)
 
 urlpatterns = [
     path("", PlatListCreateView.as_view(), name="plats-list-create"),
+    path("recherche/", RecherchePlatsView.as_view(), name="plats-recherche"),
+    path("tags/", FacettesTagsView.as_view(), name="plats-tags"),
     path("mes-plats/", MesPlatsView.as_view(), name="mes-plats"),
     path("<uuid:id>/", PlatDetailView.as_view(), name="plat-detail"),
 ]
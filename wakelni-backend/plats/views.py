@@ -2,29 +2,50 @@
 from rest_framework import generics, permissions
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from .models import Plat
+from wakelni_backend.conditional import requete_conditionnelle, validateur_queryset
+
+from . import cache
+from .filters import filtrer_catalogue
+from .models import Plat, Tag
+from .pagination import PlatCursorPagination
+from .search import rechercher
 from .serializers import PlatSerializer
 
 
 class PlatListCreateView(generics.ListCreateAPIView):
     """
-    GET /api/plats/        -> liste de tous les plats actifs (clients)
+    GET /api/plats/        -> plats actifs, paginés par curseur (clients)
+                              filtres : ville, prix_min, prix_max, tags, en_stock
     POST /api/plats/       -> créer un plat (cuisinier connecté)
     """
     serializer_class = PlatSerializer
     queryset = Plat.objects.all()
+    pagination_class = PlatCursorPagination
     # ⬇️ important pour upload
     parser_classes = [MultiPartParser, FormParser, JSONParser]
 
     def get_queryset(self):
-        return Plat.objects.filter(est_actif=True)
+        qs = Plat.objects.filter(est_actif=True).select_related("cuisinier")
+        return filtrer_catalogue(qs, self.request.query_params)
 
     def get_permissions(self):
         if self.request.method == "GET":
             return [permissions.AllowAny()]
         return [permissions.IsAuthenticated()]
 
+    @requete_conditionnelle(validateur_queryset("modifie_le"))
+    def list(self, request, *args, **kwargs):
+        # la page sérialisée est mise en cache sous la version courante du catalogue
+        cle = cache.cle_page(request)
+        data = cache.lire_page(cle)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.ecrire_page(cle, data)
+        return Response(data)
+
     def perform_create(self, serializer):
         user = self.request.user
         if getattr(user, "role", None) != "CUISINIER":
@@ -32,6 +53,47 @@ class PlatListCreateView(generics.ListCreateAPIView):
         serializer.save(cuisinier=user)
 
 
+class RecherchePlatsView(APIView):
+    """
+    GET /api/plats/recherche/?q=couscous épicé&limite=20
+    -> plats actifs classés par pertinence (nom > tags > ingrédients > description),
+       insensible aux accents.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    LIMITE_MAX = 50
+
+    def get(self, request):
+        requete = request.query_params.get("q", "")
+        try:
+            limite = int(request.query_params.get("limite", 20))
+        except ValueError:
+            limite = 20
+        limite = max(1, min(limite, self.LIMITE_MAX))
+
+        plats = rechercher(requete, limite=limite)
+        serializer = PlatSerializer(plats, many=True, context={"request": request})
+        return Response(serializer.data)
+
+
+class FacettesTagsView(APIView):
+    """
+    GET /api/plats/tags/
+    -> [{"nom": "halal", "nb_plats": 12}, ...] : nombre de plats actifs par tag,
+       lu directement depuis l'agrégat Tag.nb_plats (pas de GROUP BY).
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        tags = (
+            Tag.objects
+            .filter(nb_plats__gt=0)
+            .order_by("-nb_plats", "nom")
+            .values("nom", "nb_plats")
+        )
+        return Response(list(tags))
+
+
 class MesPlatsView(generics.ListAPIView):
     """
     GET /api/plats/mes-plats/
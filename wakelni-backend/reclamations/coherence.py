@@ -0,0 +1,45 @@
+# reclamations/coherence.py
+"""
+Reclamation.cuisinier est une copie de commande.cuisinier (ou, pour les
+commandes d'avant la colonne, du cuisinier du plat visé). Les vues du
+cuisinier filtrent dessus : une ligne sans cuisinier, ou avec le mauvais,
+disparaît de son tableau de bord. Commande `verifier_reclamations`.
+"""
+from django.db.models import F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from commandes.models import Commande
+from plats.models import Plat
+
+from .models import Reclamation
+
+
+def _cuisinier_attendu():
+    return Coalesce(
+        Subquery(Commande.objects.filter(pk=OuterRef("commande")).values("cuisinier")[:1]),
+        Subquery(Plat.objects.filter(pk=OuterRef("plat")).values("cuisinier")[:1]),
+    )
+
+
+def incoherentes():
+    """
+    Réclamations dont le cuisinier manque ou diffère du cuisinier attendu.
+    Retourne (sans_cuisinier, divergentes).
+    """
+    qs = Reclamation.objects.annotate(
+        attendu=_cuisinier_attendu()
+    ).filter(attendu__isnull=False)
+    sans_cuisinier = qs.filter(cuisinier__isnull=True)
+    divergentes = qs.filter(cuisinier__isnull=False).filter(~Q(cuisinier=F("attendu")))
+    return sans_cuisinier, divergentes
+
+
+def reparer():
+    """Recopie le cuisinier attendu là où il manque ou diffère. Retourne le nombre de lignes."""
+    total = 0
+    for qs in incoherentes():
+        ids = list(qs.values_list("pk", flat=True))
+        total += Reclamation.objects.filter(pk__in=ids).update(
+            cuisinier=_cuisinier_attendu()
+        )
+    return total
@@ -0,0 +1,27 @@
+# reclamations/management/commands/verifier_reclamations.py
+from django.core.management.base import BaseCommand
+
+from reclamations.coherence import incoherentes, reparer
+from reclamations.sla import recalculer_en_attente
+
+
+class Command(BaseCommand):
+    help = (
+        "Vérifie que chaque réclamation porte le cuisinier de sa commande "
+        "(--corriger pour recopier le bon)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--corriger", action="store_true")
+
+    def handle(self, *args, **options):
+        sans_cuisinier, divergentes = incoherentes()
+        nb_sans, nb_divergentes = sans_cuisinier.count(), divergentes.count()
+        self.stdout.write(
+            f"{nb_sans} réclamation(s) sans cuisinier, {nb_divergentes} divergente(s)."
+        )
+        if options["corriger"] and (nb_sans or nb_divergentes):
+            total = reparer()
+            # les réclamations déplacées changent de file d'attente
+            recalculer_en_attente()
+            self.stdout.write(self.style.SUCCESS(f"{total} réclamation(s) corrigée(s)."))
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commandes', '0007_backfill_commande_cuisinier'),
+        ('plats', '0012_agregats_notes'),
+        ('reclamations', '0002_reclamation_plat_alter_reclamation_motif_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reclamation',
+            name='client',
+            field=models.ForeignKey(db_index=False, limit_choices_to={'role': 'CLIENT'}, on_delete=django.db.models.deletion.CASCADE, related_name='reclamations', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='reclamation',
+            name='cuisinier',
+            field=models.ForeignKey(blank=True, db_index=False, limit_choices_to={'role': 'CUISINIER'}, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reclamations_recues', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='reclamation',
+            index=models.Index(fields=['cuisinier', 'statut', '-date', '-id'], name='reclamation_cuisinier_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reclamation',
+            index=models.Index(fields=['client', '-date', '-id'], name='reclamation_client_date_idx'),
+        ),
+    ]
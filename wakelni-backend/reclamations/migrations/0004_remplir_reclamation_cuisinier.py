@@ -0,0 +1,35 @@
+from django.db import migrations
+from django.db.models import F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+
+# copie figée de reclamations/coherence.py (reparer) au moment de cette migration
+def remplir_cuisinier(apps, schema_editor):
+    Reclamation = apps.get_model("reclamations", "Reclamation")
+    Commande = apps.get_model("commandes", "Commande")
+    Plat = apps.get_model("plats", "Plat")
+
+    attendu = Coalesce(
+        Subquery(Commande.objects.filter(pk=OuterRef("commande")).values("cuisinier")[:1]),
+        Subquery(Plat.objects.filter(pk=OuterRef("plat")).values("cuisinier")[:1]),
+    )
+    ids = list(
+        Reclamation.objects
+        .annotate(attendu=attendu)
+        .filter(attendu__isnull=False)
+        .filter(Q(cuisinier__isnull=True) | ~Q(cuisinier=F("attendu")))
+        .values_list("pk", flat=True)
+    )
+    Reclamation.objects.filter(pk__in=ids).update(cuisinier=attendu)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reclamations', '0003_reclamation_index'),
+        ('commandes', '0007_backfill_commande_cuisinier'),
+    ]
+
+    operations = [
+        migrations.RunPython(remplir_cuisinier, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commandes', '0007_backfill_commande_cuisinier'),
+        ('plats', '0012_agregats_notes'),
+        ('reclamations', '0004_remplir_reclamation_cuisinier'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DelaiReclamations',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mesure', models.CharField(choices=[('LU', 'Délai de lecture'), ('TRAITEE', 'Délai de traitement')], max_length=10)),
+                ('tranche', models.PositiveSmallIntegerField()),
+                ('nb', models.PositiveIntegerField(default=0)),
+                ('somme_s', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ReclamationsEnAttente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('motif', models.CharField(choices=[('QUALITE_PLAT', 'Qualité du plat'), ('DELAI', 'Délai de livraison'), ('ERREUR_COMMANDE', 'Erreur dans la commande'), ('AUTRE', 'Autre')], max_length=30)),
+                ('nb', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='reclamation',
+            name='lu_le',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reclamation',
+            name='traitee_le',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='reclamation',
+            index=models.Index(condition=models.Q(('statut', 'OUVERT')), fields=['date', 'cuisinier'], name='reclamation_non_lue_idx'),
+        ),
+        migrations.AddField(
+            model_name='delaireclamations',
+            name='cuisinier',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='reclamationsenattente',
+            name='cuisinier',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='delaireclamations',
+            constraint=models.UniqueConstraint(fields=('cuisinier', 'mesure', 'tranche'), name='delai_reclamations_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='reclamationsenattente',
+            constraint=models.UniqueConstraint(fields=('cuisinier', 'motif'), name='reclamations_attente_unique'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations
+from django.db.models import Count, F
+
+# copie figée de reclamations/sla.py (recalculer_en_attente) au moment de cette migration
+STATUTS_EN_ATTENTE = ("OUVERT", "LU", "EN_COURS")
+
+
+def remplir(apps, schema_editor):
+    Reclamation = apps.get_model("reclamations", "Reclamation")
+    ReclamationsEnAttente = apps.get_model("reclamations", "ReclamationsEnAttente")
+
+    # délais passés inconnus : posés à la date de création pour qu'un
+    # prochain changement de statut ne les compte pas dans l'histogramme
+    Reclamation.objects.exclude(statut="OUVERT").update(lu_le=F("date"))
+    Reclamation.objects.filter(statut="TRAITEE").update(traitee_le=F("date"))
+
+    ReclamationsEnAttente.objects.all().delete()
+    ReclamationsEnAttente.objects.bulk_create([
+        ReclamationsEnAttente(cuisinier_id=ligne["cuisinier"], motif=ligne["motif"], nb=ligne["nb"])
+        for ligne in (
+            Reclamation.objects
+            .filter(cuisinier__isnull=False, statut__in=STATUTS_EN_ATTENTE)
+            .values("cuisinier", "motif")
+            .annotate(nb=Count("pk"))
+            .order_by()
+        )
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reclamations', '0005_sla_reclamations'),
+    ]
+
+    operations = [
+        migrations.RunPython(remplir, migrations.RunPython.noop),
+    ]
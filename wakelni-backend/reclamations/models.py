@@ -43,8 +43,11 @@ class Reclamation(models.Model):
         on_delete=models.CASCADE,
         related_name="reclamations",
         limit_choices_to={"role": "CLIENT"},
+        db_index=False,  # préfixe de reclamation_client_date_idx
     )
 
+    # recopié de la commande à la création : les tableaux de bord du
+    # cuisinier filtrent dessus (reclamations/coherence.py le répare)
     cuisinier = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.SET_NULL,
@@ -52,6 +55,7 @@ class Reclamation(models.Model):
         blank=True,
         related_name="reclamations_recues",
         limit_choices_to={"role": "CUISINIER"},
+        db_index=False,  # préfixe de reclamation_cuisinier_idx
     )
 
     motif = models.CharField(
@@ -70,11 +74,78 @@ class Reclamation(models.Model):
 
     date = models.DateTimeField(auto_now_add=True)
 
+    # premiers passages (reclamations/sla.py) : sortie de OUVERT, puis TRAITEE
+    lu_le = models.DateTimeField(null=True, blank=True)
+    traitee_le = models.DateTimeField(null=True, blank=True)
+
     class Meta:
         unique_together = ("client", "commande", "plat")
+        indexes = [
+            # tableau de bord du cuisinier, filtrable par statut
+            models.Index(
+                fields=["cuisinier", "statut", "-date", "-id"],
+                name="reclamation_cuisinier_idx",
+            ),
+            # « mes réclamations » du client
+            models.Index(fields=["client", "-date", "-id"], name="reclamation_client_date_idx"),
+            # cuisiniers qui tardent à lire : seules les réclamations non lues
+            models.Index(
+                fields=["date", "cuisinier"],
+                name="reclamation_non_lue_idx",
+                condition=models.Q(statut="OUVERT"),
+            ),
+        ]
 
     def __str__(self):
         return f"Réclamation {self.id} - Cmd {self.commande.id} - Plat {self.plat}"
-    
 
-    
+
+class DelaiReclamations(models.Model):
+    """
+    Histogramme des délais de réponse d'un cuisinier : nombre de
+    réclamations (et somme des délais) par tranche, pour la lecture et pour
+    le traitement. Tenu à jour à chaque changement de statut
+    (reclamations/sla.py) ; les percentiles s'en déduisent sans relire les
+    réclamations.
+    """
+    MESURE_LECTURE = "LU"
+    MESURE_TRAITEMENT = "TRAITEE"
+    MESURES = [
+        (MESURE_LECTURE, "Délai de lecture"),
+        (MESURE_TRAITEMENT, "Délai de traitement"),
+    ]
+
+    cuisinier = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+        db_index=False,  # préfixe de la contrainte unique
+    )
+    mesure = models.CharField(max_length=10, choices=MESURES)
+    tranche = models.PositiveSmallIntegerField()  # indice dans sla.TRANCHES_S
+    nb = models.PositiveIntegerField(default=0)
+    somme_s = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["cuisinier", "mesure", "tranche"], name="delai_reclamations_unique"
+            ),
+        ]
+
+
+class ReclamationsEnAttente(models.Model):
+    """Réclamations encore ouvertes (OUVERT, LU, EN_COURS) par cuisinier et par motif."""
+    cuisinier = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+        db_index=False,  # préfixe de la contrainte unique
+    )
+    motif = models.CharField(max_length=30, choices=MotifReclamation.choices)
+    nb = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["cuisinier", "motif"], name="reclamations_attente_unique"),
+        ]
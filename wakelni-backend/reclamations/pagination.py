@@ -0,0 +1,13 @@
+# reclamations/pagination.py
+from rest_framework.pagination import CursorPagination
+
+
+class ReclamationCursorPagination(CursorPagination):
+    """
+    Réclamations par curseur (date, id), servies par
+    reclamation_cuisinier_idx / reclamation_client_date_idx.
+    """
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-date", "-id")
@@ -1,6 +1,8 @@
+from django.db import transaction
 from rest_framework import serializers
 from commandes.models import Commande
 from .models import Reclamation, MotifReclamation, StatutReclamation
+from .sla import reclamation_creee
 
 
 class ReclamationCreateSerializer(serializers.ModelSerializer):
@@ -34,7 +36,7 @@ class ReclamationCreateSerializer(serializers.ModelSerializer):
         )
 
         plat = ligne.plat if ligne else None
-        cuisinier = plat.cuisinier if plat else None
+        cuisinier = commande.cuisinier or (plat.cuisinier if plat else None)
 
         # 🔒 Empêcher une 2e réclamation pour la même commande / plat
         if Reclamation.objects.filter(
@@ -50,17 +52,21 @@ class ReclamationCreateSerializer(serializers.ModelSerializer):
                 }
             )
 
-        return Reclamation.objects.create(
-            commande=commande,
-            plat=plat,
-            client=user,
-            cuisinier=cuisinier,
-            motif=validated_data["motif"],
-            description=validated_data.get("description", ""),
-        )
+        with transaction.atomic():
+            reclamation = Reclamation.objects.create(
+                commande=commande,
+                plat=plat,
+                client=user,
+                cuisinier=cuisinier,
+                motif=validated_data["motif"],
+                description=validated_data.get("description", ""),
+            )
+            # file d'attente du cuisinier (reclamations/sla.py)
+            reclamation_creee(reclamation)
+        return reclamation
 
 class ReclamationListSerializer(serializers.ModelSerializer):
-    commande_id = serializers.CharField(source="commande.id", read_only=True)
+    commande_id = serializers.CharField(read_only=True)
     commande_label = serializers.SerializerMethodField()
     motif_label = serializers.CharField(source="get_motif_display", read_only=True)
     statut_label = serializers.CharField(source="get_statut_display", read_only=True)
@@ -81,7 +87,7 @@ class ReclamationListSerializer(serializers.ModelSerializer):
 
     def get_commande_label(self, obj):
         # adapte si tu as un champ numero / reference
-        return f"Commande #{obj.commande.id}"
+        return f"Commande #{obj.commande_id}"
     
 
 class ReclamationCuisinierSerializer(serializers.ModelSerializer):
@@ -116,4 +122,4 @@ class ReclamationCuisinierSerializer(serializers.ModelSerializer):
 
     def get_commande_label(self, obj):
         # adapte si tu as un champ "numero" sur Commande
-        return f"Commande #{obj.commande.id}"
+        return f"Commande #{obj.commande_id}"
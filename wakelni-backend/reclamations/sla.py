@@ -0,0 +1,231 @@
+# reclamations/sla.py
+"""
+Changements de statut des réclamations et délais de réponse des cuisiniers.
+
+Tous les changements de statut passent par changer_statut() : un seul UPDATE
+conditionnel pour n réclamations, qui pose aussi lu_le / traitee_le au
+premier passage. Dans la même transaction, deux agrégats sont tenus à jour :
+
+- DelaiReclamations : histogramme des délais (date -> lu_le, date ->
+  traitee_le) par cuisinier, en tranches fixes (TRANCHES_S) ;
+- ReclamationsEnAttente : réclamations encore ouvertes par cuisinier et motif.
+
+resume_cuisinier() lit ces agrégats (quelques dizaines de lignes), jamais
+les réclamations. retards() liste les cuisiniers qui laissent des
+réclamations non lues, via l'index partiel reclamation_non_lue_idx.
+"""
+import operator
+from collections import Counter
+from datetime import timedelta
+from functools import reduce
+
+from django.db import transaction
+from django.db.models import BigIntegerField, Case, Count, F, Min, Q, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import (
+    DelaiReclamations,
+    MotifReclamation,
+    Reclamation,
+    ReclamationsEnAttente,
+    StatutReclamation,
+)
+
+# bornes supérieures des tranches de délai (secondes) ; la dernière est ouverte
+TRANCHES_S = (
+    15 * 60,
+    3600,
+    4 * 3600,
+    12 * 3600,
+    24 * 3600,
+    2 * 24 * 3600,
+    3 * 24 * 3600,
+    7 * 24 * 3600,
+    None,
+)
+
+STATUTS_EN_ATTENTE = (
+    StatutReclamation.OUVERT,
+    StatutReclamation.LU,
+    StatutReclamation.EN_COURS,
+)
+
+PERCENTILES = (50, 90, 99)
+
+
+def tranche(delai_s):
+    for indice, borne in enumerate(TRANCHES_S):
+        if borne is None or delai_s <= borne:
+            return indice
+
+
+# ---------- écriture ----------
+
+def _incrementer(model, cles, valeurs):
+    """
+    Ajoute `valeurs` ({cle: {champ: delta}}) aux lignes de `model` repérées
+    par `cles` (noms des champs de la clé) : création des lignes manquantes
+    puis un UPDATE relatif (F()) par champ, quel que soit le nombre de lignes.
+    """
+    if not valeurs:
+        return
+    model.objects.bulk_create(
+        [model(**dict(zip(cles, cle))) for cle in valeurs],
+        ignore_conflicts=True,
+    )
+    conditions = {cle: Q(**dict(zip(cles, cle))) for cle in valeurs}
+    champs = {champ for deltas in valeurs.values() for champ in deltas}
+    model.objects.filter(reduce(operator.or_, conditions.values())).update(**{
+        champ: F(champ) + Case(
+            *[
+                When(conditions[cle], then=Value(deltas.get(champ, 0)))
+                for cle, deltas in valeurs.items()
+            ],
+            default=Value(0),
+            output_field=BigIntegerField(),
+        )
+        for champ in champs
+    })
+
+
+def reclamation_creee(reclamation):
+    """À appeler dans la transaction qui crée la réclamation."""
+    if reclamation.cuisinier_id:
+        _incrementer(
+            ReclamationsEnAttente,
+            ("cuisinier_id", "motif"),
+            {(reclamation.cuisinier_id, reclamation.motif): {"nb": 1}},
+        )
+
+
+def changer_statut(cuisinier, ids, statut, maintenant=None):
+    """
+    Passe au `statut` les réclamations `ids` du `cuisinier` qui n'y sont pas
+    déjà. Retourne la liste des ids modifiés (les autres : introuvables,
+    d'un autre cuisinier ou déjà dans ce statut).
+    """
+    maintenant = maintenant or timezone.now()
+    with transaction.atomic():
+        # verrou : les agrégats se calculent sur l'état avant UPDATE
+        lignes = list(
+            Reclamation.objects
+            .select_for_update()
+            .filter(pk__in=ids, cuisinier=cuisinier)
+            .exclude(statut=statut)
+            .values("pk", "statut", "motif", "date", "lu_le", "traitee_le")
+        )
+        if not lignes:
+            return []
+
+        champs = {"statut": statut}
+        if statut != StatutReclamation.OUVERT:
+            champs["lu_le"] = Coalesce(F("lu_le"), Value(maintenant))
+        if statut == StatutReclamation.TRAITEE:
+            champs["traitee_le"] = Coalesce(F("traitee_le"), Value(maintenant))
+        modifiees = [ligne["pk"] for ligne in lignes]
+        Reclamation.objects.filter(pk__in=modifiees).update(**champs)
+
+        delais, attente = {}, Counter()
+        for ligne in lignes:
+            for mesure, premiere_fois in (
+                (DelaiReclamations.MESURE_LECTURE,
+                 "lu_le" in champs and ligne["lu_le"] is None),
+                (DelaiReclamations.MESURE_TRAITEMENT,
+                 "traitee_le" in champs and ligne["traitee_le"] is None),
+            ):
+                if premiere_fois:
+                    delai_s = max(int((maintenant - ligne["date"]).total_seconds()), 0)
+                    deltas = delais.setdefault(
+                        (cuisinier.pk, mesure, tranche(delai_s)), Counter()
+                    )
+                    deltas.update({"nb": 1, "somme_s": delai_s})
+            avant = ligne["statut"] in STATUTS_EN_ATTENTE
+            apres = statut in STATUTS_EN_ATTENTE
+            if avant != apres:
+                attente[(cuisinier.pk, ligne["motif"])] += 1 if apres else -1
+
+        _incrementer(DelaiReclamations, ("cuisinier_id", "mesure", "tranche"), delais)
+        _incrementer(
+            ReclamationsEnAttente,
+            ("cuisinier_id", "motif"),
+            {cle: {"nb": n} for cle, n in attente.items() if n},
+        )
+    return modifiees
+
+
+def recalculer_en_attente():
+    """Reconstruit ReclamationsEnAttente depuis les réclamations (réparation)."""
+    with transaction.atomic():
+        ReclamationsEnAttente.objects.all().delete()
+        ReclamationsEnAttente.objects.bulk_create([
+            ReclamationsEnAttente(cuisinier_id=ligne["cuisinier"], motif=ligne["motif"], nb=ligne["nb"])
+            for ligne in (
+                Reclamation.objects
+                .filter(cuisinier__isnull=False, statut__in=STATUTS_EN_ATTENTE)
+                .values("cuisinier", "motif")
+                .annotate(nb=Count("pk"))
+                .order_by()
+            )
+        ])
+
+
+# ---------- lecture ----------
+
+def _statistiques(tranches):
+    """tranches : {indice: (nb, somme_s)} -> moyenne, percentiles, répartition."""
+    total = sum(nb for nb, _somme in tranches.values())
+    somme = sum(somme for _nb, somme in tranches.values())
+    resultat = {
+        "nb": total,
+        "moyenne_s": round(somme / total) if total else None,
+        "repartition": [
+            {"jusqu_a_s": borne, "nb": tranches.get(indice, (0, 0))[0]}
+            for indice, borne in enumerate(TRANCHES_S)
+        ],
+    }
+    # percentile = borne haute de la tranche qui le contient (None : au-delà
+    # de la dernière borne)
+    for p in PERCENTILES:
+        valeur, cumul = None, 0
+        for indice, borne in enumerate(TRANCHES_S):
+            cumul += tranches.get(indice, (0, 0))[0]
+            if total and cumul * 100 >= p * total:
+                valeur = borne
+                break
+        resultat[f"p{p}_s"] = valeur
+    return resultat
+
+
+def resume_cuisinier(cuisinier):
+    """Délais de lecture / de traitement et réclamations en attente par motif."""
+    tranches = {mesure: {} for mesure, _libelle in DelaiReclamations.MESURES}
+    for ligne in DelaiReclamations.objects.filter(cuisinier=cuisinier, nb__gt=0):
+        tranches[ligne.mesure][ligne.tranche] = (ligne.nb, ligne.somme_s)
+
+    par_motif = dict.fromkeys(MotifReclamation.values, 0)
+    par_motif.update(
+        ReclamationsEnAttente.objects
+        .filter(cuisinier=cuisinier)
+        .values_list("motif", "nb")
+    )
+    return {
+        "delai_lecture": _statistiques(tranches[DelaiReclamations.MESURE_LECTURE]),
+        "delai_traitement": _statistiques(tranches[DelaiReclamations.MESURE_TRAITEMENT]),
+        "en_attente": {"total": sum(par_motif.values()), "par_motif": par_motif},
+    }
+
+
+def retards(depuis_heures, limite=50):
+    """
+    Cuisiniers ayant des réclamations non lues depuis plus de `depuis_heures`,
+    la plus ancienne d'abord. Ne lit que l'index partiel des non lues.
+    """
+    seuil = timezone.now() - timedelta(hours=depuis_heures)
+    return list(
+        Reclamation.objects
+        .filter(statut=StatutReclamation.OUVERT, date__lt=seuil, cuisinier__isnull=False)
+        .values("cuisinier")
+        .annotate(non_lues=Count("pk"), plus_ancienne=Min("date"))
+        .order_by("plus_ancienne")[:limite]
+    )
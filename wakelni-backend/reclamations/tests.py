@@ -1,3 +1,227 @@
-from django.test import TestCase
+import io
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from commandes.models import Commande, LigneCommande
+from plats.models import Plat
+
+from .coherence import incoherentes
+from .models import MotifReclamation, Reclamation, ReclamationsEnAttente, StatutReclamation
+from .sla import reclamation_creee
+
+User = get_user_model()
+
+
+class ReclamationTestCase(APITestCase):
+    def setUp(self):
+        self.cuisinier = User.objects.create_user(
+            username="chef", password="x", role=User.Role.CUISINIER
+        )
+        self.autre_cuisinier = User.objects.create_user(
+            username="chef2", password="x", role=User.Role.CUISINIER
+        )
+        self.client_user = User.objects.create_user(username="client", password="x")
+        self.plat = Plat.objects.create(
+            cuisinier=self.cuisinier, nom="Couscous", prix=Decimal("10"), stock=5
+        )
+
+    def reclamer(self, **champs):
+        commande = Commande.objects.create(
+            client=self.client_user, cuisinier=self.cuisinier,
+            statut=Commande.STATUT_COMPLETEE, total=Decimal("10"),
+        )
+        LigneCommande.objects.create(commande=commande, plat=self.plat, sous_total=Decimal("10"))
+        champs.setdefault("cuisinier", self.cuisinier)
+        reclamation = Reclamation.objects.create(
+            commande=commande, plat=self.plat, client=self.client_user, **champs
+        )
+        reclamation_creee(reclamation)
+        return reclamation
+
+
+class TableauDeBordTests(ReclamationTestCase):
+    def test_liste_cuisinier_paginee_et_filtree(self):
+        for _ in range(3):
+            self.reclamer()
+        self.reclamer(statut=StatutReclamation.TRAITEE)
+        self.reclamer(cuisinier=self.autre_cuisinier)
+
+        self.client.force_authenticate(self.cuisinier)
+        with CaptureQueriesContext(connection) as requetes:
+            res = self.client.get("/api/reclamations/cuisinier/", {"page_size": 3})
+        self.assertEqual(len(requetes), 1)
+        self.assertEqual(len(res.data["results"]), 3)
+        self.assertIn("commande_label", res.data["results"][0])
+        suite = self.client.get(res.data["next"])
+        self.assertEqual(len(suite.data["results"]), 1)
+        self.assertIsNone(suite.data["next"])
+
+        res = self.client.get("/api/reclamations/cuisinier/", {"statut": "TRAITEE"})
+        self.assertEqual([r["statut"] for r in res.data["results"]], ["TRAITEE"])
+        res = self.client.get("/api/reclamations/cuisinier/", {"statut": "FERMEE"})
+        self.assertEqual(res.status_code, 400)
+
+    def test_liste_client_paginee(self):
+        for _ in range(3):
+            self.reclamer()
+        self.client.force_authenticate(self.client_user)
+        res = self.client.get("/api/reclamations/mes-reclamations/", {"page_size": 2})
+        self.assertEqual(len(res.data["results"]), 2)
+        self.assertIsNotNone(res.data["next"])
+
+    def test_changer_statut_limite_au_cuisinier_de_la_reclamation(self):
+        reclamation = self.reclamer()
+        url = f"/api/reclamations/{reclamation.pk}/changer-statut/"
+
+        self.client.force_authenticate(self.autre_cuisinier)
+        self.assertEqual(self.client.post(url, {"statut": "LU"}).status_code, 404)
+
+        self.client.force_authenticate(self.cuisinier)
+        res = self.client.post(url, {"statut": "LU"})
+        self.assertEqual(res.status_code, 200)
+        reclamation.refresh_from_db()
+        self.assertEqual(reclamation.statut, StatutReclamation.LU)
+
+
+class CoherenceTests(ReclamationTestCase):
+    def test_verifier_et_corriger(self):
+        correcte = self.reclamer()
+        sans = self.reclamer(cuisinier=None)
+        divergente = self.reclamer(cuisinier=self.autre_cuisinier)
+        # commande d'avant Commande.cuisinier : repli sur le cuisinier du plat
+        ancienne = self.reclamer(cuisinier=None)
+        Commande.objects.filter(pk=ancienne.commande_id).update(cuisinier=None)
+
+        sortie = io.StringIO()
+        call_command("verifier_reclamations", stdout=sortie)
+        self.assertIn("2 réclamation(s) sans cuisinier, 1 divergente(s)", sortie.getvalue())
+        sans.refresh_from_db()
+        self.assertIsNone(sans.cuisinier_id)
+
+        sortie = io.StringIO()
+        call_command("verifier_reclamations", "--corriger", stdout=sortie)
+        self.assertIn("3 réclamation(s) corrigée(s)", sortie.getvalue())
+        for reclamation in (correcte, sans, divergente, ancienne):
+            reclamation.refresh_from_db()
+            self.assertEqual(reclamation.cuisinier_id, self.cuisinier.pk)
+        self.assertEqual([qs.count() for qs in incoherentes()], [0, 0])
+
+
+class TriGroupeEtSlaTests(ReclamationTestCase):
+    def en_attente(self):
+        return dict(
+            ReclamationsEnAttente.objects.filter(cuisinier=self.cuisinier)
+            .values_list("motif", "nb")
+        )
+
+    def test_creation_par_l_api_alimente_la_file(self):
+        commande = Commande.objects.create(
+            client=self.client_user, cuisinier=self.cuisinier,
+            statut=Commande.STATUT_COMPLETEE, total=Decimal("10"),
+        )
+        LigneCommande.objects.create(commande=commande, plat=self.plat, sous_total=Decimal("10"))
+        self.client.force_authenticate(self.client_user)
+        res = self.client.post(
+            "/api/reclamations/creer/",
+            {"commande_id": str(commande.pk), "motif": "DELAI"},
+            format="json",
+        )
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(self.en_attente(), {"DELAI": 1})
+
+    def test_changement_groupe(self):
+        miennes = [self.reclamer() for _ in range(3)]
+        deja_lue = self.reclamer(statut=StatutReclamation.LU)
+        autre = self.reclamer(cuisinier=self.autre_cuisinier)
+        ids = [str(r.pk) for r in (*miennes, deja_lue, autre)]
+
+        self.client.force_authenticate(self.cuisinier)
+        with CaptureQueriesContext(connection) as requetes:
+            res = self.client.post(
+                "/api/reclamations/changer-statut/", {"ids": ids, "statut": "LU"}, format="json"
+            )
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["modifiees"], ids[:3])
+        self.assertEqual(res.data["ignorees"], ids[3:])
+        mises_a_jour = [q for q in requetes if q["sql"].startswith('UPDATE "reclamations_reclamation"')]
+        self.assertEqual(len(mises_a_jour), 1)
+        for reclamation in miennes:
+            reclamation.refresh_from_db()
+            self.assertEqual(reclamation.statut, StatutReclamation.LU)
+            self.assertIsNotNone(reclamation.lu_le)
+
+        url = "/api/reclamations/changer-statut/"
+        for corps in (
+            {"ids": ids, "statut": "FERMEE"},
+            {"ids": [], "statut": "LU"},
+            {"ids": ["pas-un-uuid"], "statut": "LU"},
+        ):
+            self.assertEqual(self.client.post(url, corps, format="json").status_code, 400, corps)
+        self.client.force_authenticate(self.client_user)
+        res = self.client.post(url, {"ids": ids, "statut": "LU"}, format="json")
+        self.assertEqual(res.status_code, 403)
+
+    def test_sla_depuis_les_agregats(self):
+        delai = self.reclamer(motif=MotifReclamation.DELAI)
+        qualite = [self.reclamer(motif=MotifReclamation.QUALITE_PLAT) for _ in range(2)]
+        Reclamation.objects.update(date=timezone.now() - timedelta(hours=2))
+        self.assertEqual(self.en_attente(), {"DELAI": 1, "QUALITE_PLAT": 2})
+
+        self.client.force_authenticate(self.cuisinier)
+        url = "/api/reclamations/changer-statut/"
+        self.client.post(url, {"ids": [str(r.pk) for r in qualite], "statut": "EN_COURS"}, format="json")
+        self.client.post(f"/api/reclamations/{qualite[0].pk}/changer-statut/", {"statut": "TRAITEE"})
+        # retour en arrière puis nouveau traitement : compté une seule fois
+        self.client.post(url, {"ids": [str(qualite[0].pk)], "statut": "OUVERT"}, format="json")
+        self.client.post(url, {"ids": [str(qualite[0].pk)], "statut": "TRAITEE"}, format="json")
+
+        self.assertEqual(self.en_attente(), {"DELAI": 1, "QUALITE_PLAT": 1})
+        with CaptureQueriesContext(connection) as requetes:
+            res = self.client.get("/api/reclamations/sla/")
+        self.assertEqual(len(requetes), 2)
+        lecture, traitement = res.data["delai_lecture"], res.data["delai_traitement"]
+        self.assertEqual(lecture["nb"], 2)
+        self.assertEqual((lecture["p50_s"], lecture["p99_s"]), (4 * 3600, 4 * 3600))
+        self.assertAlmostEqual(lecture["moyenne_s"], 7200, delta=60)
+        self.assertEqual(traitement["nb"], 1)
+        self.assertEqual(res.data["en_attente"]["total"], 2)
+        self.assertEqual(res.data["en_attente"]["par_motif"]["ERREUR_COMMANDE"], 0)
+
+        # cuisinier sans historique
+        self.client.force_authenticate(self.autre_cuisinier)
+        res = self.client.get("/api/reclamations/sla/")
+        self.assertIsNone(res.data["delai_lecture"]["p90_s"])
+        self.assertEqual(res.data["en_attente"]["total"], 0)
+
+        call_command("verifier_reclamations", "--corriger", stdout=io.StringIO())
+        self.assertEqual(self.en_attente(), {"DELAI": 1, "QUALITE_PLAT": 1})
+        delai.refresh_from_db()
+        self.assertIsNone(delai.lu_le)
+
+    def test_retards_de_lecture(self):
+        ancienne = self.reclamer()
+        self.reclamer()  # récente
+        self.reclamer(cuisinier=self.autre_cuisinier)
+        Reclamation.objects.filter(pk=ancienne.pk).update(date=timezone.now() - timedelta(days=2))
+
+        self.client.force_authenticate(self.cuisinier)
+        self.assertEqual(self.client.get("/api/reclamations/sla/retards/").status_code, 403)
+
+        admin = User.objects.create_user(username="admin", password="x", role=User.Role.ADMIN)
+        self.client.force_authenticate(admin)
+        res = self.client.get("/api/reclamations/sla/retards/")
+        self.assertEqual(
+            [(r["cuisinier_username"], r["non_lues"]) for r in res.data], [("chef", 1)]
+        )
+        res = self.client.get("/api/reclamations/sla/retards/", {"heures": 0})
+        self.assertEqual(len(res.data), 2)
+        self.assertEqual(
+            self.client.get("/api/reclamations/sla/retards/", {"heures": "x"}).status_code, 400
+        )
@@ -1,10 +1,21 @@
 # reclamations/urls.py
 from django.urls import path
-from .views import ChangerStatutReclamationView, CreerReclamationView, MesReclamationsClientView, ReclamationsRecuesCuisinierView
+from .views import (
+    ChangerStatutGroupeView,
+    ChangerStatutReclamationView,
+    CreerReclamationView,
+    MesReclamationsClientView,
+    ReclamationsRecuesCuisinierView,
+    RetardsLectureView,
+    SlaCuisinierView,
+)
 
 urlpatterns = [
     path("creer/", CreerReclamationView.as_view()),
     path("mes-reclamations/", MesReclamationsClientView.as_view()),
     path("cuisinier/", ReclamationsRecuesCuisinierView.as_view(), name="reclamations-cuisinier"),
     path("<uuid:pk>/changer-statut/", ChangerStatutReclamationView.as_view(), name="reclamation-changer-statut"),
+    path("changer-statut/", ChangerStatutGroupeView.as_view(), name="reclamations-changer-statut"),
+    path("sla/", SlaCuisinierView.as_view(), name="reclamations-sla"),
+    path("sla/retards/", RetardsLectureView.as_view(), name="reclamations-retards"),
 ]
@@ -1,4 +1,7 @@
 # reclamations/views.py
+import uuid
+
+from django.conf import settings
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -6,6 +9,8 @@ from rest_framework import status
 from django.contrib.auth import get_user_model
 
 from .models import Reclamation, StatutReclamation
+from .pagination import ReclamationCursorPagination
+from .sla import changer_statut, resume_cuisinier, retards
 from .serializers import ReclamationCreateSerializer, ReclamationListSerializer
 from .serializers import ReclamationCuisinierSerializer
 
@@ -32,22 +37,24 @@ class CreerReclamationView(APIView):
 
 
 class MesReclamationsClientView(APIView):
+    """
+    GET /api/reclamations/mes-reclamations/
+    -> réclamations du client connecté, paginées par curseur
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        qs = (
-            Reclamation.objects
-            .filter(client=request.user)
-            .select_related("commande")
-            .order_by("-date")
-        )
-        serializer = ReclamationListSerializer(qs, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
-    
+        qs = Reclamation.objects.filter(client=request.user)
+        paginator = ReclamationCursorPagination()
+        page = paginator.paginate_queryset(qs, request, view=self)
+        serializer = ReclamationListSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
 class ReclamationsRecuesCuisinierView(APIView):
     """
-    GET /api/reclamations/cuisinier/
-    -> liste des réclamations sur les plats du cuisinier connecté
+    GET /api/reclamations/cuisinier/?statut=...
+    -> réclamations sur les plats du cuisinier connecté, paginées par curseur
     """
     permission_classes = [IsAuthenticated]
 
@@ -60,17 +67,24 @@ class ReclamationsRecuesCuisinierView(APIView):
 
         qs = (
             Reclamation.objects
-            #  AU LIEU DE  .filter(plat__cuisinier=request.user)
-            .filter(commande__lignes__plat__cuisinier=request.user)
-            .select_related("client", "commande", "plat")
-            .order_by("-date")
-            .distinct()   # important pour éviter les doublons si plusieurs lignes
+            # cuisinier recopié sur la réclamation : ni jointure ni DISTINCT
+            .filter(cuisinier=request.user)
+            .select_related("client", "plat")
         )
-        serializer = ReclamationCuisinierSerializer(qs, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        statut = request.query_params.get("statut")
+        if statut:
+            if statut not in StatutReclamation.values:
+                return Response(
+                    {"detail": "Statut invalide."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            qs = qs.filter(statut=statut)
 
+        paginator = ReclamationCursorPagination()
+        page = paginator.paginate_queryset(qs, request, view=self)
+        serializer = ReclamationCuisinierSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
-    
 
 class ChangerStatutReclamationView(APIView):
     """
@@ -89,9 +103,8 @@ class ChangerStatutReclamationView(APIView):
         try:
             reclamation = (
                 Reclamation.objects
-                .select_related("commande", "plat", "client")
-                # 🔴 AU LIEU DE .get(pk=pk, plat__cuisinier=request.user)
-                .get(pk=pk, commande__lignes__plat__cuisinier=request.user)
+                .select_related("plat", "client")
+                .get(pk=pk, cuisinier=request.user)
             )
         except Reclamation.DoesNotExist:
             return Response(
@@ -108,10 +121,124 @@ class ChangerStatutReclamationView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        reclamation.statut = new_status
-        reclamation.save()
+        # horodatages et délais de réponse : voir reclamations/sla.py
+        changer_statut(request.user, [reclamation.pk], new_status)
+        reclamation.refresh_from_db(fields=["statut", "lu_le", "traitee_le"])
 
         serializer = ReclamationCuisinierSerializer(reclamation)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+class ChangerStatutGroupeView(APIView):
+    """
+    POST /api/reclamations/changer-statut/
+    body: { "ids": ["<uuid>", ...], "statut": "LU" | "EN_COURS" | ... }
+    -> { "modifiees": [...], "ignorees": [...] }
+    Un seul UPDATE pour toute la sélection ; sont ignorées les réclamations
+    introuvables, d'un autre cuisinier ou déjà dans ce statut.
+    """
+    permission_classes = [IsAuthenticated]
+    MAX_IDS = 200
+
+    def post(self, request):
+        if request.user.role != User.Role.CUISINIER:
+            return Response(
+                {"detail": "Réservé aux cuisiniers."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        new_status = request.data.get("statut")
+        if new_status not in StatutReclamation.values:
+            return Response(
+                {"detail": "Statut invalide."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        ids = request.data.get("ids")
+        if not isinstance(ids, list) or not ids:
+            return Response(
+                {"detail": "'ids' doit être une liste non vide."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(ids) > self.MAX_IDS:
+            return Response(
+                {"detail": f"Au plus {self.MAX_IDS} réclamations par requête."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            ids = list(dict.fromkeys(uuid.UUID(str(i)) for i in ids))
+        except ValueError:
+            return Response(
+                {"detail": "Identifiant de réclamation invalide."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        modifiees = set(changer_statut(request.user, ids, new_status))
+        return Response(
+            {
+                "modifiees": [str(i) for i in ids if i in modifiees],
+                "ignorees": [str(i) for i in ids if i not in modifiees],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class SlaCuisinierView(APIView):
+    """
+    GET /api/reclamations/sla/
+    -> délais de lecture et de traitement du cuisinier connecté (moyenne,
+       p50/p90/p99, répartition par tranche) et réclamations en attente par
+       motif. Lu dans les agrégats tenus par reclamations/sla.py.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role != User.Role.CUISINIER:
+            return Response(
+                {"detail": "Réservé aux cuisiniers."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        return Response(resume_cuisinier(request.user), status=status.HTTP_200_OK)
+
+
+class RetardsLectureView(APIView):
+    """
+    GET /api/reclamations/sla/retards/?heures=24
+    -> cuisiniers ayant des réclamations non lues depuis plus de `heures`
+       (RECLAMATIONS_DELAI_LECTURE_H par défaut), la plus ancienne d'abord.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role != User.Role.ADMIN and not request.user.is_staff:
+            return Response(
+                {"detail": "Réservé aux administrateurs."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        try:
+            heures = int(request.query_params.get("heures", settings.RECLAMATIONS_DELAI_LECTURE_H))
+        except ValueError:
+            heures = -1
+        if heures < 0:
+            return Response(
+                {"detail": "Paramètre 'heures' invalide."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        lignes = retards(heures)
+        noms = dict(
+            User.objects.filter(pk__in=[ligne["cuisinier"] for ligne in lignes])
+            .values_list("pk", "username")
+        )
+        return Response(
+            [
+                {
+                    "cuisinier": ligne["cuisinier"],
+                    "cuisinier_username": noms.get(ligne["cuisinier"]),
+                    "non_lues": ligne["non_lues"],
+                    "plus_ancienne": ligne["plus_ancienne"],
+                }
+                for ligne in lignes
+            ],
+            status=status.HTTP_200_OK,
+        )
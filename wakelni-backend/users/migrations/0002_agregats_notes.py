@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='nb_avis',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='somme_notes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -29,7 +29,10 @@ class User(AbstractUser):
     # Spécifique Cuisinier
     bio = models.TextField(blank=True, null=True)
     adresse = models.CharField(max_length=255, blank=True, null=True)
+    # moyenne des avis sur ses plats, tenue à jour par avis/notes.py
     note_moyenne = models.FloatField(blank=True, null=True)
+    nb_avis = models.PositiveIntegerField(default=0)
+    somme_notes = models.PositiveIntegerField(default=0)
     actif = models.BooleanField(default=True)
 
     def __str__(self):
@@ -21,8 +21,11 @@ class UserSerializer(serializers.ModelSerializer):
             "bio",
             "adresse",
             "note_moyenne",
+            "nb_avis",
             "actif",
         ]
+        # agrégats des avis, calculés par avis/notes.py
+        read_only_fields = ["note_moyenne", "nb_avis"]
 
 
 class ClerkSyncSerializer(serializers.Serializer):
@@ -0,0 +1,89 @@
+# wakelni_backend/conditional.py
+"""
+GET conditionnels (ETag / Last-Modified) pour les vues DRF.
+
+Le validateur est calculé par une seule requête d'agrégat
+(max(date de modification) + nombre de lignes), sans sérialiser :
+si le client renvoie le même ETag, on répond 304 Not Modified.
+
+Un validateur retourne (derniere_maj, valeurs) : derniere_maj devient
+l'en-tête Last-Modified, à ne fournir que si cette date avance à chaque
+changement du contenu. Ce n'est pas le cas d'un max() sur un queryset
+(une suppression ou un champ modifié sans toucher la date ne le font pas
+bouger, et If-Modified-Since seul donnerait un faux 304) : pour
+validateur_queryset, le max ne sert qu'à l'ETag.
+
+    class MaVue(generics.ListAPIView):
+        @requete_conditionnelle(validateur_queryset("modifie_le"))
+        def list(self, request, *args, **kwargs):
+            return super().list(request, *args, **kwargs)
+"""
+import hashlib
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+
+def validateur_queryset(champ_date, extra=None, queryset=None):
+    """
+    Fabrique un validateur à partir du queryset (filtré) de la vue.
+
+    champ_date : champ "dernière modification" (updated_at, cree_le, ...)
+    extra      : agrégats supplémentaires, ex. {"non_lues": Count(...)}
+    queryset   : fonction (vue) -> queryset, par défaut filter_queryset(get_queryset())
+    """
+    def valider(vue, request):
+        if queryset is not None:
+            qs = queryset(vue)
+        else:
+            qs = vue.filter_queryset(vue.get_queryset())
+        agregats = {"derniere_maj": Max(champ_date), "nb": Count("pk")}
+        agregats.update(extra or {})
+        # pas de Last-Modified : voir la docstring du module
+        return None, qs.order_by().aggregate(**agregats)
+
+    return valider
+
+
+def _etag(request, derniere_maj, valeurs):
+    user_id = getattr(request.user, "pk", None)
+    brut = "|".join([
+        str(user_id),
+        request.get_full_path(),
+        derniere_maj.isoformat() if derniere_maj else "",
+        repr(sorted(valeurs.items())),
+    ])
+    return '"%s"' % hashlib.md5(brut.encode()).hexdigest()
+
+
+def requete_conditionnelle(validateur):
+    """
+    Décorateur de méthode de vue (get / list) : 304 si rien n'a changé,
+    sinon réponse normale avec les en-têtes ETag et Last-Modified.
+    """
+    def decorateur(methode):
+        @wraps(methode)
+        def wrapper(vue, request, *args, **kwargs):
+            derniere_maj, valeurs = validateur(vue, request)
+            etag = _etag(request, derniere_maj, valeurs)
+            horodatage = int(derniere_maj.timestamp()) if derniere_maj else None
+
+            reponse = get_conditional_response(
+                request, etag=etag, last_modified=horodatage
+            )
+            if reponse is None:
+                reponse = methode(vue, request, *args, **kwargs)
+
+            if reponse.status_code in (200, 304):
+                reponse["ETag"] = etag
+                if horodatage is not None:
+                    reponse["Last-Modified"] = http_date(horodatage)
+                # le contenu dépend de l'utilisateur connecté (JWT)
+                patch_vary_headers(reponse, ("Authorization",))
+            return reponse
+
+        return wrapper
+
+    return decorateur
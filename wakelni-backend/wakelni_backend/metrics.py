@@ -0,0 +1,147 @@
+# wakelni_backend/metrics.py
+"""
+Métriques applicatives minimales, exposées au format texte Prometheus
+sur GET /metrics/.
+
+Les valeurs sont propres à chaque processus (comme prometheus_client
+sans mode multiprocess) : le scraper agrège par instance.
+"""
+import bisect
+import threading
+
+from django.http import HttpResponse
+
+_registre = {}
+_verrou = threading.Lock()
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    contenu = ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+    return "{" + contenu + "}"
+
+
+class _Metrique:
+    type = None
+
+    def __init__(self, nom, aide):
+        self.nom = nom
+        self.aide = aide
+        self._verrou = threading.Lock()
+        self._valeurs = {}
+
+    def _cle(self, labels):
+        return tuple(sorted(labels.items()))
+
+    def lignes(self):
+        yield f"# HELP {self.nom} {self.aide}"
+        yield f"# TYPE {self.nom} {self.type}"
+        with self._verrou:
+            valeurs = dict(self._valeurs)
+        for cle, valeur in valeurs.items():
+            yield f"{self.nom}{_format_labels(dict(cle))} {valeur}"
+
+
+class Counter(_Metrique):
+    type = "counter"
+
+    def inc(self, montant=1, **labels):
+        cle = self._cle(labels)
+        with self._verrou:
+            self._valeurs[cle] = self._valeurs.get(cle, 0) + montant
+
+    def valeur(self, **labels):
+        return self._valeurs.get(self._cle(labels), 0)
+
+
+class Gauge(_Metrique):
+    """Jauge : fixée explicitement (set) ou calculée au moment du scrape (fonction)."""
+    type = "gauge"
+
+    def __init__(self, nom, aide, fonction=None):
+        super().__init__(nom, aide)
+        self.fonction = fonction
+
+    def set(self, valeur, **labels):
+        with self._verrou:
+            self._valeurs[self._cle(labels)] = valeur
+
+    def valeur(self, **labels):
+        return self._valeurs.get(self._cle(labels), 0)
+
+    def lignes(self):
+        if self.fonction is not None:
+            for labels, valeur in self.fonction():
+                self.set(valeur, **labels)
+        yield from super().lignes()
+
+
+class Histogram(_Metrique):
+    type = "histogram"
+
+    BORNES_DEFAUT = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self, nom, aide, bornes=BORNES_DEFAUT):
+        super().__init__(nom, aide)
+        self.bornes = tuple(bornes)
+
+    def observe(self, valeur, **labels):
+        cle = self._cle(labels)
+        with self._verrou:
+            seaux, somme, total = self._valeurs.get(
+                cle, ([0] * len(self.bornes), 0.0, 0)
+            )
+            seaux = list(seaux)
+            index = bisect.bisect_left(self.bornes, valeur)
+            if index < len(seaux):
+                seaux[index] += 1
+            self._valeurs[cle] = (seaux, somme + valeur, total + 1)
+
+    def total(self, **labels):
+        return self._valeurs.get(self._cle(labels), (None, 0.0, 0))[2]
+
+    def lignes(self):
+        yield f"# HELP {self.nom} {self.aide}"
+        yield f"# TYPE {self.nom} histogram"
+        with self._verrou:
+            valeurs = dict(self._valeurs)
+        for cle, (seaux, somme, total) in valeurs.items():
+            labels = dict(cle)
+            cumul = 0
+            for borne, nb in zip(self.bornes, seaux):
+                cumul += nb
+                yield f"{self.nom}_bucket{_format_labels({**labels, 'le': borne})} {cumul}"
+            yield f"{self.nom}_bucket{_format_labels({**labels, 'le': '+Inf'})} {total}"
+            yield f"{self.nom}_sum{_format_labels(labels)} {somme}"
+            yield f"{self.nom}_count{_format_labels(labels)} {total}"
+
+
+def _enregistrer(classe, nom, *args, **kwargs):
+    with _verrou:
+        if nom not in _registre:
+            _registre[nom] = classe(nom, *args, **kwargs)
+        return _registre[nom]
+
+
+def counter(nom, aide):
+    return _enregistrer(Counter, nom, aide)
+
+
+def gauge(nom, aide, fonction=None):
+    return _enregistrer(Gauge, nom, aide, fonction=fonction)
+
+
+def histogram(nom, aide, bornes=Histogram.BORNES_DEFAUT):
+    return _enregistrer(Histogram, nom, aide, bornes=bornes)
+
+
+def exposition():
+    lignes = []
+    for metrique in list(_registre.values()):
+        lignes.extend(metrique.lignes())
+    return "\n".join(lignes) + "\n"
+
+
+def metrics_view(request):
+    return HttpResponse(exposition(), content_type="text/plain; version=0.0.4")
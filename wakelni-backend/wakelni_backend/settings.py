@@ -80,14 +80,39 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'wakelni_backend.wsgi.application'
 
+DATABASE_URL = os.environ.get("DATABASE_URL")
+
 DATABASES = {
     "default": dj_database_url.parse(
-        os.environ.get("DATABASE_URL"),
+        DATABASE_URL,
         conn_max_age=600,
-        ssl_require=True,
+        # SQLite (tests / dev local) ne connaît pas sslmode
+        ssl_require=not DATABASE_URL.startswith("sqlite"),
     )
 }
 
+# Cache : mémoire locale par défaut, Redis pour le catalogue si configuré
+# (ex. CATALOGUE_CACHE_URL=redis://localhost:6379/1, nécessite le paquet "redis")
+CATALOGUE_CACHE_URL = os.environ.get("CATALOGUE_CACHE_URL", "")
+CATALOGUE_CACHE_TTL = int(os.environ.get("CATALOGUE_CACHE_TTL", "300"))
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "catalogue": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CATALOGUE_CACHE_URL,
+        }
+        if CATALOGUE_CACHE_URL
+        else {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "catalogue",
+        }
+    ),
+}
+
 AUTH_PASSWORD_VALIDATORS = []
 
 LANGUAGE_CODE = 'fr-ca'
@@ -115,4 +140,47 @@ REST_FRAMEWORK = {
 
 STRIPE_SECRET_KEY = os.environ.get("STRIPE_SECRET_KEY", "")
 STRIPE_PUBLISHABLE_KEY = os.environ.get("STRIPE_PUBLISHABLE_KEY", "")
-
+# secret de signature du endpoint webhook (whsec_...), voir /api/paiements/webhook/
+STRIPE_WEBHOOK_SECRET = os.environ.get("STRIPE_WEBHOOK_SECRET", "")
+
+# Passerelle de paiement (paiements/gateways.py) : "stripe" ou "fake"
+# "fake" simule Stripe en mémoire : tests et tests de charge sans réseau
+PAIEMENT_GATEWAY = os.environ.get("PAIEMENT_GATEWAY", "stripe")
+PAIEMENT_FAKE_LATENCE_MS = float(os.environ.get("PAIEMENT_FAKE_LATENCE_MS", "0"))
+PAIEMENT_FAKE_TAUX_ECHEC = float(os.environ.get("PAIEMENT_FAKE_TAUX_ECHEC", "0"))
+PAIEMENT_FAKE_URL_BASE = os.environ.get("PAIEMENT_FAKE_URL_BASE", "http://localhost:8000")
+
+# Appels sortants (paiements/resilience.py) : délai par tentative, budget
+# total (reprises comprises) et disjoncteur partagé par processus
+PAIEMENT_TIMEOUT_S = float(os.environ.get("PAIEMENT_TIMEOUT_S", "8"))
+PAIEMENT_DELAI_TOTAL_S = float(os.environ.get("PAIEMENT_DELAI_TOTAL_S", "15"))
+PAIEMENT_TENTATIVES_MAX = int(os.environ.get("PAIEMENT_TENTATIVES_MAX", "3"))
+PAIEMENT_DISJONCTEUR_FENETRE = 20      # derniers appels observés
+PAIEMENT_DISJONCTEUR_MIN_APPELS = 10   # pas de décision avant
+PAIEMENT_DISJONCTEUR_SEUIL = 0.5       # proportion d'erreurs qui ouvre le circuit
+PAIEMENT_DISJONCTEUR_DUREE_S = 30      # avant l'appel test
+
+
+# Durée de blocage du stock entre le checkout et le paiement
+# (Stripe impose au moins 30 minutes pour expires_at, comptées à la
+# réception de l'appel : 35 laisse de la marge pour la réservation et les
+# reprises ; paiements/views.py rallonge de toute façon si besoin)
+RESERVATION_STOCK_TTL_MINUTES = int(os.environ.get("RESERVATION_STOCK_TTL_MINUTES", "35"))
+
+# File temps réel des cuisiniers (GET /api/commandes/flux/, commandes/flux.py).
+# "memoire" : un seul processus ; avec plusieurs workers, pub/sub Redis
+# (ex. COMMANDES_FLUX_BROKER=redis://localhost:6379/2, paquet "redis")
+COMMANDES_FLUX_BROKER = os.environ.get("COMMANDES_FLUX_BROKER", "memoire")
+COMMANDES_FLUX_PING_S = 15          # commentaire keep-alive
+COMMANDES_FLUX_DUREE_MAX_S = 300    # puis EventSource se reconnecte (nouveau snapshot)
+COMMANDES_FLUX_JETON_S = 60         # validité du jeton ?token= (ouverture du flux seulement)
+
+# Notifications lues conservées ce nombre de jours (purger_notifications)
+NOTIFICATIONS_RETENTION_JOURS = int(os.environ.get("NOTIFICATIONS_RETENTION_JOURS", "90"))
+
+# Au-delà, une réclamation non lue compte comme un retard
+# (GET /api/reclamations/sla/retards/, reclamations/sla.py)
+RECLAMATIONS_DELAI_LECTURE_H = int(os.environ.get("RECLAMATIONS_DELAI_LECTURE_H", "24"))
+
+# Canaux de distribution de la boîte d'envoi (notifications_app/canaux.py)
+NOTIFICATIONS_CANAUX = ["notifications_app.canaux.en_base"]
@@ -5,6 +5,8 @@ from django.http import JsonResponse
 from django.conf import settings
 from django.conf.urls.static import static
 
+from .metrics import metrics_view
+
 
 def home(request):
     return JsonResponse({"message": "API Wakelni fonctionne 🥙"})
@@ -13,6 +15,7 @@ def home(request):
 urlpatterns = [
     path("", home),
     path("admin/", admin.site.urls),
+    path("metrics/", metrics_view),
     path("api/users/", include("users.urls")),
     path("api/plats/", include("plats.urls")),
     path("api/paniers/", include("paniers.urls")),
@@ -20,6 +23,7 @@ urlpatterns = [
     path("api/paiements/", include("paiements.urls")),
     path("api/reclamations/", include("reclamations.urls")),
     path("api/avis/", include("avis.urls")),
+    path("api/notifications/", include("notifications_app.urls")),
 ]
 
 # important pour servir les images en DEBUG
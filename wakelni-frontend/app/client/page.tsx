@@ -17,7 +17,12 @@ type Plat = {
   adresse: string;
   est_actif: boolean;
   photo_url?: string | null;
+  // variantes redimensionnées générées par l'API (thumb 320px, medium 800px)
+  photo_variants?: Record<string, { jpeg?: string; webp?: string }>;
   cuisinier: string; // username du cuisinier
+  // agrégats des avis (null tant que le plat n'a pas d'avis)
+  note_moyenne?: number | null;
+  nb_avis?: number;
 };
 
 type AvisItem = {
@@ -28,6 +33,20 @@ type AvisItem = {
   client_name: string;
 };
 
+// en-tête des listes d'avis (première page seulement)
+type ResumeAvis = {
+  nb_avis: number;
+  note_moyenne: number | null;
+  repartition_notes: Record<string, number>;
+};
+
+// l'API renvoie une URL absolue pour "next" : on garde seulement chemin + query
+function toApiPath(url: string | null): string | null {
+  if (!url) return null;
+  const parsed = new URL(url);
+  return `${parsed.pathname}${parsed.search}`;
+}
+
 export default function ClientPage() {
   const router = useRouter();
 
@@ -38,15 +57,20 @@ export default function ClientPage() {
 
   const [plats, setPlats] = useState<Plat[]>([]);
   const [loadingPlats, setLoadingPlats] = useState(true);
+  // page suivante du catalogue (pagination par curseur côté API)
+  const [nextPlatsPath, setNextPlatsPath] = useState<string | null>(null);
   const [errorPlats, setErrorPlats] = useState<string | null>(null);
 
-  // 🔎 recherche
+  // 🔎 recherche (côté serveur : /api/plats/recherche/)
   const [search, setSearch] = useState("");
+  const [searchResults, setSearchResults] = useState<Plat[] | null>(null);
 
   // 🔎 État pour la modale d’avis
   const [showAvisModal, setShowAvisModal] = useState(false);
   const [selectedPlat, setSelectedPlat] = useState<Plat | null>(null);
   const [avis, setAvis] = useState<AvisItem[]>([]);
+  const [resumeAvis, setResumeAvis] = useState<ResumeAvis | null>(null);
+  const [nextAvisPath, setNextAvisPath] = useState<string | null>(null);
   const [loadingAvis, setLoadingAvis] = useState(false);
   const [errorAvis, setErrorAvis] = useState<string | null>(null);
 
@@ -83,8 +107,10 @@ export default function ClientPage() {
       try {
         setLoadingPlats(true);
         setErrorPlats(null);
-        const data = await apiGet("/api/plats/"); // PlatListCreateView renvoie seulement est_actif=True
-        setPlats(data);
+        // PlatListCreateView renvoie seulement est_actif=True, paginé par curseur
+        const data = await apiGet("/api/plats/?en_stock=1");
+        setPlats(data.results);
+        setNextPlatsPath(toApiPath(data.next));
       } catch (err: any) {
         console.error(err);
         setErrorPlats(err?.message || "Impossible de charger les plats.");
@@ -96,6 +122,45 @@ export default function ClientPage() {
     loadPlats();
   }, [checkingAuth]);
 
+  // 🔎 Recherche plein texte côté API (avec un petit délai de frappe)
+  useEffect(() => {
+    if (checkingAuth) return;
+    const q = search.trim();
+    if (!q) {
+      setSearchResults(null);
+      return;
+    }
+
+    const timer = setTimeout(async () => {
+      try {
+        const data = await apiGet(
+          `/api/plats/recherche/?q=${encodeURIComponent(q)}`
+        );
+        setSearchResults(data);
+      } catch (err) {
+        console.error(err);
+      }
+    }, 300);
+
+    return () => clearTimeout(timer);
+  }, [search, checkingAuth]);
+
+  // ➕ Charger la page suivante du catalogue
+  async function handleLoadMorePlats() {
+    if (!nextPlatsPath) return;
+    try {
+      setLoadingPlats(true);
+      const data = await apiGet(nextPlatsPath);
+      setPlats((prev) => [...prev, ...data.results]);
+      setNextPlatsPath(toApiPath(data.next));
+    } catch (err: any) {
+      console.error(err);
+      setErrorPlats(err?.message || "Impossible de charger les plats.");
+    } finally {
+      setLoadingPlats(false);
+    }
+  }
+
   function handleLogout() {
     if (typeof window !== "undefined") {
       window.localStorage.clear();
@@ -121,17 +186,19 @@ export default function ClientPage() {
     }
   }
 
-  // 🔎 Charger les avis pour un plat
-  async function fetchAvisForPlat(platId: string) {
+  // 🔎 Charger les avis pour un plat (page suivante si `path` est donné)
+  async function fetchAvisForPlat(platId: string, path?: string) {
     try {
       setLoadingAvis(true);
       setErrorAvis(null);
 
       //  URL CORRECTE : /api/avis/avis-par-plat/?plat_id=...
-      const data = await apiGet(`/api/avis/avis-par-plat/?plat_id=${platId}`);
+      const data = await apiGet(
+        path ?? `/api/avis/avis-par-plat/?plat_id=${platId}`
+      );
 
       // on adapte le JSON renvoyé par AvisCuisinierSerializer
-      const mapped = (data as any[]).map((a) => ({
+      const mapped = (data.results as any[]).map((a) => ({
         id: a.id,
         note: a.note,
         commentaire: a.commentaire,
@@ -139,7 +206,13 @@ export default function ClientPage() {
         client_name: a.client_nom || a.client_email, // fallback
       }));
 
-      setAvis(mapped);
+      if (path) {
+        setAvis((prev) => [...prev, ...mapped]);
+      } else {
+        setAvis(mapped);
+        setResumeAvis(data.resume);
+      }
+      setNextAvisPath(toApiPath(data.next));
     } catch (err: any) {
       console.error(err);
       setErrorAvis(
@@ -162,24 +235,15 @@ export default function ClientPage() {
     setShowAvisModal(false);
     setSelectedPlat(null);
     setAvis([]);
+    setResumeAvis(null);
+    setNextAvisPath(null);
     setErrorAvis(null);
   }
 
-  // 🔎 filtrage des plats (stock > 0, actif, + recherche)
-  const filteredPlats = plats
-    .filter((plat) => plat.stock > 0 && plat.est_actif)
-    .filter((plat) => {
-      if (!search.trim()) return true;
-      const q = search.toLowerCase();
-
-      return (
-        plat.nom.toLowerCase().includes(q) ||
-        (plat.description || "").toLowerCase().includes(q) ||
-        (plat.ingredients || "").toLowerCase().includes(q) ||
-        (plat.ville || "").toLowerCase().includes(q) ||
-        (plat.cuisinier || "").toLowerCase().includes(q)
-      );
-    });
+  // 🔎 plats affichés : résultats de recherche (classés par pertinence) ou catalogue
+  const filteredPlats = (searchResults ?? plats).filter(
+    (plat) => plat.stock > 0 && plat.est_actif
+  );
 
   if (checkingAuth) {
     return <p style={{ padding: 24 }}>Vérification de la connexion...</p>;
@@ -323,11 +387,29 @@ export default function ClientPage() {
                       onClick={() => handleOpenAvisModal(plat)}
                     >
                       {plat.photo_url ? (
-                        <img
-                          src={plat.photo_url}
-                          alt={plat.nom}
-                          className="plat-client-image"
-                        />
+                        <picture>
+                          {plat.photo_variants?.medium?.webp && (
+                            <source
+                              type="image/webp"
+                              srcSet={`${plat.photo_variants.thumb?.webp} 320w, ${plat.photo_variants.medium.webp} 800w`}
+                              sizes="(max-width: 600px) 100vw, 320px"
+                            />
+                          )}
+                          <img
+                            src={
+                              plat.photo_variants?.thumb?.jpeg || plat.photo_url
+                            }
+                            srcSet={
+                              plat.photo_variants?.medium?.jpeg
+                                ? `${plat.photo_variants.thumb?.jpeg} 320w, ${plat.photo_variants.medium.jpeg} 800w`
+                                : undefined
+                            }
+                            sizes="(max-width: 600px) 100vw, 320px"
+                            loading="lazy"
+                            alt={plat.nom}
+                            className="plat-client-image"
+                          />
+                        </picture>
                       ) : (
                         <div className="plat-client-image placeholder">
                           Photo à venir
@@ -347,6 +429,11 @@ export default function ClientPage() {
                       </div>
 
                       <h3 className="plat-client-title">{plat.nom}</h3>
+                      {plat.note_moyenne != null && (
+                        <p className="plat-client-note">
+                          ★ {plat.note_moyenne.toFixed(1)} ({plat.nb_avis} avis)
+                        </p>
+                      )}
                       <p className="plat-client-description">
                         {plat.description || "Plat maison délicieux."}
                       </p>
@@ -379,6 +466,17 @@ export default function ClientPage() {
                 );
               })}
             </div>
+
+            {nextPlatsPath && searchResults === null && (
+              <button
+                type="button"
+                className="btn btn-secondary"
+                onClick={handleLoadMorePlats}
+                disabled={loadingPlats}
+              >
+                Voir plus de plats
+              </button>
+            )}
           </section>
         </main>
 
@@ -458,6 +556,13 @@ export default function ClientPage() {
               <div className="avis-modal-right">
                 <h3 className="avis-list-title">Avis des autres clients</h3>
 
+                {resumeAvis?.note_moyenne != null && (
+                  <p className="avis-item-date">
+                    ★ {resumeAvis.note_moyenne.toFixed(1)} sur 5 (
+                    {resumeAvis.nb_avis} avis)
+                  </p>
+                )}
+
                 {loadingAvis && <p>Chargement des avis…</p>}
                 {errorAvis && <p className="error-text">{errorAvis}</p>}
 
@@ -488,6 +593,18 @@ export default function ClientPage() {
                     </li>
                   ))}
                 </ul>
+
+                {nextAvisPath && !loadingAvis && (
+                  <button
+                    type="button"
+                    className="btn"
+                    onClick={() =>
+                      fetchAvisForPlat(selectedPlat.id, nextAvisPath)
+                    }
+                  >
+                    Voir plus d’avis
+                  </button>
+                )}
               </div>
             </div>
           </div>
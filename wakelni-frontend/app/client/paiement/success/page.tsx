@@ -6,6 +6,10 @@ import { apiPost } from "../../../../lib/api";
 
 type Status = "loading" | "ok" | "error";
 
+// attente de la confirmation par le webhook Stripe (~30 s au total)
+const MAX_ESSAIS = 15;
+const DELAI_ESSAI_MS = 2000;
+
 // ✅ Type pour les infos de facture renvoyées par l'API
 type InvoiceData = {
   commande_id: number;
@@ -51,24 +55,52 @@ export default function PaymentSuccessPage() {
     const cleaned = raw.replace(/^\{/, "").replace(/\}$/, "");
     setSessionId(cleaned);
 
-    apiPost("/api/paiements/confirm/", { session_id: cleaned })
-      .then((data) => {
-        // data contient maintenant :
-        // detail, commande_id, montant, date, statut, type, transaction_ref
-        setStatus("ok");
-        setMessage("Votre commande est en cours de préparation.");
-        setInvoice(data as InvoiceData); // 👈 on garde les infos pour la facture
-      })
-      .catch((err: any) => {
-        console.error(err);
-        setStatus("error");
-        // on récupère le message de l'API si dispo
-        const apiMsg = err?.message || "";
-        setMessage(
-          apiMsg ||
-            "Impossible de confirmer votre paiement. Si le montant n'a pas été débité, la commande ne sera pas créée."
-        );
-      });
+    // La commande est confirmée par le webhook Stripe côté serveur :
+    // tant que ce n'est pas fait, l'API répond 202 (statut != SUCCES).
+    // 409 : paiement reçu mais commande refusée (plats épuisés, commande
+    // annulée) -> apiPost lève l'erreur, on affiche son message sans réessayer.
+    let annule = false;
+    let essais = 0;
+
+    const verifier = () => {
+      apiPost("/api/paiements/confirm/", { session_id: cleaned })
+        .then((data) => {
+          if (annule) return;
+          if (data?.statut !== "SUCCES") {
+            essais += 1;
+            if (essais < MAX_ESSAIS) {
+              setTimeout(verifier, DELAI_ESSAI_MS);
+            } else {
+              setStatus("error");
+              setMessage(
+                "La confirmation de votre paiement prend plus de temps que prévu. Votre commande apparaîtra dans « Mes commandes » dès qu'elle sera confirmée."
+              );
+            }
+            return;
+          }
+          // data contient :
+          // detail, commande_id, montant, date, statut, type, transaction_ref
+          setStatus("ok");
+          setMessage("Votre commande est en cours de préparation.");
+          setInvoice(data as InvoiceData); // 👈 on garde les infos pour la facture
+        })
+        .catch((err: any) => {
+          if (annule) return;
+          console.error(err);
+          setStatus("error");
+          // on récupère le message de l'API si dispo
+          const apiMsg = err?.message || "";
+          setMessage(
+            apiMsg ||
+              "Impossible de confirmer votre paiement. Si le montant n'a pas été débité, la commande ne sera pas créée."
+          );
+        });
+    };
+
+    verifier();
+    return () => {
+      annule = true;
+    };
   }, [searchParams]);
 
   // ========= TEXTES DYNAMIQUES =========
@@ -5,6 +5,13 @@ import { useEffect, useState } from 'react';
 import { useRouter } from 'next/navigation';
 import { apiGet, apiPost } from '../../../lib/api';
 
+// l'API renvoie une URL absolue pour "next" : on garde seulement chemin + query
+function toApiPath(url: string | null): string | null {
+  if (!url) return null;
+  const parsed = new URL(url);
+  return `${parsed.pathname}${parsed.search}`;
+}
+
 type Commande = {
   id: string;
   statut: string;
@@ -31,6 +38,7 @@ export default function ReclamationsClientPage() {
 
   const [commandes, setCommandes] = useState<Commande[]>([]);
   const [reclamations, setReclamations] = useState<Reclamation[]>([]);
+  const [nextPath, setNextPath] = useState<string | null>(null);
 
   const [showModal, setShowModal] = useState(false);
   const [selectedCommande, setSelectedCommande] = useState('');
@@ -66,9 +74,17 @@ export default function ReclamationsClientPage() {
     if (checkingAuth) return;
 
     apiGet('/api/commandes/mes-commandes/').then(setCommandes);
-    apiGet('/api/reclamations/mes-reclamations/').then(setReclamations);
+    loadReclamations();
   }, [checkingAuth]);
 
+  async function loadReclamations(path?: string) {
+    const data = await apiGet(path ?? '/api/reclamations/mes-reclamations/');
+    setReclamations((prev) =>
+      path ? [...prev, ...data.results] : data.results
+    );
+    setNextPath(toApiPath(data.next));
+  }
+
   function handleLogout() {
     localStorage.clear();
     window.location.href = '/login';
@@ -97,8 +113,7 @@ export default function ReclamationsClientPage() {
     await apiPost("/api/reclamations/creer/", payload);
 
     // on recharge la liste
-    const data = await apiGet("/api/reclamations/mes-reclamations/");
-    setReclamations(data);
+    await loadReclamations();
 
     // on reset le formulaire
     setShowModal(false);
@@ -212,6 +227,12 @@ export default function ReclamationsClientPage() {
             </div>
           ))}
         </div>
+
+        {nextPath && (
+          <button className="btn" onClick={() => loadReclamations(nextPath)}>
+            Voir plus
+          </button>
+        )}
       </main>
 
 
@@ -14,11 +14,27 @@ type AvisCuisinier = {
   client_nom: string;
 };
 
+type ResumeAvis = {
+  nb_avis: number;
+  note_moyenne: number | null;
+  repartition_notes: Record<string, number>;
+};
+
+// l'API renvoie une URL absolue pour "next" : on garde seulement chemin + query
+function toApiPath(url: string | null): string | null {
+  if (!url) return null;
+  const parsed = new URL(url);
+  return `${parsed.pathname}${parsed.search}`;
+}
+
 export default function CuisinierAvisPage() {
   const router = useRouter();
 
   const [checkingAuth, setCheckingAuth] = useState(true);
   const [avis, setAvis] = useState<AvisCuisinier[]>([]);
+  const [resume, setResume] = useState<ResumeAvis | null>(null);
+  const [nextPath, setNextPath] = useState<string | null>(null);
+  const [filtreNote, setFiltreNote] = useState('');
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
@@ -57,8 +73,11 @@ export default function CuisinierAvisPage() {
       try {
         setLoading(true);
         setError(null);
-        const data = await apiGet('/api/avis/avis-cuisinier/');
-        setAvis(data as AvisCuisinier[]);
+        const query = filtreNote ? `?note=${filtreNote}` : '';
+        const data = await apiGet(`/api/avis/avis-cuisinier/${query}`);
+        setAvis(data.results as AvisCuisinier[]);
+        setResume(data.resume);
+        setNextPath(toApiPath(data.next));
       } catch (err: any) {
         console.error(err);
         setError(err?.message || 'Impossible de charger les avis.');
@@ -68,7 +87,22 @@ export default function CuisinierAvisPage() {
     }
 
     loadAvis();
-  }, [checkingAuth]);
+  }, [checkingAuth, filtreNote]);
+
+  async function handleLoadMore() {
+    if (!nextPath) return;
+    try {
+      setLoading(true);
+      const data = await apiGet(nextPath);
+      setAvis((prev) => [...prev, ...(data.results as AvisCuisinier[])]);
+      setNextPath(toApiPath(data.next));
+    } catch (err: any) {
+      console.error(err);
+      setError(err?.message || 'Impossible de charger les avis.');
+    } finally {
+      setLoading(false);
+    }
+  }
 
   if (checkingAuth) {
     return <p style={{ padding: 24 }}>Vérification de la connexion...</p>;
@@ -163,6 +197,34 @@ export default function CuisinierAvisPage() {
       <section className="cuisinier-section">
         <h2>Derniers avis reçus</h2>
 
+        {resume && resume.note_moyenne != null && (
+          <div className="plat-meta" style={{ marginBottom: 16 }}>
+            {renderStars(Math.round(resume.note_moyenne))} &nbsp;
+            <strong>{resume.note_moyenne.toFixed(1)}/5</strong> sur{' '}
+            {resume.nb_avis} avis
+            <div style={{ fontSize: '0.9rem', color: '#777', marginTop: 4 }}>
+              {[5, 4, 3, 2, 1]
+                .map((n) => `${n}★ : ${resume.repartition_notes[n] ?? 0}`)
+                .join(' • ')}
+            </div>
+          </div>
+        )}
+
+        <label style={{ display: 'block', marginBottom: 16 }}>
+          Filtrer par note :{' '}
+          <select
+            value={filtreNote}
+            onChange={(e) => setFiltreNote(e.target.value)}
+          >
+            <option value="">Toutes</option>
+            {[5, 4, 3, 2, 1].map((n) => (
+              <option key={n} value={n}>
+                {n}/5
+              </option>
+            ))}
+          </select>
+        </label>
+
         {loading && <p>Chargement des avis...</p>}
         {error && <p className="error-text">{error}</p>}
 
@@ -205,6 +267,12 @@ export default function CuisinierAvisPage() {
             </div>
           ))}
         </div>
+
+        {nextPath && !loading && (
+          <button className="btn" onClick={handleLoadMore}>
+            Voir plus d’avis
+          </button>
+        )}
       </section>
     </div>
   );
@@ -3,7 +3,7 @@
 
 import { useEffect, useState } from 'react';
 import { useRouter } from 'next/navigation';
-import { apiGet, apiPatch } from '../../../lib/api';
+import { apiEventSource, apiGet, apiPatch } from '../../../lib/api';
 
 type LigneCommande = {
   id: number;
@@ -26,6 +26,8 @@ type Commande = {
   statut: StatutCommande;
   total: string;
   lignes: LigneCommande[];
+  // statuts autorisés depuis le statut actuel (table de transitions du backend)
+  transitions_possibles: StatutCommande[];
 };
 
 const STATUT_LABELS: Record<StatutCommande, string> = {
@@ -43,6 +45,21 @@ const STATUT_OPTIONS: { value: StatutCommande; label: string }[] =
     label,
   }));
 
+// messages de /api/commandes/flux/ (voir commandes/flux.py côté backend)
+type EvenementFlux =
+  | { type: 'snapshot'; commandes: Commande[] }
+  | { type: 'nouvelle' | 'modifiee' | 'annulee'; commande: Commande };
+
+// remplace les commandes connues, ajoute les autres, plus récentes d'abord
+function fusionner(actuelles: Commande[], recues: Commande[]) {
+  const parId = new Map(recues.map((c) => [c.id, c]));
+  const connues = new Set(actuelles.map((c) => c.id));
+  return [
+    ...recues.filter((c) => !connues.has(c.id)),
+    ...actuelles.map((c) => parId.get(c.id) ?? c),
+  ].sort((a, b) => Date.parse(b.created_at) - Date.parse(a.created_at));
+}
+
 function classStatut(statut: StatutCommande) {
   switch (statut) {
     case 'COMPLETEE':
@@ -95,6 +112,55 @@ export default function CuisinierCommandesPage() {
     load();
   }, []);
 
+  // file temps réel : plus besoin de recharger la page pour voir les
+  // nouvelles commandes
+  useEffect(() => {
+    let source: EventSource | null = null;
+    let relance: ReturnType<typeof setTimeout> | undefined;
+    let ferme = false;
+
+    async function ouvrir() {
+      try {
+        source = await apiEventSource(
+          '/api/commandes/flux/',
+          '/api/commandes/flux/jeton/'
+        );
+      } catch (err) {
+        console.error(err);
+        if (!ferme) relance = setTimeout(ouvrir, 5000);
+        return;
+      }
+      if (ferme) {
+        source.close();
+        return;
+      }
+      source.onmessage = (e) => {
+        const evenement = JSON.parse(e.data) as EvenementFlux;
+        const recues =
+          evenement.type === 'snapshot'
+            ? evenement.commandes
+            : [evenement.commande];
+        setCommandes((prev) => fusionner(prev, recues));
+      };
+      source.onerror = () => {
+        // coupure réseau : EventSource se reconnecte seul. Refus (jeton du
+        // flux expiré) : il abandonne ; on rouvre avec un nouveau jeton.
+        if (source?.readyState !== EventSource.CLOSED) return;
+        relance = setTimeout(async () => {
+          await load();
+          ouvrir();
+        }, 5000);
+      };
+    }
+
+    ouvrir();
+    return () => {
+      ferme = true;
+      source?.close();
+      clearTimeout(relance);
+    };
+  }, []);
+
   async function handleChangeStatut(id: number, nouveau: StatutCommande) {
     const sauvegarde = [...commandes];
 
@@ -103,15 +169,18 @@ export default function CuisinierCommandesPage() {
     );
 
     try {
-      await apiPatch(`/api/commandes/${id}/changer-statut/`, {
+      const maj = (await apiPatch(`/api/commandes/${id}/changer-statut/`, {
         statut: nouveau,
-      });
+      })) as Commande;
+      setCommandes((prev) => prev.map((c) => (c.id === id ? maj : c)));
     } catch (err: any) {
       console.error(err);
       alert(
         err.message || 'Impossible de mettre à jour le statut, réessaye.'
       );
       setCommandes(sauvegarde);
+      // la commande a pu changer entre-temps (409) : on recharge
+      load();
     }
   }
 
@@ -195,9 +264,8 @@ export default function CuisinierCommandesPage() {
 
         <div className="plats-table">
           {commandes.map((commande) => {
-            const isLocked =
-              commande.statut === 'ANNULEE' ||
-              commande.statut === 'COMPLETEE';
+            const transitions = commande.transitions_possibles ?? [];
+            const isLocked = transitions.length === 0;
 
             return (
               <div key={commande.id} className="plat-row">
@@ -257,7 +325,11 @@ export default function CuisinierCommandesPage() {
                         border: '1px solid #ddd',
                       }}
                     >
-                      {STATUT_OPTIONS.map((opt) => (
+                      {STATUT_OPTIONS.filter(
+                        (opt) =>
+                          opt.value === commande.statut ||
+                          transitions.includes(opt.value)
+                      ).map((opt) => (
                         <option key={opt.value} value={opt.value}>
                           {opt.label}
                         </option>
@@ -4,6 +4,13 @@ import { useEffect, useState } from 'react';
 import { useRouter } from 'next/navigation';
 import { apiGet, apiPost } from '../../../lib/api';
 
+// l'API renvoie une URL absolue pour "next" : on garde seulement chemin + query
+function toApiPath(url: string | null): string | null {
+  if (!url) return null;
+  const parsed = new URL(url);
+  return `${parsed.pathname}${parsed.search}`;
+}
+
 type StatutReclamation = 'OUVERT' | 'LU' | 'EN_COURS' | 'TRAITEE' | 'REJETEE';
 
 type Reclamation = {
@@ -20,6 +27,30 @@ type Reclamation = {
   date: string;
 };
 
+type StatistiquesDelai = {
+  nb: number;
+  moyenne_s: number | null;
+  p50_s: number | null;
+  p90_s: number | null;
+  p99_s: number | null;
+};
+
+type Sla = {
+  delai_lecture: StatistiquesDelai;
+  delai_traitement: StatistiquesDelai;
+  en_attente: { total: number; par_motif: Record<string, number> };
+};
+
+// borne haute de tranche renvoyée par l'API (null : plus d'une semaine)
+function formatDelai(stats: StatistiquesDelai) {
+  const secondes = stats.p50_s;
+  if (stats.nb === 0) return '—';
+  if (secondes === null) return '> 7 j';
+  if (secondes < 3600) return `≤ ${Math.round(secondes / 60)} min`;
+  if (secondes < 86400) return `≤ ${Math.round(secondes / 3600)} h`;
+  return `≤ ${Math.round(secondes / 86400)} j`;
+}
+
 const STATUT_LABELS: Record<StatutReclamation, string> = {
   OUVERT: 'Ouvert',
   LU: 'Lue par le cuisinier',
@@ -56,6 +87,10 @@ export default function CuisinierReclamationsPage() {
   const router = useRouter();
 
   const [reclamations, setReclamations] = useState<Reclamation[]>([]);
+  const [nextPath, setNextPath] = useState<string | null>(null);
+  const [filtreStatut, setFiltreStatut] = useState<StatutReclamation | ''>('');
+  const [selection, setSelection] = useState<string[]>([]);
+  const [sla, setSla] = useState<Sla | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
@@ -72,13 +107,16 @@ export default function CuisinierReclamationsPage() {
   const greetingName =
     (firstName || '') + (lastName ? ` ${lastName}` : '') || 'Compte cuisinier';
 
-  async function loadReclamations() {
+  async function loadReclamations(path?: string) {
     try {
       setLoading(true);
       setError(null);
       // ⚠️ IMPORTANT : slash final !
-      const data = await apiGet('/api/reclamations/cuisinier/');
-      setReclamations(data as Reclamation[]);
+      const query = filtreStatut ? `?statut=${filtreStatut}` : '';
+      const data = await apiGet(path ?? `/api/reclamations/cuisinier/${query}`);
+      const page = data.results as Reclamation[];
+      setReclamations((prev) => (path ? [...prev, ...page] : page));
+      setNextPath(toApiPath(data.next));
     } catch (err: any) {
       console.error('Erreur chargement réclamations:', err);
       setError(err.message || 'API error');
@@ -89,8 +127,51 @@ export default function CuisinierReclamationsPage() {
 
   useEffect(() => {
     loadReclamations();
+    setSelection([]);
+  }, [filtreStatut]);
+
+  async function loadSla() {
+    try {
+      setSla((await apiGet('/api/reclamations/sla/')) as Sla);
+    } catch (err) {
+      console.error('Erreur chargement délais:', err);
+    }
+  }
+
+  useEffect(() => {
+    loadSla();
   }, []);
 
+  function toggleSelection(id: string) {
+    setSelection((prev) =>
+      prev.includes(id) ? prev.filter((x) => x !== id) : [...prev, id]
+    );
+  }
+
+  // une seule requête pour toute la sélection
+  async function handleChangeStatutGroupe(nouveau: StatutReclamation) {
+    if (selection.length === 0) return;
+    try {
+      const res = await apiPost('/api/reclamations/changer-statut/', {
+        ids: selection,
+        statut: nouveau,
+      });
+      const modifiees: string[] = res.modifiees;
+      setReclamations((prev) =>
+        prev.map((r) =>
+          modifiees.includes(r.id)
+            ? { ...r, statut: nouveau, statut_label: STATUT_LABELS[nouveau] }
+            : r
+        )
+      );
+      setSelection([]);
+      loadSla();
+    } catch (err: any) {
+      console.error('Erreur changement groupé:', err);
+      alert(err.message || 'Impossible de changer le statut.');
+    }
+  }
+
   async function handleChangeStatut(id: string, nouveau: StatutReclamation) {
     const backup = [...reclamations];
     // Optimistic UI
@@ -110,6 +191,7 @@ export default function CuisinierReclamationsPage() {
       setReclamations((prev) =>
         prev.map((r) => (r.id === id ? (updated as Reclamation) : r))
       );
+      loadSla();
     } catch (err: any) {
       console.error('Erreur changement statut réclamation:', err);
       alert(err.message || 'Impossible de changer le statut.');
@@ -186,6 +268,47 @@ export default function CuisinierReclamationsPage() {
       <section className="cuisinier-section">
         <h2>Liste des réclamations</h2>
 
+        <label style={{ display: 'block', marginBottom: 16 }}>
+          Statut :{' '}
+          <select
+            value={filtreStatut}
+            onChange={(e) =>
+              setFiltreStatut(e.target.value as StatutReclamation | '')
+            }
+          >
+            <option value="">Tous</option>
+            {STATUTS_OPTIONS.map((opt) => (
+              <option key={opt.value} value={opt.value}>
+                {opt.label}
+              </option>
+            ))}
+          </select>
+        </label>
+
+        {sla && (
+          <p className="plat-meta" style={{ marginBottom: 16 }}>
+            En attente : <strong>{sla.en_attente.total}</strong> • Lecture
+            (médiane) : <strong>{formatDelai(sla.delai_lecture)}</strong>{' '}
+            • Traitement (médiane) :{' '}
+            <strong>{formatDelai(sla.delai_traitement)}</strong>
+          </p>
+        )}
+
+        {selection.length > 0 && (
+          <div style={{ display: 'flex', gap: 8, marginBottom: 16 }}>
+            <span>{selection.length} sélectionnée(s) :</span>
+            {STATUTS_OPTIONS.map((opt) => (
+              <button
+                key={opt.value}
+                className="btn"
+                onClick={() => handleChangeStatutGroupe(opt.value)}
+              >
+                {opt.label}
+              </button>
+            ))}
+          </div>
+        )}
+
         {loading && <p>Chargement…</p>}
         {error && <p className="error-text">{error}</p>}
         {!loading && !error && reclamations.length === 0 && (
@@ -199,6 +322,12 @@ export default function CuisinierReclamationsPage() {
 
             return (
               <div key={r.id} className="plat-row">
+                <input
+                  type="checkbox"
+                  checked={selection.includes(r.id)}
+                  onChange={() => toggleSelection(r.id)}
+                  style={{ marginRight: 12 }}
+                />
                 <div className="plat-info" style={{ flex: 1 }}>
                   <h3>{r.commande_label}</h3>
                   <p className="plat-meta">
@@ -259,6 +388,12 @@ export default function CuisinierReclamationsPage() {
             );
           })}
         </div>
+
+        {nextPath && !loading && (
+          <button className="btn" onClick={() => loadReclamations(nextPath)}>
+            Voir plus
+          </button>
+        )}
       </section>
     </div>
   );
@@ -16,6 +16,12 @@ type AvisResponse = {
   date: string;
 };
 
+type EligibiliteResponse = {
+  plat: string;
+  peut_noter: boolean;
+  avis: AvisResponse | null;
+};
+
 export default function AvisForm({ platId, platNom, onSubmitted }: AvisFormProps) {
   const [rating, setRating] = useState(0);
   const [hoverRating, setHoverRating] = useState(0);
@@ -25,25 +31,28 @@ export default function AvisForm({ platId, platNom, onSubmitted }: AvisFormProps
   const [successMessage, setSuccessMessage] = useState<string | null>(null);
   const [submitError, setSubmitError] = useState<string | null>(null);
   const [hasSubmitted, setHasSubmitted] = useState(false);
+  const [peutNoter, setPeutNoter] = useState(true);
 
-  // ✅ Charger l'avis existant (si déjà envoyé)
+  // ✅ Charger l'avis existant (si déjà envoyé) et l'éligibilité
   useEffect(() => {
     async function loadAvis() {
       try {
         setLoadError(null);
 
-        const data = (await apiGet(
-          `/api/avis/mon-avis/?plat_id=${platId}`
-        )) as AvisResponse | null;
+        const [data] = (await apiGet(
+          `/api/avis/eligibilite/?plats=${platId}`
+        )) as EligibiliteResponse[];
 
-        if (data) {
-          setRating(data.note);
-          setComment(data.commentaire || '');
+        if (data?.avis) {
+          setRating(data.avis.note);
+          setComment(data.avis.commentaire || '');
           setHasSubmitted(true);
           setSuccessMessage('Vous avez déjà laissé un avis pour ce plat.');
+        } else if (data && !data.peut_noter) {
+          setPeutNoter(false);
         }
       } catch (err) {
-        // Aucun avis → normal
+        // éligibilité inconnue → le serveur tranchera à l'envoi
       }
     }
 
@@ -54,7 +63,7 @@ export default function AvisForm({ platId, platNom, onSubmitted }: AvisFormProps
 
   // ✅ Envoi de l'avis
   async function handleSubmit() {
-    if (!rating || hasSubmitted || loading) return;
+    if (!rating || hasSubmitted || loading || !peutNoter) return;
 
     try {
       setLoading(true);
@@ -105,9 +114,9 @@ export default function AvisForm({ platId, platNom, onSubmitted }: AvisFormProps
     }
   }
 
-  const starsDisabled = loading || hasSubmitted;
-  const commentDisabled = loading || !rating || hasSubmitted;
-  const buttonDisabled = loading || !rating || hasSubmitted;
+  const starsDisabled = loading || hasSubmitted || !peutNoter;
+  const commentDisabled = loading || !rating || hasSubmitted || !peutNoter;
+  const buttonDisabled = loading || !rating || hasSubmitted || !peutNoter;
 
   return (
     <div className="avis-card">
@@ -151,6 +160,12 @@ export default function AvisForm({ platId, platNom, onSubmitted }: AvisFormProps
         />
       </label>
 
+      {!peutNoter && (
+        <p className="error-text" style={{ marginTop: 4 }}>
+          Vous pourrez noter ce plat une fois votre commande remise.
+        </p>
+      )}
+
       {/* ❌ MESSAGE ERREUR */}
       {submitError && (
         <p className="error-text" style={{ marginTop: 4 }}>
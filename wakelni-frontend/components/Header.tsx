@@ -2,6 +2,7 @@
 
 import Link from 'next/link';
 import { useEffect, useState } from 'react';
+import { apiGet } from '../lib/api';
 
 type UserInfo = {
   first_name: string;
@@ -43,6 +44,15 @@ export default function Header() {
     setUser({ first_name, last_name });
   }, []);
 
+  // badge : compteur tenu à jour côté backend (pas de COUNT à chaque page)
+  const [nonLues, setNonLues] = useState(0);
+
+  useEffect(() => {
+    apiGet('/api/notifications/non-lues/')
+      .then((data) => setNonLues((data as { non_lues: number }).non_lues))
+      .catch((err) => console.error(err));
+  }, []);
+
   const fullName = `${user.first_name} ${user.last_name}`.trim();
   const avatarLetter = (user.first_name || 'U')[0]?.toUpperCase() || 'U';
 
@@ -77,7 +87,7 @@ export default function Header() {
           Avis
         </Link>
         <Link href="/cuisinier/notifications" className="header-btn">
-          Notifications
+          Notifications{nonLues > 0 ? ` (${nonLues})` : ''}
         </Link>
         <Link href="/cuisinier/commandes" className="header-btn">
           Commandes
@@ -193,3 +193,15 @@ export async function apiPatch(path: string, body: any) {
 export async function apiPatchForm(path: string, formData: FormData) {
   return request('PATCH', path, formData, true);
 }
+
+// Flux Server-Sent Events : EventSource ne sait pas envoyer d'en-tête
+// Authorization. Un jeton propre au flux, valable une minute, est demandé à
+// `jetonPath` (avec le jeton d'accès) puis passé en paramètre ?token= : le
+// jeton d'accès ne se retrouve jamais dans une URL.
+export async function apiEventSource(path: string, jetonPath: string) {
+  const { token } = (await apiPost(jetonPath, {})) as { token: string };
+  const separateur = path.includes('?') ? '&' : '?';
+  return new EventSource(
+    `${BASE_URL}${path}${separateur}token=${encodeURIComponent(token)}`
+  );
+}